@@ -45,6 +45,9 @@ def set_properties(project):
     project.get_property('filter_resources_glob').extend([
         '**/vRAclient/*'])
 
+    project.set_property('distutils_console_scripts', [
+        'vraclient-export = vRAclient.cli:main'])
+
     project.build_depends_on_requirements('requirements-build.txt')
 
     project.depends_on_requirements('requirements.txt')
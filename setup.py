@@ -36,5 +36,13 @@ setup(
     url='https://github.com/hkalidex/vRAclient',
     description='A Python client for vRA REST API',
     install_requires=requires,
+    extras_require={
+        'async': ['aiohttp']
+    },
+    entry_points={
+        'console_scripts': [
+            'vraclient-export = vRAclient.cli:main'
+        ]
+    },
     dependency_links=links
 )
@@ -0,0 +1,714 @@
+import os
+import ssl
+import json
+import asyncio
+from time import monotonic
+from collections import deque
+from itertools import islice
+from datetime import datetime
+from datetime import timedelta
+
+import aiohttp
+from RESTclient import RESTclient
+
+from .vraclient import ResourceNotFound
+from .vraclient import MultipleResourcesFound
+from .vraclient import RequestFailed
+from .vraclient import WaitTimeExceeded
+from .vraclient import NoPermission
+from .vraclient import SUBTENANTS_LIMIT
+from .vraclient import VRA_HOST
+from .vraclient import VRA_TENANT
+from .vraclient import get_id
+from .vraclient import get_request_id
+from .vraclient import get_authorization_header
+from .vraclient import get_endpoint_resource_name
+from .vraclient import get_paged_endpoint
+from .vraclient import get_select_endpoint
+from .vraclient import get_trimmed
+from .vraclient import get_next_page_path
+from .vraclient import validate_lease_days
+from .paging import DEFAULT_PAGE_SIZE
+from .paging import DEFAULT_MAX_WORKERS
+from .paging import get_skip_offsets
+from .paging import get_skip_top_endpoint
+from .polling import PollSchedule
+from .polling import CompletionHistory
+from .polling import get_request_key
+from .tokens import TokenManager
+from .retry import RetryPolicy
+from .retry import AsyncBackoffGate
+from .retry import REJECTED_STATUS_CODES
+from .retry import RETRY_STATUS_CODES
+from .retry import get_retry_after
+from .transfer import get_endpoint_template
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_CONNECTION_LIMIT = 100
+
+
+def get_ssl_context(cabundle=None):
+    """ return ssl context verifying against cabundle
+    """
+    return ssl.create_default_context(cafile=cabundle if cabundle else RESTclient.cabundle)
+
+
+def get_connector(limit=None, cabundle=None):
+    """ return aiohttp connector pooling up to limit connections
+    """
+    return aiohttp.TCPConnector(
+        limit=limit if limit else DEFAULT_CONNECTION_LIMIT,
+        ssl=get_ssl_context(cabundle))
+
+
+class BufferedResponse(object):
+    """ status, headers and body of a response read before its connection was released
+    """
+
+    def __init__(self, status_code, headers, content):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    def json(self):
+        """ return decoded json body
+        """
+        return json.loads(self.content.decode('utf-8'))
+
+
+class AsyncvRAclient(object):
+
+    def __init__(self, hostname, **kwargs):
+        """ class constructor
+
+            all requests of the client share one aiohttp session and must run on the event loop
+            the session was created on
+
+            Args:
+                hostname (str): hostname of API server
+                kwargs (dict): arbritrary number of key word arguments
+                    bearer_token (str): bearer token
+                    token_manager (TokenManager): caches the tokens and tracks their expiry while the client
+                        logs in through its session, required if bearer_token is not provided
+                    username (str): username
+                    session (aiohttp.ClientSession): session to send all requests through
+                    limit (int): maximum number of concurrent connections, default is 100
+                    cabundle (str): path to ca bundle, default is RESTclient.cabundle
+                    rate_limiter (RateLimiter): limits the rate of requests, may be shared with other clients,
+                        default is no limit
+                    retry_policy (RetryPolicy): retries of throttled and failed requests, default is RetryPolicy(),
+                        None disables retries
+
+            Returns:
+                AsyncvRAclient: instance of AsyncvRAclient
+        """
+        logger.debug('executing AsyncvRAclient constructor')
+
+        if 'bearer_token' not in kwargs and 'token_manager' not in kwargs:
+            raise ValueError('a bearer_token must be provided to AsyncvRAclient')
+
+        if 'username' not in kwargs:
+            raise ValueError('a username must be provided to AsyncvRAclient')
+
+        self.hostname = hostname
+        self.bearer_token = kwargs.get('bearer_token')
+        self.token_manager = kwargs.get('token_manager')
+        self.username = kwargs['username']
+        self.limit = kwargs.get('limit')
+        self.cabundle = kwargs.get('cabundle')
+        self.session = kwargs.get('session')
+        self.rate_limiter = kwargs.get('rate_limiter')
+        self.retry_policy = kwargs.get('retry_policy', RetryPolicy())
+        self.backoff_gate = AsyncBackoffGate()
+        self.completion_history = CompletionHistory()
+        self.token_lock = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    def get_session(self):
+        """ return client session, creating it on first use
+        """
+        if not self.session:
+            self.session = aiohttp.ClientSession(connector=get_connector(limit=self.limit, cabundle=self.cabundle))
+        return self.session
+
+    async def close(self):
+        """ close client session and all pooled connections
+        """
+        if self.session:
+            await self.session.close()
+            self.session = None
+
+    async def get_bearer_token(self):
+        """ return current bearer token, refreshing it ahead of expiry when a token manager is used
+
+            the token manager only caches the tokens and tracks their expiry, the logins are sent through
+            the client session; concurrent tasks wait for a single refresh
+        """
+        if self.token_manager:
+            if not self.token_manager.is_valid():
+                if not self.token_lock:
+                    self.token_lock = asyncio.Lock()
+                async with self.token_lock:
+                    if not self.token_manager.is_valid():
+                        await self.refresh_access_token()
+            self.bearer_token = 'Bearer {}'.format(self.token_manager.access_token)
+        return self.bearer_token
+
+    async def refresh_access_token(self):
+        """ obtain new access token using the refresh token of the token manager, logging in with password
+            if there is none or it is rejected, and store it in the token manager
+        """
+        token_manager = self.token_manager
+        refresh_token = token_manager.refresh_token
+        access_token = None
+        if refresh_token:
+            logger.debug('refreshing access token for {} using refresh token'.format(self.username))
+            try:
+                access_token = await self.get_access_token(refresh_token)
+            except aiohttp.ClientResponseError as exception:
+                logger.debug('refresh token rejected - {}'.format(str(exception)))
+
+        if not access_token:
+            logger.debug('obtaining refresh token for {} using password'.format(self.username))
+            refresh_token = await self.get_refresh_token()
+            access_token = await self.get_access_token(refresh_token)
+
+        token_manager.update(access_token, refresh_token=refresh_token)
+
+    async def get_refresh_token(self):
+        """ return refresh token from CSP login with the username and password of the token manager
+        """
+        token_manager = self.token_manager
+        response = await self.request(
+            'POST',
+            '/csp/gateway/am/api/login?access_token',
+            headers={
+                'Accept': 'application/json',
+                'Content-Type': 'application/json'
+            },
+            json={
+                'username': token_manager.username,
+                'password': token_manager.password,
+                'tenant': token_manager.tenant
+            })
+        return response['refresh_token']
+
+    async def get_access_token(self, refresh_token):
+        """ return access token from iaas login with refresh_token
+        """
+        response = await self.request(
+            'POST',
+            '/iaas/api/login',
+            headers={
+                'Content-Type': 'application/json'
+            },
+            json={
+                'refreshToken': refresh_token
+            })
+        return response['token']
+
+    async def refresh_bearer_token(self, rejected_token=None):
+        """ refresh bearer token after rejected_token was refused and return the new bearer token
+        """
+        self.token_manager.invalidate(rejected_token)
+        return await self.get_bearer_token()
+
+    def get_headers(self):
+        """ return default headers for requests
+        """
+        return {
+            'Accept': 'application/json',
+            'Content-Type': 'application/json',
+            'Authorization': self.bearer_token
+        }
+
+    async def request(self, method, endpoint, **kwargs):
+        """ send request to endpoint and return decoded json response, see request_response
+        """
+        response = await self.request_response(method, endpoint, **kwargs)
+        if not response.content:
+            return None
+        return response.json()
+
+    async def request_response(self, method, endpoint, **kwargs):
+        """ send request to endpoint and return the response with its body read, raising for error status
+
+            endpoint may be a path on hostname or an absolute url; the request waits for the rate limiter
+            without blocking the event loop; when a token manager is used a request rejected with 401 is sent
+            once more with a refreshed bearer token
+
+            requests are retried like vRAclient.request: throttled (429, 503), failed (502, 504) and unsent
+            requests are retried according to the retry policy, POST only when rejected with 429 or 503 unless
+            idempotent=True is passed, and a throttling response holds back the requests of all tasks
+        """
+        idempotent = kwargs.pop('idempotent', None)
+        if endpoint.startswith('https://') or endpoint.startswith('http://'):
+            url = endpoint
+        else:
+            url = 'https://{}{}'.format(self.hostname, endpoint)
+        if 'headers' not in kwargs:
+            await self.get_bearer_token()
+            kwargs['headers'] = self.get_headers()
+
+        attempt = 0
+        refreshed = False
+        while True:
+            await self.backoff_gate.wait()
+            await self.wait_for_rate_limit(url)
+            authorization = None
+            try:
+                async with self.get_session().request(method, url, **kwargs) as response:
+                    status_code = response.status
+                    if status_code == 401 and self.token_manager and not refreshed:
+                        authorization = get_authorization_header(kwargs['headers'])
+                    if not authorization:
+                        retry_after = get_retry_after(response) if status_code in RETRY_STATUS_CODES else None
+                        if not self.can_retry(
+                                method, url, attempt, status_code=status_code, idempotent=idempotent, retry_after=retry_after):
+                            if retry_after and status_code in REJECTED_STATUS_CODES:
+                                self.backoff_gate.close(retry_after)
+                            response.raise_for_status()
+                            return BufferedResponse(status_code, response.headers, await response.read())
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as exception:
+                if not self.can_retry(method, url, attempt, idempotent=idempotent):
+                    raise
+                delay = self.retry_policy.get_delay(attempt)
+                logger.debug('{} request to "{}" failed - retrying in {:.1f}s - {}'.format(method, url, delay, str(exception)))
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+
+            if authorization:
+                logger.debug('request to "{}" was unauthorized - refreshing bearer token'.format(url))
+                refreshed = True
+                headers = dict(kwargs['headers'])
+                headers[authorization] = await self.refresh_bearer_token(rejected_token=headers[authorization])
+                kwargs['headers'] = headers
+                continue
+
+            delay = self.retry_policy.get_delay(attempt, retry_after=retry_after)
+            logger.debug('{} request to "{}" returned {} - retrying in {:.1f}s'.format(method, url, status_code, delay))
+            if status_code in REJECTED_STATUS_CODES:
+                self.backoff_gate.close(delay)
+            else:
+                await asyncio.sleep(delay)
+            attempt += 1
+
+    async def wait_for_rate_limit(self, url):
+        """ wait until the rate limiter allows a request to url
+        """
+        if self.rate_limiter:
+            delay = self.rate_limiter.reserve(url)
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+    def can_retry(self, method, url, attempt, status_code=None, idempotent=None, retry_after=None):
+        """ return True if attempt of request to url that failed with status_code, or without response, is retried
+        """
+        policy = self.retry_policy
+        if not policy or attempt >= policy.retries:
+            return False
+        if not policy.is_retryable(method, status_code=status_code, idempotent=idempotent):
+            return False
+        if not policy.can_wait(retry_after):
+            return False
+        return policy.spend(get_endpoint_template(url))
+
+    async def get(self, endpoint, **kwargs):
+        """ return json from GET of endpoint
+        """
+        return await self.request('GET', endpoint, **kwargs)
+
+    async def post(self, endpoint, **kwargs):
+        """ return json from POST to endpoint
+        """
+        return await self.request('POST', endpoint, **kwargs)
+
+    async def get_endpoint_resource(self, endpoint=None, with_filter=None):
+        """ return resource from endpoint using with_filter
+        """
+        resource_name = get_endpoint_resource_name(endpoint)
+        logger.debug('getting "{}" with filter "{}"'.format(resource_name, with_filter))
+
+        separator = '?'
+        if '?' in endpoint:
+            separator = '&'
+
+        resource = await self.get('{}{}$filter={}'.format(endpoint, separator, with_filter))
+
+        if not resource['content']:
+            raise ResourceNotFound(
+                'unable to locate "{}" with filter "{}"'.format(resource_name, with_filter))
+
+        if len(resource['content']) > 1:
+            raise MultipleResourcesFound(
+                'found multiple "{}" with filter "{}"'.format(resource_name, with_filter))
+
+        return resource['content'][0]
+
+    async def wait_for_request(self, request_id=None, status='successful', delay=10, timeout=120, schedule=None,
+                               adaptive=False):
+        """ wait for request with request_id to reach state of status without blocking the event loop
+
+            see vRAclient.wait_for_request
+        """
+        logger.debug("waiting for status to be '{}' for request id '{}'".format(status, request_id))
+
+        if not request_id:
+            return request_id
+
+        start = monotonic()
+        deadline = start + timeout
+        delays = None
+        while True:
+            request = await self.get('/catalog-service/api/consumer/requests/{}'.format(request_id))
+            request_state = request['state'].lower()
+            logger.debug("state for request id '{}' is '{}'".format(request_id, request_state))
+
+            if request_state == status:
+                self.completion_history.record(get_request_key(request), monotonic() - start)
+                return request_id
+            elif 'failed' in request_state:
+                raise RequestFailed("request id '{}' failed with status '{}'".format(request_id, request_state))
+
+            remaining = deadline - monotonic()
+            if remaining <= 0:
+                raise WaitTimeExceeded("request id '{}' exceeded timeout of '{}' seconds".format(request_id, timeout))
+
+            if not delays:
+                if not schedule:
+                    expected = self.completion_history.get_expected(get_request_key(request)) if adaptive else None
+                    schedule = PollSchedule(maximum=delay, expected=expected)
+                delays = schedule.get_delays()
+            await asyncio.sleep(min(next(delays), remaining))
+
+    def get_next_page_href(self, links):
+        """ get next page href from links
+        """
+        return get_next_page_path(links, self.hostname)
+
+    async def get_page(self, endpoint, fields=None):
+        """ yield pages from endpoint following next page links, with items trimmed to fields if given
+        """
+        fields = set(fields) if fields else None
+        while True:
+            logger.debug('retrieving page from "{}"'.format(endpoint))
+            page = await self.get(endpoint)
+            if page and page['content']:
+                if fields:
+                    yield [get_trimmed(item, fields) for item in page['content']]
+                else:
+                    yield page['content']
+                endpoint = self.get_next_page_href(page['links'])
+                if not endpoint:
+                    logger.debug('no more pages to retrieve - exiting')
+                    break
+            else:
+                logger.debug('no page content detected - exiting')
+                break
+
+    async def get_all(self, api_endpoint, fields=None):
+        """ return list of all items from all pages of api_endpoint
+        """
+        result = []
+        async for data in self.get_page(api_endpoint, fields=fields):
+            result.extend(data)
+        logger.debug('retrieved total of {} items from "{}"'.format(len(result), api_endpoint))
+        return result
+
+    async def get_collection(self, endpoint, page_size=DEFAULT_PAGE_SIZE, max_workers=DEFAULT_MAX_WORKERS, fields=None):
+        """ yield all items from $skip/$top paged collection endpoint
+
+            remaining pages are retrieved concurrently with at most max_workers in flight and yielded in order;
+            fields are requested with $select and items are trimmed to them when the endpoint ignores it
+        """
+        if fields:
+            endpoint = get_select_endpoint(endpoint, fields)
+            fields = set(fields)
+        page = await self.get(get_skip_top_endpoint(endpoint, 0, page_size))
+        content = page['content']
+        for item in content:
+            yield get_trimmed(item, fields) if fields else item
+
+        total = page.get('totalElements', len(content))
+        if not content or len(content) >= total:
+            return
+
+        page_size = min(page_size, len(content))
+        offsets = iter(get_skip_offsets(total, page_size, start=len(content)))
+
+        async def get_content(skip):
+            return (await self.get(get_skip_top_endpoint(endpoint, skip, page_size)))['content']
+
+        tasks = deque(asyncio.ensure_future(get_content(skip)) for skip in islice(offsets, max_workers))
+        try:
+            while tasks:
+                content = await tasks.popleft()
+                for skip in islice(offsets, 1):
+                    tasks.append(asyncio.ensure_future(get_content(skip)))
+                for item in content:
+                    yield get_trimmed(item, fields) if fields else item
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def get_machines(self, page_size=DEFAULT_PAGE_SIZE, max_workers=DEFAULT_MAX_WORKERS, fields=None):
+        """ yield all machines using concurrent $skip/$top paging
+        """
+        return self.get_collection('/iaas/api/machines', page_size=page_size, max_workers=max_workers, fields=fields)
+
+    def get_deployments(self, resource_types='Cloud.vSphere.Machine', status='CREATE_SUCCESSFUL',
+                        page_size=DEFAULT_PAGE_SIZE, max_workers=DEFAULT_MAX_WORKERS, fields=None):
+        """ yield all deployments with resource_types and status using concurrent $skip/$top paging
+        """
+        parameters = []
+        if resource_types:
+            parameters.append('resourceTypes={}'.format(resource_types))
+        if status:
+            parameters.append('status={}'.format(status))
+        endpoint = '/deployment/api/deployments'
+        if parameters:
+            endpoint = '{}?{}'.format(endpoint, '&'.join(parameters))
+        return self.get_collection(endpoint, page_size=page_size, max_workers=max_workers, fields=fields)
+
+    def get_quota_policies(self, page_size=DEFAULT_PAGE_SIZE, max_workers=DEFAULT_MAX_WORKERS, fields=None):
+        """ yield all resource quota policies using concurrent $skip/$top paging
+        """
+        return self.get_collection(
+            '/policy/api/policies?search=Resource Quota', page_size=page_size, max_workers=max_workers, fields=fields)
+
+    async def get_resources(self, page_size=None, filter=None, fields=None):
+        """ get resources
+
+            returns async generator of pages when page_size is specified otherwise list of all resources
+        """
+        api_endpoint = get_paged_endpoint(
+            '/catalog-service/api/consumer/resources', page_size=page_size, orderby='dateCreated', filter=filter, fields=fields)
+        if page_size:
+            return self.get_page(api_endpoint, fields=fields)
+        return await self.get_all(api_endpoint, fields=fields)
+
+    async def get_resources_deploymentsapi(self, page_size=None, filter=None, fields=None):
+        """ get deployments
+
+            returns async generator of pages when page_size is specified otherwise list of all deployments
+        """
+        api_endpoint = get_paged_endpoint(
+            '/deployment/api/deployments', page_size=page_size, orderby='dateCreated', filter=filter, fields=fields)
+        if page_size:
+            return self.get_page(api_endpoint, fields=fields)
+        return await self.get_all(api_endpoint, fields=fields)
+
+    async def get_reservations(self, page_size=None, filter=None, fields=None):
+        """ get reservations
+
+            returns async generator of pages when page_size is specified otherwise list of all reservations
+        """
+        api_endpoint = get_paged_endpoint(
+            '/reservation-service/api/reservations', page_size=page_size, orderby='id', filter=filter, fields=fields)
+        if page_size:
+            return self.get_page(api_endpoint, fields=fields)
+        return await self.get_all(api_endpoint, fields=fields)
+
+    async def get_subtenants(self):
+        """ get subtenants
+        """
+        return await self.get_all(
+            get_paged_endpoint('/iaas/api/projects', page_size=SUBTENANTS_LIMIT, orderby='id'))
+
+    async def get_new(self, url, access_token, key=None):
+        """ return json from GET of absolute url using access_token, or only its key when specified
+        """
+        headers = {
+            'accept': 'application/json',
+            'authorization': access_token
+        }
+        api_output = await self.get(url, headers=headers)
+        if key:
+            return api_output[key]
+        return api_output
+
+    async def get_resources_deploymentsapi_new(self, access_token, hostname):
+        return await self.get_new(
+            'https://{}/deployment/api/deployments?resourceTypes=Cloud.vSphere.Machine&size=200'.format(hostname),
+            access_token)
+
+    async def get_resources_deploymentsapi_details_new(self, access_token, hostname, num):
+        return await self.get_new(
+            'https://{}/deployment/api/deployments?resourceTypes=Cloud.vSphere.Machine&$top=200&$skip={}&status=CREATE_SUCCESSFUL'.format(hostname, num),
+            access_token, key='content')
+
+    async def get_subtenants_new(self, access_token, hostname):
+        return await self.get_new(
+            'https://{}/iaas/api/projects?size=10000'.format(hostname), access_token, key='content')
+
+    async def get_reservations_new(self, access_token, hostname):
+        return await self.get_new(
+            'https://{}/policy/api/policies?search=Resource Quota&size=200'.format(hostname), access_token)
+
+    async def get_reservations_new_page(self, access_token, hostname, num):
+        return await self.get_new(
+            'https://{}/policy/api/policies?search=Resource Quota&$top=200&$skip={}'.format(hostname, num),
+            access_token, key='content')
+
+    async def get_reservations_new_details(self, access_token, hostname, ID):
+        return await self.get_new(
+            'https://{}/policy/api/policies/{}'.format(hostname, ID), access_token)
+
+    async def get_vmdetails(self, access_token, hostname):
+        return await self.get_new(
+            'https://{}/iaas/api/machines?'.format(hostname), access_token)
+
+    async def get_vmdetails_name(self, access_token, hostname, num):
+        return await self.get_new(
+            'https://{}/iaas/api/machines?&$top=200&$skip={}'.format(hostname, num), access_token, key='content')
+
+    async def get_vmdetails_hostname(self, access_token, hostname, ID):
+        return await self.get_new(
+            'https://{}/iaas/api/machines?$filter=name eq {}'.format(hostname, ID), access_token)
+
+    async def get_vmdetails_deployment(self, access_token, hostname, ID):
+        return await self.get_new(
+            'https://{}/deployment/api/deployments?search=deployments_{}'.format(hostname, ID),
+            access_token, key='content')
+
+    async def extend_lease_action(self, server_name=None, days=180, wait_for_request=True):
+        """ extend lease by days for server_name
+
+            see vRAclient.extend_lease_action
+        """
+        lease_days = validate_lease_days(days)
+
+        resource = await self.get_endpoint_resource(
+            endpoint='/catalog-service/api/consumer/resources?withOperations=true',
+            with_filter="tolower(name) eq '{}'".format(server_name.lower()))
+
+        resource_id = resource['id']
+        action_id = get_id(resource['operations'], 'Renew Lease')
+        if not action_id:
+            raise NoPermission(
+                'user "{}" does not have permission to execute operation on server "{}"'.format(
+                    self.username, server_name))
+
+        template = await self.get(
+            '/catalog-service/api/consumer/resources/{}/actions/{}/requests/template'.format(
+                resource_id, action_id))
+        current_time = datetime.utcnow().replace(microsecond=0)
+        new_lease_date = (current_time + timedelta(days=days)).isoformat() + '.000Z'
+
+        logger.debug('submitting request to set new lease date of {} for server {}'.format(new_lease_date, server_name))
+        template['data']['provider-NewLease'] = new_lease_date
+        template['data']['provider-VirtualMachineName'] = server_name
+        template['data']['provider-numIncrement'] = lease_days
+
+        response = await self.request_response(
+            'POST',
+            '/catalog-service/api/consumer/resources/{}/actions/{}/requests'.format(
+                resource_id, action_id),
+            json=template)
+
+        # the id of the submitted request is taken from the response so concurrent renewals cannot be confused
+        request_id = get_request_id(response)
+        if not request_id:
+            request_id = await self.find_resource_request_id(resource_id, current_time)
+
+        if not wait_for_request:
+            return request_id
+
+        return await self.wait_for_request(request_id=request_id)
+
+    async def find_resource_request_id(self, resource_id, since):
+        """ return id of the latest request by the user for resource_id created after since
+
+            see vRAclient.find_resource_request_id
+        """
+        api_endpoint = get_paged_endpoint(
+            '/catalog-service/api/consumer/requests',
+            orderby='dateCreated desc',
+            filter="startswith(requestedBy, '{}') and dateCreated gt '{}'".format(self.username, since.isoformat()))
+        async for data in self.get_page(api_endpoint):
+            for request in data:
+                if request.get('resourceRef', {}).get('id') == resource_id:
+                    return request['id']
+
+        raise ResourceNotFound(
+            'unable to locate request for resource "{}" created after "{}"'.format(resource_id, since.isoformat()))
+
+    async def extend_lease(self, server_names=None, days=180, wait_for_request=True):
+        """ extend lease by days for all server_names
+
+            see vRAclient.extend_lease
+        """
+        lease_days = validate_lease_days(days)
+
+        catalog_item = await self.get_endpoint_resource(
+            endpoint='/catalog-service/api/consumer/entitledCatalogItems',
+            with_filter="tolower(name) eq 'renew multiple leases'")
+        catalog_id = catalog_item['catalogItem']['id']
+
+        template = await self.get(
+            '/catalog-service/api/consumer/entitledCatalogItems/{}/requests/template'.format(catalog_id))
+        template['data']['numIncrement'] = lease_days
+        template['data']['vmNames'] = server_names
+
+        response = await self.post(
+            '/catalog-service/api/consumer/entitledCatalogItems/{}/requests'.format(catalog_id),
+            json=template)
+        request_id = response['id']
+
+        if not wait_for_request:
+            return request_id
+
+        return await self.wait_for_request(request_id=request_id)
+
+    @classmethod
+    async def get_vRAclient(cls, hostname=None, username=None, password=None, tenant=None, token_cache=None, **kwargs):
+        """ return instance of AsyncvRAclient
+
+            Args:
+                hostname (str): the host for the vRA REST API
+                username (str): username
+                password (str): password
+                tenant (str): tenant
+                token_cache (str): file to persist tokens to, default is VRA_TOKEN_CACHE environment variable
+                    or no file
+                kwargs (dict): options passed to the client
+
+            Returns:
+                AsyncvRAclient: instance of AsyncvRAclient
+        """
+        if not hostname:
+            hostname = os.environ.get('VRA_H')
+            if not hostname:
+                hostname = VRA_HOST
+
+        if not username:
+            username = os.environ.get('VRA_U')
+            if not username:
+                raise ValueError('username must be specified or set in VRA_U environment variable')
+
+        if not password:
+            password = os.environ.get('VRA_P')
+            if not password:
+                raise ValueError('password must be specified or set in VRA_P environment variable')
+
+        if not tenant:
+            tenant = os.environ.get('VRA_T')
+            if not tenant:
+                tenant = VRA_TENANT
+
+        if not token_cache:
+            token_cache = os.environ.get('VRA_TOKEN_CACHE')
+
+        token_manager = TokenManager(hostname, username, password, tenant, cache_path=token_cache)
+        client = cls(hostname, username=username, token_manager=token_manager, **kwargs)
+        await client.get_bearer_token()
+        return client
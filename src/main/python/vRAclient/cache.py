@@ -0,0 +1,102 @@
+import copy
+import threading
+from time import monotonic
+from collections import OrderedDict
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_CACHE_SIZE = 1024
+DEFAULT_CACHE_TTL = 300
+# responses with validators are revalidated on every use so they are only evicted when least recently used
+VALIDATED_TTL = float('inf')
+VALIDATOR_HEADERS = (('ETag', 'If-None-Match'), ('Last-Modified', 'If-Modified-Since'))
+
+
+def get_validators(response):
+    """ return dict of ETag and Last-Modified headers of response that it has
+    """
+    return dict((name, response.headers[name]) for name, _ in VALIDATOR_HEADERS if response.headers.get(name))
+
+
+def get_conditional_headers(validators):
+    """ return If-None-Match and If-Modified-Since headers revalidating a response with validators
+    """
+    return dict((conditional, validators[name]) for name, conditional in VALIDATOR_HEADERS if name in validators)
+
+
+class TTLCache(object):
+    """ thread safe cache whose entries expire after ttl seconds, evicting the least recently used entry
+        when maxsize is reached
+    """
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE, ttl=DEFAULT_CACHE_TTL):
+        """ class constructor
+
+            Args:
+                maxsize (int): maximum number of entries
+                ttl (float): seconds an entry is valid for
+
+            Returns:
+                TTLCache: instance of TTLCache
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        with self.lock:
+            return len(self.entries)
+
+    def get(self, key, default=None):
+        """ return value cached for key or default if it is missing or expired
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and entry[1] > monotonic():
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry:
+                del self.entries[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl=None):
+        """ cache value for key for ttl seconds, default is the cache ttl
+        """
+        with self.lock:
+            self.entries[key] = (value, monotonic() + (ttl if ttl is not None else self.ttl))
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def get_or_set(self, key, function, copy_value=False):
+        """ return value cached for key, calling function to compute and cache it when missing
+
+            when copy_value is True a deep copy is returned so callers cannot modify the cached value
+        """
+        value = self.get(key)
+        if value is None:
+            value = function()
+            if value is not None:
+                self.set(key, value)
+        if copy_value:
+            return copy.deepcopy(value)
+        return value
+
+    def invalidate(self, key=None, kind=None):
+        """ remove entry with key, entries whose key is a tuple starting with kind, or all entries
+        """
+        with self.lock:
+            if key is not None:
+                self.entries.pop(key, None)
+            elif kind is not None:
+                for cached_key in [cached_key for cached_key in self.entries if cached_key[0] == kind]:
+                    del self.entries[cached_key]
+            else:
+                self.entries.clear()
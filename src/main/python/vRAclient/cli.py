@@ -0,0 +1,163 @@
+import sys
+import csv
+import json
+import argparse
+from itertools import chain
+from itertools import islice
+
+from .vraclient import vRAclient
+from .paging import DEFAULT_PAGE_SIZE
+from .paging import DEFAULT_MAX_WORKERS
+from .ratelimit import RateLimiter
+from .trace import Tracer
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+FORMATS = ('jsonl', 'csv')
+
+
+def get_resources(client, page_size, max_workers, fields):
+    """ yield resources a page at a time
+    """
+    for page in client.get_resources(page_size=page_size, fields=fields):
+        for item in page:
+            yield item
+
+
+COLLECTIONS = {
+    'resources': get_resources,
+    'deployments': lambda client, page_size, max_workers, fields: client.get_deployments(
+        page_size=page_size, max_workers=max_workers, fields=fields),
+    'machines': lambda client, page_size, max_workers, fields: client.get_machines(
+        page_size=page_size, max_workers=max_workers, fields=fields),
+    'projects': lambda client, page_size, max_workers, fields: client.get_projects(
+        page_size=page_size, max_workers=max_workers, fields=fields),
+    'quota_policies': lambda client, page_size, max_workers, fields: client.get_quota_policies(
+        page_size=page_size, max_workers=max_workers, fields=fields)
+}
+
+
+def get_positive_int(value):
+    """ return value as int, argparse reports a usage error if it is not an integer greater than 0
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError('must be an integer greater than 0 - got "{}"'.format(value))
+    return number
+
+
+def get_parser():
+    """ return argument parser
+    """
+    parser = argparse.ArgumentParser(
+        prog='vraclient-export',
+        description='stream a vRA collection to JSON lines or CSV, password is read from the VRA_P environment variable')
+    parser.add_argument('collection', choices=sorted(COLLECTIONS), help='collection to export')
+    parser.add_argument('--format', choices=FORMATS, default='jsonl', help='output format, default is jsonl')
+    parser.add_argument('--output', default='-', help='file to write to, default is stdout')
+    parser.add_argument('--fields', help='comma separated attributes to export, default is all attributes')
+    parser.add_argument('--page-size', type=get_positive_int, default=DEFAULT_PAGE_SIZE, help='items per page, default is 200')
+    parser.add_argument('--max-workers', type=get_positive_int, default=DEFAULT_MAX_WORKERS, help='pages retrieved concurrently, default is 8')
+    parser.add_argument('--max-items', type=int, help='maximum number of items to export, default is all items')
+    parser.add_argument('--rate', type=float, help='maximum requests per second, default is no limit')
+    parser.add_argument('--trace', help='file to write a Chrome trace of all operations and requests to, default is no trace')
+    parser.add_argument('--hostname', help='vRA host, default is VRA_H environment variable')
+    parser.add_argument('--username', help='username, default is VRA_U environment variable')
+    parser.add_argument('--tenant', help='tenant, default is VRA_T environment variable')
+    parser.add_argument('--token-cache', help='file to persist tokens to, default is VRA_TOKEN_CACHE environment variable')
+    parser.add_argument('--verbose', action='store_true', help='log debug messages to stderr')
+    return parser
+
+
+def get_csv_value(value):
+    """ return value as written to a csv cell, objects and arrays are json encoded
+    """
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+def write_jsonl(items, handle):
+    """ write each item as a json document on its own line, return number of items written
+    """
+    count = 0
+    for item in items:
+        handle.write(json.dumps(item))
+        handle.write('\n')
+        count += 1
+    return count
+
+
+def write_csv(items, handle, fields=None):
+    """ write items as csv rows with fields as columns, default is the attributes of the first item
+    """
+    items = iter(items)
+    first = next(items, None)
+    if first is None:
+        if fields:
+            csv.writer(handle).writerow(fields)
+        return 0
+    writer = csv.DictWriter(handle, fieldnames=fields or list(first), extrasaction='ignore')
+    writer.writeheader()
+    count = 0
+    for item in chain([first], items):
+        writer.writerow(dict((name, get_csv_value(value)) for name, value in item.items()))
+        count += 1
+    return count
+
+
+def export(client, collection, handle, format='jsonl', fields=None, page_size=DEFAULT_PAGE_SIZE,
+           max_workers=DEFAULT_MAX_WORKERS, max_items=None):
+    """ write items of collection to handle as they are retrieved, return number of items written
+    """
+    source = COLLECTIONS[collection](client, page_size, max_workers, fields)
+    items = islice(source, max_items) if max_items is not None else source
+    try:
+        if format == 'csv':
+            return write_csv(items, handle, fields=fields)
+        return write_jsonl(items, handle)
+    finally:
+        # stop retrieving pages that will not be written
+        close = getattr(source, 'close', None)
+        if close:
+            close()
+
+
+def main(argv=None):
+    """ console entry point
+    """
+    args = get_parser().parse_args(argv)
+    if args.verbose:
+        logging.basicConfig(stream=sys.stderr, level=logging.DEBUG)
+    fields = [field.strip() for field in args.fields.split(',') if field.strip()] if args.fields else None
+
+    client_kwargs = {}
+    if args.rate:
+        client_kwargs['rate_limiter'] = RateLimiter(rate=args.rate)
+    if args.trace:
+        client_kwargs['tracer'] = Tracer()
+    client = vRAclient.get_vRAclient(
+        hostname=args.hostname, username=args.username, tenant=args.tenant, token_cache=args.token_cache,
+        pool_maxsize=args.max_workers, **client_kwargs)
+    handle = sys.stdout if args.output == '-' else open(args.output, 'w', newline='')
+    try:
+        count = export(
+            client, args.collection, handle, format=args.format, fields=fields, page_size=args.page_size,
+            max_workers=args.max_workers, max_items=args.max_items)
+    finally:
+        if handle is not sys.stdout:
+            handle.close()
+        client.close()
+        if args.trace:
+            client_kwargs['tracer'].save(args.trace)
+    logger.debug('exported {} {}'.format(count, args.collection))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
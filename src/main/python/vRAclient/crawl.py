@@ -0,0 +1,149 @@
+import os
+import json
+
+from .paging import DEFAULT_PAGE_SIZE
+from .paging import get_skip_top_endpoint
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+ITEMS_FILE = 'items.jsonl'
+CHECKPOINT_FILE = 'checkpoint.json'
+
+
+class CrawlStore(object):
+    """ local store of crawled items with a checkpoint of the last completed page
+
+        items are appended one json document per line and the checkpoint records the next page and
+        the size of the items file after the last completed page, so a page written when the crawl
+        failed before its checkpoint is discarded on resume
+    """
+
+    def __init__(self, directory):
+        """ class constructor
+
+            Args:
+                directory (str): directory holding the items and checkpoint files
+
+            Returns:
+                CrawlStore: instance of CrawlStore
+        """
+        self.directory = os.path.expanduser(directory)
+        self.items_path = os.path.join(self.directory, ITEMS_FILE)
+        self.checkpoint_path = os.path.join(self.directory, CHECKPOINT_FILE)
+
+    def load_checkpoint(self):
+        """ return checkpoint or None if there is none
+        """
+        if not os.path.exists(self.checkpoint_path):
+            return None
+        with open(self.checkpoint_path) as handle:
+            return json.load(handle)
+
+    def save_checkpoint(self, checkpoint):
+        """ write checkpoint atomically
+        """
+        temporary_path = '{}.{}.tmp'.format(self.checkpoint_path, os.getpid())
+        with open(temporary_path, 'w') as handle:
+            json.dump(checkpoint, handle)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temporary_path, self.checkpoint_path)
+
+    def start(self, endpoint, style, restart=False):
+        """ return checkpoint to continue crawl of endpoint from, starting a new crawl if there is none
+
+            a new crawl is started when restart is True or the stored crawl is of a different endpoint
+        """
+        checkpoint = self.load_checkpoint()
+        if checkpoint and not restart and checkpoint['endpoint'] == endpoint and checkpoint['style'] == style:
+            logger.debug('resuming crawl of "{}" after {} pages'.format(endpoint, checkpoint['pages']))
+            if os.path.exists(self.items_path):
+                with open(self.items_path, 'r+b') as handle:
+                    handle.truncate(checkpoint['size'])
+            return checkpoint
+
+        logger.debug('starting crawl of "{}"'.format(endpoint))
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+        open(self.items_path, 'wb').close()
+        checkpoint = {
+            'endpoint': endpoint,
+            'style': style,
+            'next': endpoint if style == 'link' else None,
+            'skip': 0,
+            'total': None,
+            'pages': 0,
+            'items': 0,
+            'size': 0,
+            'complete': False
+        }
+        self.save_checkpoint(checkpoint)
+        return checkpoint
+
+    def append(self, items, checkpoint):
+        """ append items durably then save checkpoint with the new items file size
+        """
+        with open(self.items_path, 'ab') as handle:
+            for item in items:
+                handle.write(json.dumps(item).encode('utf-8'))
+                handle.write(b'\n')
+            handle.flush()
+            os.fsync(handle.fileno())
+            checkpoint['size'] = handle.tell()
+        checkpoint['pages'] += 1
+        checkpoint['items'] += len(items)
+        self.save_checkpoint(checkpoint)
+
+    def get_items(self):
+        """ yield items of completed pages
+        """
+        checkpoint = self.load_checkpoint()
+        if not checkpoint:
+            return
+        with open(self.items_path, 'rb') as handle:
+            while handle.tell() < checkpoint['size']:
+                line = handle.readline()
+                if not line:
+                    break
+                yield json.loads(line.decode('utf-8'))
+
+
+def crawl_pages(get, store, endpoint, style='link', get_next=None, page_size=DEFAULT_PAGE_SIZE, restart=False):
+    """ retrieve all pages of endpoint into store, resuming after the last completed page of a previous crawl
+
+        Arguments:
+            get (callable) - function returning the decoded page of an endpoint
+            store (CrawlStore) - store of crawled items
+            endpoint (str) - collection endpoint, for link paging the endpoint of the first page
+            style (str) - 'link' to follow next links or 'skip' for $skip/$top paging, default is 'link'
+            get_next (callable) - function returning endpoint of next page from the links of a page, required for link paging
+            page_size (int) - number of items to request per $skip/$top page, default is 200
+            restart (bool) - discard stored items and start over, default is False
+        Returns:
+            dict: checkpoint of the completed crawl
+    """
+    if style not in ('link', 'skip'):
+        raise ValueError('style must be either "link" or "skip"')
+    if style == 'link' and not get_next:
+        raise ValueError('get_next must be provided for link paging')
+
+    checkpoint = store.start(endpoint, style, restart=restart)
+    while not checkpoint['complete']:
+        if style == 'link':
+            page = get(checkpoint['next'])
+            content = page['content'] if page else []
+            next_endpoint = get_next(page['links']) if content else None
+            checkpoint['next'] = next_endpoint
+            checkpoint['complete'] = not next_endpoint
+        else:
+            page = get(get_skip_top_endpoint(endpoint, checkpoint['skip'], page_size))
+            content = page['content']
+            checkpoint['total'] = page.get('totalElements', checkpoint['total'])
+            checkpoint['skip'] += len(content)
+            checkpoint['complete'] = not content or (
+                checkpoint['total'] is not None and checkpoint['skip'] >= checkpoint['total'])
+        store.append(content, checkpoint)
+        logger.debug('crawled {} items in {} pages of "{}"'.format(checkpoint['items'], checkpoint['pages'], endpoint))
+    return checkpoint
@@ -0,0 +1,193 @@
+import threading
+
+from .paging import ordered_map
+from .paging import get_worker_share
+from .paging import DEFAULT_MAX_WORKERS
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+INVENTORY_KINDS = ('machines', 'deployments', 'projects', 'quota_policies')
+
+
+def get_lower(value):
+    """ return value in lower case if it is a string
+    """
+    if isinstance(value, str):
+        return value.lower()
+    return value
+
+
+def get_index(items, attribute, key=None):
+    """ return dict of attribute value to item, items without the attribute are skipped
+    """
+    index = {}
+    for item in items:
+        value = item.get(attribute)
+        if value is not None:
+            index[key(value) if key else value] = item
+    return index
+
+
+def get_groups(items, attribute, key=None):
+    """ return dict of attribute value to list of items having that value, items without the attribute are skipped
+    """
+    groups = {}
+    for item in items:
+        value = item.get(attribute)
+        if value is not None:
+            groups.setdefault(key(value) if key else value, []).append(item)
+    return groups
+
+
+class Inventory(object):
+    """ in memory inventory of machines, deployments, projects and quota policies with hash indexes
+
+        the collections are retrieved with one bulk crawl each so lookups by id, name, project or
+        deployment are dictionary lookups instead of a request per item; names are matched case insensitively
+    """
+
+    def __init__(self, client=None, machines=None, deployments=None, projects=None, quota_policies=None):
+        """ class constructor
+
+            Args:
+                client (vRAclient): client used to crawl the collections on refresh
+                machines (list): machines, default is none
+                deployments (list): deployments, default is none
+                projects (list): projects, default is none
+                quota_policies (list): resource quota policies, default is none
+
+            Returns:
+                Inventory: instance of Inventory
+        """
+        self.client = client
+        self.lock = threading.Lock()
+        self.collections = {
+            'machines': machines or [],
+            'deployments': deployments or [],
+            'projects': projects or [],
+            'quota_policies': quota_policies or []
+        }
+        self.indexes = self.get_indexes(self.collections)
+
+    @staticmethod
+    def get_indexes(collections):
+        """ return dict of index name to index built from collections
+        """
+        machines = collections['machines']
+        deployments = collections['deployments']
+        projects = collections['projects']
+        quota_policies = collections['quota_policies']
+        return {
+            'machines_by_id': get_index(machines, 'id'),
+            'machines_by_name': get_groups(machines, 'name', key=get_lower),
+            'machines_by_project': get_groups(machines, 'projectId'),
+            'machines_by_deployment': get_groups(machines, 'deploymentId'),
+            'deployments_by_id': get_index(deployments, 'id'),
+            'deployments_by_name': get_groups(deployments, 'name', key=get_lower),
+            'deployments_by_project': get_groups(deployments, 'projectId'),
+            'projects_by_id': get_index(projects, 'id'),
+            'projects_by_name': get_index(projects, 'name', key=get_lower),
+            'quota_policies_by_id': get_index(quota_policies, 'id'),
+            'quota_policies_by_project': get_groups(quota_policies, 'projectId')
+        }
+
+    def get_collection(self, kind, max_workers=DEFAULT_MAX_WORKERS):
+        """ return list of items of kind retrieved with client using up to max_workers concurrent requests
+        """
+        if kind == 'machines':
+            return list(self.client.get_machines(max_workers=max_workers))
+        if kind == 'deployments':
+            return list(self.client.get_deployments(max_workers=max_workers))
+        if kind == 'projects':
+            return list(self.client.get_projects(max_workers=max_workers))
+        if kind == 'quota_policies':
+            return list(self.client.get_quota_policies(max_workers=max_workers))
+        raise ValueError('unknown inventory kind "{}" - must be one of {}'.format(kind, INVENTORY_KINDS))
+
+    def refresh(self, kinds=None, max_workers=DEFAULT_MAX_WORKERS):
+        """ crawl kinds concurrently, default is all kinds, and rebuild the indexes
+
+            max_workers is split between the kinds so all crawls together stay within the connection pool;
+            the new indexes replace the old ones at once so concurrent lookups never see partial indexes
+        """
+        if not self.client:
+            raise ValueError('inventory has no client to refresh from')
+        kinds = list(kinds) if kinds else list(INVENTORY_KINDS)
+        for kind in kinds:
+            if kind not in INVENTORY_KINDS:
+                raise ValueError('unknown inventory kind "{}" - must be one of {}'.format(kind, INVENTORY_KINDS))
+        logger.debug('refreshing inventory {}'.format(kinds))
+        workers = get_worker_share(max_workers, len(kinds))
+        results = list(ordered_map(
+            lambda kind: self.get_collection(kind, max_workers=workers), kinds, max_workers=len(kinds)))
+        with self.lock:
+            collections = dict(self.collections)
+            collections.update(zip(kinds, results))
+            indexes = self.get_indexes(collections)
+            self.collections = collections
+            self.indexes = indexes
+        logger.debug('refreshed inventory {}'.format(
+            dict((kind, len(items)) for kind, items in collections.items())))
+        return self
+
+    def get_machine(self, machine_id):
+        """ return machine with id or None
+        """
+        return self.indexes['machines_by_id'].get(machine_id)
+
+    def get_machines_by_name(self, name):
+        """ return list of machines with name
+        """
+        return self.indexes['machines_by_name'].get(get_lower(name), [])
+
+    def get_machines_by_project(self, project_id):
+        """ return list of machines in project
+        """
+        return self.indexes['machines_by_project'].get(project_id, [])
+
+    def get_machines_by_deployment(self, deployment_id):
+        """ return list of machines in deployment
+        """
+        return self.indexes['machines_by_deployment'].get(deployment_id, [])
+
+    def get_deployment(self, deployment_id):
+        """ return deployment with id or None
+        """
+        return self.indexes['deployments_by_id'].get(deployment_id)
+
+    def get_deployments_by_name(self, name):
+        """ return list of deployments with name
+        """
+        return self.indexes['deployments_by_name'].get(get_lower(name), [])
+
+    def get_deployments_by_project(self, project_id):
+        """ return list of deployments in project
+        """
+        return self.indexes['deployments_by_project'].get(project_id, [])
+
+    def get_machine_deployment(self, machine):
+        """ return deployment of machine or None
+        """
+        return self.get_deployment(machine.get('deploymentId'))
+
+    def get_project(self, project_id):
+        """ return project with id or None
+        """
+        return self.indexes['projects_by_id'].get(project_id)
+
+    def get_project_by_name(self, name):
+        """ return project with name or None
+        """
+        return self.indexes['projects_by_name'].get(get_lower(name))
+
+    def get_quota_policy(self, policy_id):
+        """ return quota policy with id or None
+        """
+        return self.indexes['quota_policies_by_id'].get(policy_id)
+
+    def get_quota_policies_by_project(self, project_id):
+        """ return list of quota policies of project
+        """
+        return self.indexes['quota_policies_by_project'].get(project_id, [])
@@ -0,0 +1,51 @@
+import logging
+logger = logging.getLogger(__name__)
+
+
+def get_prefixed(item, prefix):
+    """ return copy of item with prefix added to each top level attribute name
+    """
+    return dict(('{}{}'.format(prefix, name), value) for name, value in item.items())
+
+
+def get_hash_table(items, key):
+    """ return dict of key attribute value to list of items having that value, items without the key are skipped
+    """
+    table = {}
+    for item in items:
+        value = item.get(key)
+        if value is not None:
+            table.setdefault(value, []).append(item)
+    return table
+
+
+def hash_join(records, items, record_key, item_key, prefix, outer=True):
+    """ yield records joined with items where record[record_key] equals item[item_key]
+
+        a hash table is built from items, which should be the smaller side of the join, and records are
+        streamed through it one at a time so memory is bounded by the size of items; the attributes of
+        matching items are added to each record with prefix, a record matching several items is yielded
+        once per item, and records without a match are yielded unchanged when outer is True
+
+        Arguments:
+            records (iterable) - flat records to probe with
+            items (iterable) - items to build the hash table from
+            record_key (str) - name of the record attribute to join on
+            item_key (str) - name of the item attribute to join on
+            prefix (str) - prefix added to the attribute names of items
+            outer (bool) - yield records without matching items, default is True
+        Returns:
+            generator of flat records
+    """
+    table = get_hash_table(items, item_key)
+    logger.debug('built hash table of {} {} keys'.format(len(table), item_key))
+    for record in records:
+        matches = table.get(record.get(record_key))
+        if not matches:
+            if outer:
+                yield record
+            continue
+        for item in matches:
+            joined = dict(record)
+            joined.update(get_prefixed(item, prefix))
+            yield joined
@@ -0,0 +1,217 @@
+import threading
+from bisect import bisect_left
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+PREFIX = 'vraclient'
+
+
+def get_label_value(value):
+    """ return value escaped for a Prometheus label
+    """
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def get_labels(names, values, extra=None):
+    """ return Prometheus label set of names and values, e.g. '{endpoint="/iaas/api/machines",method="GET"}'
+    """
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{{{}}}'.format(','.join('{}="{}"'.format(name, get_label_value(value)) for name, value in pairs))
+
+
+def get_number(value):
+    """ return value formatted as a Prometheus sample value
+    """
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Metrics(object):
+    """ thread safe per endpoint request metrics of a client with Prometheus text export
+
+        endpoints are recorded as templates with ids replaced by {id}; every recorded event is also passed
+        to the registered hooks as hook(event, values) where event is 'request', 'bytes', 'retry', 'pages'
+        or 'token_refresh' and values is a dict of its labels and measurements
+    """
+
+    def __init__(self, latency_buckets=DEFAULT_LATENCY_BUCKETS):
+        """ class constructor
+
+            Args:
+                latency_buckets (tuple): upper bounds in seconds of the request latency histogram buckets
+
+            Returns:
+                Metrics: instance of Metrics
+        """
+        self.latency_buckets = tuple(sorted(latency_buckets))
+        self.hooks = []
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """ clear all metrics, hooks are kept
+        """
+        with self.lock:
+            self.requests = {}
+            self.latencies = {}
+            self.response_bytes = {}
+            self.decoded_bytes = {}
+            self.retries = {}
+            self.pages = {}
+            self.token_refreshes = 0
+
+    def add_hook(self, hook):
+        """ call hook(event, values) for every recorded event
+        """
+        with self.lock:
+            self.hooks.append(hook)
+
+    def remove_hook(self, hook):
+        """ stop calling hook
+        """
+        with self.lock:
+            self.hooks.remove(hook)
+
+    def call_hooks(self, event, values):
+        """ pass event to all hooks, an exception raised by a hook is logged and ignored
+        """
+        for hook in list(self.hooks):
+            try:
+                hook(event, values)
+            except Exception as exception:
+                logger.error('metrics hook failed on {} event - {}'.format(event, str(exception)))
+
+    def record_request(self, endpoint, method, status, elapsed):
+        """ record request to endpoint that completed with status, a status code or exception name, after elapsed seconds
+        """
+        with self.lock:
+            key = (endpoint, method, status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            histogram = self.latencies.get((endpoint, method))
+            if histogram is None:
+                histogram = self.latencies[(endpoint, method)] = {
+                    'buckets': [0] * len(self.latency_buckets), 'sum': 0.0, 'count': 0}
+            index = bisect_left(self.latency_buckets, elapsed)
+            if index < len(self.latency_buckets):
+                histogram['buckets'][index] += 1
+            histogram['sum'] += elapsed
+            histogram['count'] += 1
+        self.call_hooks('request', {'endpoint': endpoint, 'method': method, 'status': status, 'elapsed': elapsed})
+
+    def record_bytes(self, endpoint, wire_bytes, decoded_bytes):
+        """ record bytes of a response of endpoint received on the wire and after content decoding
+        """
+        with self.lock:
+            self.response_bytes[endpoint] = self.response_bytes.get(endpoint, 0) + wire_bytes
+            self.decoded_bytes[endpoint] = self.decoded_bytes.get(endpoint, 0) + decoded_bytes
+        self.call_hooks('bytes', {'endpoint': endpoint, 'wire_bytes': wire_bytes, 'decoded_bytes': decoded_bytes})
+
+    def record_retry(self, endpoint, method, reason):
+        """ record retry of request to endpoint because of reason, a status code or exception name
+        """
+        with self.lock:
+            key = (endpoint, method, reason)
+            self.retries[key] = self.retries.get(key, 0) + 1
+        self.call_hooks('retry', {'endpoint': endpoint, 'method': method, 'reason': reason})
+
+    def record_pages(self, endpoint, pages):
+        """ record number of pages retrieved by one crawl of collection endpoint
+        """
+        with self.lock:
+            counters = self.pages.setdefault(endpoint, {'sum': 0, 'count': 0})
+            counters['sum'] += pages
+            counters['count'] += 1
+        self.call_hooks('pages', {'endpoint': endpoint, 'pages': pages})
+
+    def record_token_refresh(self):
+        """ record refresh of the bearer token
+        """
+        with self.lock:
+            self.token_refreshes += 1
+        self.call_hooks('token_refresh', {})
+
+    def get_stats(self):
+        """ return dict of endpoint template to its request, latency, bytes, retry and page counters
+        """
+        stats = {}
+
+        def get_endpoint_stats(endpoint):
+            return stats.setdefault(endpoint, {
+                'requests': 0, 'errors': 0, 'latency_sum': 0.0, 'wire_bytes': 0, 'decoded_bytes': 0,
+                'retries': 0, 'crawls': 0, 'pages': 0})
+
+        with self.lock:
+            for (endpoint, _, status), count in self.requests.items():
+                endpoint_stats = get_endpoint_stats(endpoint)
+                endpoint_stats['requests'] += count
+                if not isinstance(status, int) or status >= 400:
+                    endpoint_stats['errors'] += count
+            for (endpoint, _), histogram in self.latencies.items():
+                get_endpoint_stats(endpoint)['latency_sum'] += histogram['sum']
+            for endpoint, wire_bytes in self.response_bytes.items():
+                get_endpoint_stats(endpoint)['wire_bytes'] += wire_bytes
+                get_endpoint_stats(endpoint)['decoded_bytes'] += self.decoded_bytes[endpoint]
+            for (endpoint, _, _), count in self.retries.items():
+                get_endpoint_stats(endpoint)['retries'] += count
+            for endpoint, counters in self.pages.items():
+                get_endpoint_stats(endpoint)['crawls'] += counters['count']
+                get_endpoint_stats(endpoint)['pages'] += counters['sum']
+        for endpoint_stats in stats.values():
+            endpoint_stats['latency_mean'] = (
+                endpoint_stats['latency_sum'] / endpoint_stats['requests'] if endpoint_stats['requests'] else None)
+        return stats
+
+    def get_prometheus(self):
+        """ return all metrics in Prometheus text exposition format
+        """
+        lines = []
+
+        def add_metric(name, kind, description, samples):
+            lines.append('# HELP {}_{} {}'.format(PREFIX, name, description))
+            lines.append('# TYPE {}_{} {}'.format(PREFIX, name, kind))
+            for suffix, labels, value in samples:
+                lines.append('{}_{}{}{} {}'.format(PREFIX, name, suffix, labels, get_number(value)))
+
+        with self.lock:
+            add_metric('requests_total', 'counter', 'Requests sent by endpoint, method and status.', [
+                ('', get_labels(('endpoint', 'method', 'status'), key), count)
+                for key, count in sorted(self.requests.items(), key=lambda entry: str(entry[0]))])
+
+            samples = []
+            for key, histogram in sorted(self.latencies.items()):
+                cumulative = 0
+                for bound, count in zip(self.latency_buckets, histogram['buckets']):
+                    cumulative += count
+                    samples.append(('_bucket', get_labels(('endpoint', 'method'), key, ('le', get_number(float(bound)))), cumulative))
+                samples.append(('_bucket', get_labels(('endpoint', 'method'), key, ('le', '+Inf')), histogram['count']))
+                samples.append(('_sum', get_labels(('endpoint', 'method'), key), histogram['sum']))
+                samples.append(('_count', get_labels(('endpoint', 'method'), key), histogram['count']))
+            add_metric('request_duration_seconds', 'histogram', 'Request latency in seconds by endpoint and method.', samples)
+
+            add_metric('response_bytes_total', 'counter', 'Response bytes received on the wire by endpoint.', [
+                ('', get_labels(('endpoint',), (endpoint,)), count) for endpoint, count in sorted(self.response_bytes.items())])
+            add_metric('response_decoded_bytes_total', 'counter', 'Response bytes after content decoding by endpoint.', [
+                ('', get_labels(('endpoint',), (endpoint,)), count) for endpoint, count in sorted(self.decoded_bytes.items())])
+
+            add_metric('retries_total', 'counter', 'Retried requests by endpoint, method and reason.', [
+                ('', get_labels(('endpoint', 'method', 'reason'), key), count)
+                for key, count in sorted(self.retries.items(), key=lambda entry: str(entry[0]))])
+
+            samples = []
+            for endpoint, counters in sorted(self.pages.items()):
+                samples.append(('_sum', get_labels(('endpoint',), (endpoint,)), counters['sum']))
+                samples.append(('_count', get_labels(('endpoint',), (endpoint,)), counters['count']))
+            add_metric('crawl_pages', 'summary', 'Pages retrieved per collection crawl by endpoint.', samples)
+
+            add_metric('token_refreshes_total', 'counter', 'Bearer token refreshes.', [('', '', self.token_refreshes)])
+        return '\n'.join(lines) + '\n'
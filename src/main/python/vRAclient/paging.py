@@ -0,0 +1,328 @@
+import threading
+from time import monotonic
+from queue import Queue
+from queue import Full
+from collections import deque
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_PAGE_SIZE = 200
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_PREFETCH_DEPTH = 1
+PUT_TIMEOUT = 0.1
+DEFAULT_TARGET_LATENCY = 1.0
+DEFAULT_MIN_PAGE_SIZE = 50
+DEFAULT_MAX_PAGE_SIZE = 2000
+
+
+def get_skip_offsets(total, page_size, start=0):
+    """ return list of $skip offsets needed to retrieve total items starting at start
+    """
+    if page_size < 1:
+        raise ValueError('page size must be integer value greater than 0')
+    return list(range(start, total, page_size))
+
+
+def get_skip_top_endpoint(endpoint, skip, top):
+    """ return endpoint with $skip and $top query parameters appended
+    """
+    separator = '?'
+    if '?' in endpoint:
+        separator = '&'
+    return '{}{}$top={}&$skip={}'.format(endpoint, separator, top, skip)
+
+
+def get_worker_share(max_workers, crawls):
+    """ return workers of each of crawls concurrent crawls so together they use at most max_workers connections
+
+        every crawl gets at least one worker so crawls beyond max_workers still proceed
+    """
+    return max(max_workers // max(crawls, 1), 1)
+
+
+def ordered_map(function, items, max_workers=DEFAULT_MAX_WORKERS):
+    """ yield function(item) for each item in order while executing calls on a bounded thread pool
+
+        at most 2 * max_workers calls are in flight at any time so results are streamed to the caller
+        as soon as all earlier results are available; pending calls are cancelled if the caller stops early
+    """
+    items = iter(items)
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    futures = deque()
+    try:
+        for item in islice(items, max_workers * 2):
+            futures.append(executor.submit(function, item))
+        while futures:
+            result = futures.popleft().result()
+            for item in islice(items, 1):
+                futures.append(executor.submit(function, item))
+            yield result
+    finally:
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+
+def prefetch(items, depth=DEFAULT_PREFETCH_DEPTH):
+    """ yield items of iterable while a background thread reads up to depth items ahead of the caller
+
+        the next items are retrieved while the caller processes the current one; when the caller stops
+        early the background thread stops reading, closes items and exits after any read in progress,
+        and an exception raised by items is raised to the caller in order
+    """
+    if depth < 1:
+        raise ValueError('prefetch depth must be integer value greater than 0')
+    done = object()
+    queue = Queue(maxsize=depth)
+    stopped = threading.Event()
+
+    def put(entry):
+        while not stopped.is_set():
+            try:
+                queue.put(entry, timeout=PUT_TIMEOUT)
+                return True
+            except Full:
+                continue
+        return False
+
+    def read():
+        try:
+            for item in items:
+                if not put((item, None)):
+                    return
+            put((done, None))
+        except Exception as exception:
+            put((None, exception))
+        finally:
+            close = getattr(items, 'close', None)
+            if close:
+                close()
+
+    thread = threading.Thread(target=read, name='prefetch', daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, exception = queue.get()
+            if exception:
+                raise exception
+            if item is done:
+                return
+            yield item
+    finally:
+        stopped.set()
+
+
+class PageSizeTuner(object):
+    """ tune $top page size so each page takes about target seconds to retrieve
+
+        the size changes by at most a factor of 2 per page and never exceeds the largest page the
+        server was observed to return
+    """
+
+    def __init__(self, target=DEFAULT_TARGET_LATENCY, minimum=DEFAULT_MIN_PAGE_SIZE, maximum=DEFAULT_MAX_PAGE_SIZE):
+        """ class constructor
+
+            Args:
+                target (float): seconds each page should take to retrieve
+                minimum (int): smallest page size
+                maximum (int): largest page size
+
+            Returns:
+                PageSizeTuner: instance of PageSizeTuner
+        """
+        self.target = target
+        self.minimum = min(minimum, maximum)
+        self.maximum = maximum
+
+    def cap(self, size):
+        """ limit page size to size the server was observed to cap $top at
+        """
+        self.maximum = max(1, min(self.maximum, size))
+        self.minimum = min(self.minimum, self.maximum)
+
+    def get_next(self, size, elapsed):
+        """ return size of next page given size of last page and seconds it took to retrieve
+        """
+        factor = 2.0
+        if elapsed > 0:
+            factor = max(0.5, min(2.0, self.target / elapsed))
+        return int(max(self.minimum, min(self.maximum, size * factor)))
+
+
+class Paginator(object):
+    """ iterate pages or items of a collection paged either by next links or by $skip/$top
+
+        link paged collections are read one page after another following the next link of each page;
+        $skip/$top paged collections read the first page to learn the total and the server page size,
+        then either retrieve the remaining pages concurrently or, with a single worker, one after another
+        with the page size tuned to the observed latency; pages can be prefetched in the background and
+        the total number of items can be capped
+    """
+
+    def __init__(self, get, endpoint, style='skip', get_next=None, page_size=DEFAULT_PAGE_SIZE, max_workers=1,
+                 prefetch_depth=None, max_items=None, tuner=None, record_pages=None):
+        """ class constructor
+
+            Args:
+                get (callable): function returning the decoded page of an endpoint
+                endpoint (str): collection endpoint, for link paging the endpoint of the first page
+                style (str): 'link' to follow next links or 'skip' for $skip/$top paging, default is 'skip'
+                get_next (callable): function returning endpoint of next page from the links of a page, required for link paging
+                page_size (int): number of items to request per $skip/$top page, default is 200
+                max_workers (int): maximum number of $skip/$top pages retrieved concurrently, default is 1
+                prefetch_depth (int): number of pages retrieved in the background ahead of the caller, default is none
+                max_items (int): maximum number of items to return, default is all items
+                tuner (PageSizeTuner): tunes the page size when $skip/$top pages are retrieved by a single worker
+                record_pages (callable): called with the number of pages retrieved when iteration ends
+
+            Returns:
+                Paginator: instance of Paginator
+        """
+        if style not in ('link', 'skip'):
+            raise ValueError('style must be either "link" or "skip"')
+        if style == 'link' and not get_next:
+            raise ValueError('get_next must be provided for link paging')
+        if page_size < 1:
+            raise ValueError('page size must be integer value greater than 0')
+        self.get = get
+        self.endpoint = endpoint
+        self.style = style
+        self.get_next = get_next
+        self.page_size = page_size
+        self.max_workers = max_workers
+        self.prefetch_depth = prefetch_depth
+        self.max_items = max_items
+        self.tuner = tuner
+        self.record_pages = record_pages
+
+    def __iter__(self):
+        return self.get_items()
+
+    def get_items(self):
+        """ yield items of all pages
+        """
+        for page in self.get_pages():
+            for item in page:
+                yield item
+
+    def get_pages(self):
+        """ return generator of the content of each page
+        """
+        if self.style == 'link':
+            pages = self.get_link_pages()
+        else:
+            pages = self.get_skip_pages()
+        if self.record_pages:
+            pages = self.get_counted_pages(pages)
+        if self.max_items is not None:
+            pages = self.get_limited_pages(pages)
+        if self.prefetch_depth:
+            pages = prefetch(pages, depth=self.prefetch_depth)
+        return pages
+
+    def get_counted_pages(self, pages):
+        """ yield pages and pass the number of pages retrieved to record_pages when iteration ends
+        """
+        count = 0
+        try:
+            for page in pages:
+                count += 1
+                yield page
+        finally:
+            pages.close()
+            self.record_pages(count)
+
+    def get_limited_pages(self, pages):
+        """ yield pages until max_items items have been yielded
+        """
+        count = 0
+        try:
+            for page in pages:
+                remaining = self.max_items - count
+                if len(page) >= remaining:
+                    yield page[:remaining]
+                    return
+                count += len(page)
+                yield page
+        finally:
+            pages.close()
+
+    def get_link_pages(self):
+        """ yield content of the first page and of all following pages
+        """
+        endpoint = self.endpoint
+        while True:
+            logger.debug('retrieving page from "{}"'.format(endpoint))
+            page = self.get(endpoint)
+            if page and page['content']:
+                if isinstance(page['content'], list):
+                    logger.debug('retrieved {} items from "{}"'.format(len(page['content']), endpoint))
+                yield page['content']
+                endpoint = self.get_next(page['links'])
+                if not endpoint:
+                    logger.debug('no more pages to retrieve - exiting')
+                    break
+            else:
+                logger.debug('no page content detected - exiting')
+                break
+
+    def get_skip_page(self, skip, top):
+        """ return content of page of top items starting at skip and seconds it took to retrieve
+        """
+        started = monotonic()
+        content = self.get(get_skip_top_endpoint(self.endpoint, skip, top))['content']
+        return content, monotonic() - started
+
+    def get_skip_pages(self):
+        """ yield content of all $skip/$top pages
+        """
+        page_size = self.page_size
+        if self.max_items is not None:
+            page_size = max(1, min(page_size, self.max_items))
+        first_endpoint = get_skip_top_endpoint(self.endpoint, 0, page_size)
+        logger.debug('retrieving first page from "{}"'.format(first_endpoint))
+        started = monotonic()
+        page = self.get(first_endpoint)
+        elapsed = monotonic() - started
+        content = page['content']
+        total = page.get('totalElements', len(content))
+        if self.max_items is not None:
+            total = min(total, self.max_items)
+        yield content
+
+        if not content or len(content) >= total:
+            return
+
+        if len(content) < page_size:
+            # the server caps $top below the requested page size
+            page_size = len(content)
+            if self.tuner:
+                self.tuner.cap(page_size)
+
+        if self.max_workers > 1:
+            offsets = get_skip_offsets(total, page_size, start=len(content))
+            logger.debug('retrieving {} remaining pages of {} items from "{}"'.format(len(offsets), total, self.endpoint))
+            for content in ordered_map(
+                    lambda skip: self.get(get_skip_top_endpoint(self.endpoint, skip, page_size))['content'],
+                    offsets, max_workers=self.max_workers):
+                yield content
+            return
+
+        skip = len(content)
+        while skip < total:
+            if self.tuner:
+                page_size = self.tuner.get_next(page_size, elapsed)
+            top = min(page_size, total - skip)
+            content, elapsed = self.get_skip_page(skip, top)
+            if not content:
+                return
+            yield content
+            if len(content) < top:
+                page_size = len(content)
+                if self.tuner:
+                    self.tuner.cap(page_size)
+            skip += len(content)
@@ -0,0 +1,97 @@
+import random
+import threading
+from collections import deque
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_INITIAL_DELAY = 1
+DEFAULT_BACKOFF_FACTOR = 2
+DEFAULT_JITTER = 0.1
+DEFAULT_HISTORY_SIZE = 20
+EXPECTED_FRACTION = 0.8
+
+
+class PollSchedule(object):
+    """ schedule of delays between checks that starts fast and backs off exponentially up to maximum
+
+        when the expected completion time is known the first delay waits for most of it and the schedule
+        then restarts from initial so completion is detected shortly after it usually happens
+    """
+
+    def __init__(self, initial=DEFAULT_INITIAL_DELAY, factor=DEFAULT_BACKOFF_FACTOR, maximum=10,
+                 jitter=DEFAULT_JITTER, expected=None):
+        """ class constructor
+
+            Args:
+                initial (float): seconds to wait before the first check
+                factor (float): multiplier applied to the delay after every check
+                maximum (float): maximum seconds between checks
+                jitter (float): fraction of each delay that is randomized
+                expected (float): seconds the request is expected to take to complete
+
+            Returns:
+                PollSchedule: instance of PollSchedule
+        """
+        self.initial = min(initial, maximum)
+        self.factor = factor
+        self.maximum = maximum
+        self.jitter = jitter
+        self.expected = expected
+
+    def get_jittered(self, delay):
+        """ return delay randomized by jitter
+        """
+        if not self.jitter:
+            return delay
+        return max(0, delay * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+    def get_delays(self):
+        """ yield successive delays between checks
+        """
+        if self.expected:
+            yield self.get_jittered(max(self.initial, self.expected * EXPECTED_FRACTION))
+        delay = self.initial
+        while True:
+            yield self.get_jittered(delay)
+            delay = min(delay * self.factor, self.maximum)
+
+
+class CompletionHistory(object):
+    """ thread safe record of how long recent requests for each catalog item took to complete
+    """
+
+    def __init__(self, size=DEFAULT_HISTORY_SIZE):
+        self.size = size
+        self.durations = {}
+        self.lock = threading.Lock()
+
+    def record(self, key, duration):
+        """ record duration in seconds for requests of key
+        """
+        if not key:
+            return
+        with self.lock:
+            if key not in self.durations:
+                self.durations[key] = deque(maxlen=self.size)
+            self.durations[key].append(duration)
+
+    def get_expected(self, key):
+        """ return median duration recorded for key or None
+        """
+        with self.lock:
+            durations = sorted(self.durations.get(key, []))
+        if not durations:
+            return None
+        return durations[len(durations) // 2]
+
+
+def get_request_key(request):
+    """ return key identifying the catalog item or resource action of request
+    """
+    for attribute in ['catalogItemRef', 'resourceActionRef']:
+        reference = request.get(attribute)
+        if reference and reference.get('id'):
+            return reference['id']
+    return request.get('requestedItemName')
@@ -0,0 +1,143 @@
+import threading
+from time import sleep
+from time import monotonic
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+ENDPOINT_FAMILIES = ('catalog-service', 'deployment', 'iaas', 'policy')
+
+
+def get_host(url):
+    """ return host of absolute url or None
+    """
+    if '://' not in url:
+        return None
+    return url.split('://', 1)[1].partition('/')[0].lower()
+
+
+def get_endpoint_family(url):
+    """ return first path segment of url, e.g. 'catalog-service' or 'iaas', or None
+    """
+    path = url.split('?')[0]
+    if '://' in path:
+        path = path.split('://', 1)[1].partition('/')[2]
+    family = path.strip('/').split('/')[0]
+    return family if family else None
+
+
+class TokenBucket(object):
+    """ thread safe token bucket refilled at rate tokens per second up to capacity tokens
+
+        a token is reserved even if the bucket is empty and the caller is told how long to wait for it,
+        so concurrent callers are queued in the order they reserved instead of racing for each refill
+    """
+
+    def __init__(self, rate, capacity=None):
+        """ class constructor
+
+            Args:
+                rate (float): tokens added per second
+                capacity (float): maximum number of tokens, the largest burst allowed, default is one second of tokens
+
+            Returns:
+                TokenBucket: instance of TokenBucket
+        """
+        if rate <= 0:
+            raise ValueError('rate must be greater than 0')
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity else max(1, rate))
+        self.tokens = self.capacity
+        self.updated_at = monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self, tokens=1):
+        """ take tokens from the bucket and return seconds to wait before they may be used
+        """
+        with self.lock:
+            now = monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            self.tokens -= tokens
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+
+class RateLimiter(object):
+    """ limit the rate of requests to each host and to each endpoint family of a host
+
+        a request takes a token from the bucket of its host and from the bucket of its endpoint family
+        when one is configured; one limiter may be shared by any number of clients and threads so their
+        combined traffic stays within the rates the server allows
+    """
+
+    def __init__(self, rate=None, burst=None, hosts=None, families=None):
+        """ class constructor
+
+            Args:
+                rate (float): requests per second to each host, default is no limit per host
+                burst (int): requests allowed at once to a host, default is one second of requests
+                hosts (dict): rate, or tuple of rate and burst, of hostnames overriding rate
+                families (dict): rate, or tuple of rate and burst, of endpoint families on each host,
+                    e.g. {'catalog-service': 5, 'iaas': (20, 40)}
+
+            Returns:
+                RateLimiter: instance of RateLimiter
+        """
+        self.rate = rate
+        self.burst = burst
+        self.hosts = dict((host.lower(), limit) for host, limit in (hosts or {}).items())
+        self.families = dict(families or {})
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def get_limit(self, host, family):
+        """ return tuple of rate and burst configured for host, or for family on host, or None
+        """
+        if family is None:
+            limit = self.hosts.get(host, self.rate)
+            burst = self.burst
+        else:
+            limit = self.families.get(family)
+            burst = None
+        if limit is None:
+            return None
+        if isinstance(limit, (tuple, list)):
+            return limit[0], limit[1]
+        return limit, burst
+
+    def get_bucket(self, host, family=None):
+        """ return bucket of host, or of family on host, creating it on first use, or None if unlimited
+        """
+        key = (host, family)
+        with self.lock:
+            if key not in self.buckets:
+                limit = self.get_limit(host, family)
+                self.buckets[key] = TokenBucket(limit[0], capacity=limit[1]) if limit else None
+            return self.buckets[key]
+
+    def reserve(self, url):
+        """ reserve a request to url and return seconds to wait before sending it
+        """
+        host = get_host(url)
+        families = [None]
+        family = get_endpoint_family(url)
+        if family:
+            families.append(family)
+        wait = 0.0
+        for family in families:
+            bucket = self.get_bucket(host, family)
+            if bucket:
+                wait = max(wait, bucket.reserve())
+        return wait
+
+    def acquire(self, url):
+        """ sleep until a request to url may be sent, return seconds waited
+        """
+        wait = self.reserve(url)
+        if wait > 0:
+            logger.debug('rate limiting request to "{}" - waiting {:.2f}s'.format(url, wait))
+            sleep(wait)
+        return wait
@@ -0,0 +1,97 @@
+import re
+import sys
+import keyword
+from collections import namedtuple
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+def get_value(item, path):
+    """ return value at dotted path in item or None if any part of the path is missing
+    """
+    value = item
+    for name in path.split('.'):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(name)
+    return value
+
+
+def get_attribute_name(name):
+    """ return name as a valid record attribute name
+
+        characters other than letters, digits and underscores become underscores and leading underscores
+        are removed, a name that is then empty or starts with a digit is prefixed with field_ and a python
+        keyword gets a trailing underscore, e.g. resourceType.id becomes resourceType_id, _links becomes
+        links and from becomes from_
+    """
+    attribute = re.sub(r'\W', '_', name).lstrip('_')
+    if not attribute or attribute[0].isdigit():
+        attribute = 'field_{}'.format(attribute)
+    if keyword.iskeyword(attribute):
+        attribute = '{}_'.format(attribute)
+    return attribute
+
+
+def get_intern(value):
+    """ return interned value if it is a string so equal values share one object
+    """
+    if isinstance(value, str):
+        return sys.intern(value)
+    return value
+
+
+class Projection(object):
+    """ projection of items onto compact tuple backed records holding only the declared fields
+
+        records are namedtuples so they carry no per instance dict, and values of interned fields are
+        interned so repeated values such as status or project id are stored once
+    """
+
+    def __init__(self, name, fields, interned=None):
+        """ class constructor
+
+            Args:
+                name (str): name of the record type
+                fields (list|dict): dotted paths to keep, or dict of record attribute name to dotted path in the item,
+                    attribute names are converted with get_attribute_name
+                interned (list): record attribute names whose string values are interned, default is none
+
+            Returns:
+                Projection: instance of Projection
+        """
+        if not isinstance(fields, dict):
+            fields = dict((field, field) for field in fields)
+        self.paths = [(get_attribute_name(attribute), path) for attribute, path in fields.items()]
+        attributes = [attribute for attribute, _ in self.paths]
+        duplicates = sorted(set(attribute for attribute in attributes if attributes.count(attribute) > 1))
+        if duplicates:
+            raise ValueError('fields map to duplicate attribute names {}'.format(duplicates))
+        self.record_type = namedtuple(name, attributes)
+        interned = set(get_attribute_name(attribute) for attribute in (interned or []))
+        unknown = interned - set(attributes)
+        if unknown:
+            raise ValueError('interned fields {} are not projected fields'.format(sorted(unknown)))
+        self.interned = [attribute in interned for attribute, _ in self.paths]
+
+    def project(self, item):
+        """ return record of item
+        """
+        values = []
+        for (_, path), interned in zip(self.paths, self.interned):
+            value = get_value(item, path)
+            values.append(get_intern(value) if interned else value)
+        return self.record_type(*values)
+
+    def project_all(self, items):
+        """ return list of records of items
+        """
+        return [self.project(item) for item in items]
+
+
+def get_projected_pages(pages, projection):
+    """ yield each page of items as a list of records
+    """
+    for page in pages:
+        yield projection.project_all(page)
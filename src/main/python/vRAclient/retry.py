@@ -0,0 +1,160 @@
+import random
+import asyncio
+import threading
+from time import time
+from time import sleep
+from time import monotonic
+from collections import deque
+from email.utils import parsedate_tz
+from email.utils import mktime_tz
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+RETRY_STATUS_CODES = (429, 502, 503, 504)
+# the server did not start processing a request rejected with these so even a POST can be sent again
+REJECTED_STATUS_CODES = (429, 503)
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE')
+DEFAULT_RETRIES = 4
+DEFAULT_RETRY_INITIAL = 1
+DEFAULT_RETRY_FACTOR = 2
+DEFAULT_RETRY_MAXIMUM = 60
+DEFAULT_RETRY_JITTER = 0.2
+DEFAULT_RETRY_BUDGET = 20
+DEFAULT_RETRY_WINDOW = 60
+
+
+def get_retry_after(response):
+    """ return seconds to wait from Retry-After header of response given in seconds or as a date, or None
+    """
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    parsed = parsedate_tz(value)
+    if not parsed:
+        return None
+    return max(0.0, mktime_tz(parsed) - time())
+
+
+class BackoffGate(object):
+    """ gate shared by all threads of a client that holds requests back while the server is throttling
+
+        when one worker is told to back off every worker waits out the same delay instead of each
+        retrying on its own schedule and adding to the load
+    """
+
+    def __init__(self):
+        self.opens_at = 0
+        self.lock = threading.Lock()
+
+    def close(self, delay):
+        """ hold requests back for delay seconds, extending any current hold
+        """
+        with self.lock:
+            self.opens_at = max(self.opens_at, monotonic() + delay)
+
+    def get_wait(self):
+        """ return seconds until requests may be sent
+        """
+        with self.lock:
+            return max(0.0, self.opens_at - monotonic())
+
+    def wait(self):
+        """ sleep until requests may be sent
+        """
+        delay = self.get_wait()
+        while delay > 0:
+            sleep(delay)
+            delay = self.get_wait()
+
+
+class AsyncBackoffGate(BackoffGate):
+    """ backoff gate shared by all tasks of an asyncio client, waiting without blocking the event loop
+    """
+
+    async def wait(self):
+        """ sleep until requests may be sent
+        """
+        delay = self.get_wait()
+        while delay > 0:
+            await asyncio.sleep(delay)
+            delay = self.get_wait()
+
+
+class RetryPolicy(object):
+    """ decide whether and when a failed request is retried
+
+        retries back off exponentially with jitter, honor Retry-After, and are limited both per request
+        and by a budget per endpoint over a sliding window so an endpoint that keeps failing is not hammered
+    """
+
+    def __init__(self, retries=DEFAULT_RETRIES, initial=DEFAULT_RETRY_INITIAL, factor=DEFAULT_RETRY_FACTOR,
+                 maximum=DEFAULT_RETRY_MAXIMUM, jitter=DEFAULT_RETRY_JITTER, budget=DEFAULT_RETRY_BUDGET,
+                 window=DEFAULT_RETRY_WINDOW):
+        """ class constructor
+
+            Args:
+                retries (int): maximum number of retries of a request
+                initial (float): seconds to wait before the first retry
+                factor (float): multiplier applied to the delay after every retry
+                maximum (float): maximum seconds to wait before a retry, a request whose Retry-After is longer
+                    is not retried
+                jitter (float): fraction of each delay that is randomized
+                budget (int): maximum number of retries per endpoint within window
+                window (float): seconds over which the budget applies
+
+            Returns:
+                RetryPolicy: instance of RetryPolicy
+        """
+        self.retries = retries
+        self.initial = initial
+        self.factor = factor
+        self.maximum = maximum
+        self.jitter = jitter
+        self.budget = budget
+        self.window = window
+        self.spent = {}
+        self.lock = threading.Lock()
+
+    def is_retryable(self, method, status_code=None, idempotent=None):
+        """ return True if request with method that failed with status_code, or without response, may be sent again
+        """
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        if status_code is None:
+            return idempotent
+        if status_code in REJECTED_STATUS_CODES:
+            return True
+        return idempotent and status_code in RETRY_STATUS_CODES
+
+    def spend(self, endpoint):
+        """ take one retry from the budget of endpoint, return False if the budget is exhausted
+        """
+        now = monotonic()
+        with self.lock:
+            spent = self.spent.setdefault(endpoint, deque())
+            while spent and spent[0] <= now - self.window:
+                spent.popleft()
+            if len(spent) >= self.budget:
+                return False
+            spent.append(now)
+            return True
+
+    def can_wait(self, retry_after):
+        """ return True if the seconds the server asked to wait with Retry-After are within maximum
+        """
+        return retry_after is None or retry_after <= self.maximum
+
+    def get_delay(self, attempt, retry_after=None):
+        """ return seconds to wait before retry attempt, starting at 0, never less than retry_after when given
+        """
+        delay = min(self.initial * self.factor ** attempt, self.maximum)
+        if self.jitter:
+            delay = delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
@@ -0,0 +1,66 @@
+import requests
+from requests.adapters import HTTPAdapter
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+ACCEPT_ENCODING = 'gzip, deflate'
+SESSION_OPTIONS = ('pool_connections', 'pool_maxsize', 'pool_block', 'keep_alive', 'compress')
+
+
+def get_session(pool_connections=None, pool_maxsize=None, pool_block=False, keep_alive=True, compress=True):
+    """ return requests session backed by a shared connection pool
+
+        Args:
+            pool_connections (int): number of host pools to cache
+            pool_maxsize (int): maximum number of connections kept per host pool
+            pool_block (bool): block when no free connection is available instead of opening an extra one
+            keep_alive (bool): keep connections open between requests, default is True
+            compress (bool): ask for gzip or deflate compressed responses, default is True
+
+        Returns:
+            requests.Session: session that is safe to share across threads
+    """
+    pool_connections = pool_connections if pool_connections else DEFAULT_POOL_CONNECTIONS
+    pool_maxsize = pool_maxsize if pool_maxsize else DEFAULT_POOL_MAXSIZE
+    logger.debug('creating session with {} pools of {} connections'.format(pool_connections, pool_maxsize))
+
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=pool_block)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    if not keep_alive:
+        session.headers['Connection'] = 'close'
+    # session headers are merged into every request including those sending their own headers
+    session.headers['Accept-Encoding'] = ACCEPT_ENCODING if compress else 'identity'
+    return session
+
+
+def get_pool_stats(session):
+    """ return connection reuse statistics for all pools of session
+    """
+    connections = 0
+    requests_sent = 0
+    adapters = []
+    for adapter in session.adapters.values():
+        if adapter in adapters:
+            continue
+        adapters.append(adapter)
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            connections += pool.num_connections
+            requests_sent += pool.num_requests
+    return {
+        'connections': connections,
+        'requests': requests_sent,
+        'reused': max(requests_sent - connections, 0)
+    }
@@ -0,0 +1,171 @@
+import re
+import json
+import codecs
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_CHUNK_SIZE = 65536
+
+WHITESPACE = ' \t\n\r'
+STRUCTURE = re.compile(r'[\[\]{}"]')
+STRING = re.compile(r'["\\]')
+SCALAR_END = re.compile(r'[,\]}\s]')
+
+
+class JsonStreamBuffer(object):
+    """ text buffer over an iterable of json chunks that retains only the value being read
+    """
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.text = ''
+        self.position = 0
+        self.eof = False
+
+    def fill(self):
+        """ append next chunk to buffer dropping everything before position, return False at end of stream
+        """
+        for chunk in self.chunks:
+            if isinstance(chunk, bytes):
+                chunk = self.decoder.decode(chunk)
+            if chunk:
+                self.text = self.text[self.position:] + chunk
+                self.position = 0
+                return True
+        self.eof = True
+        return False
+
+    def peek(self):
+        """ return next non whitespace character without consuming it or None at end of stream
+        """
+        while True:
+            while self.position < len(self.text) and self.text[self.position] in WHITESPACE:
+                self.position += 1
+            if self.position < len(self.text):
+                return self.text[self.position]
+            if not self.fill():
+                return None
+
+    def expect(self, characters):
+        """ consume and return next non whitespace character if it is one of characters
+        """
+        character = self.peek()
+        if character is None or character not in characters:
+            raise ValueError('expected one of "{}" in json stream but found "{}"'.format(characters, character))
+        self.position += 1
+        return character
+
+    def read_value(self):
+        """ consume and return the raw text of the next json value
+        """
+        character = self.peek()
+        if character is None:
+            raise ValueError('unexpected end of json stream')
+        if character in '{["':
+            offset = self.scan_structure()
+        else:
+            offset = self.scan_scalar()
+        value = self.text[self.position:self.position + offset]
+        self.position += offset
+        return value
+
+    def scan_structure(self):
+        """ return length of the object, array or string starting at position, reading more chunks as needed
+        """
+        depth = 0
+        in_string = False
+        # offset is relative to position which does not move while the value is scanned
+        offset = 0
+        while True:
+            index = self.position + offset
+            if in_string:
+                match = STRING.search(self.text, index)
+                if match and match.group() == '\\' and match.end() < len(self.text):
+                    offset = match.end() + 1 - self.position
+                    continue
+                if match and match.group() == '"':
+                    in_string = False
+                    offset = match.end() - self.position
+                    if depth == 0:
+                        return offset
+                    continue
+                if match:
+                    # escape character is the last character in the buffer
+                    offset = match.start() - self.position
+                else:
+                    offset = len(self.text) - self.position
+            else:
+                match = STRUCTURE.search(self.text, index)
+                if match:
+                    offset = match.end() - self.position
+                    character = match.group()
+                    if character == '"':
+                        in_string = True
+                    elif character in '[{':
+                        depth += 1
+                    else:
+                        depth -= 1
+                        if depth == 0:
+                            return offset
+                    continue
+                offset = len(self.text) - self.position
+            if not self.fill():
+                raise ValueError('unexpected end of json stream')
+
+    def scan_scalar(self):
+        """ return length of the number, boolean or null starting at position
+        """
+        while True:
+            match = SCALAR_END.search(self.text, self.position)
+            if match:
+                return match.start() - self.position
+            if not self.fill():
+                return len(self.text) - self.position
+
+
+def iter_json_items(chunks, key='content'):
+    """ yield items of the array stored under key of the json object read incrementally from chunks
+
+        only the item being decoded is held in memory; when key is None the document itself must be an array
+
+        Arguments:
+            chunks (iterable) - bytes or str chunks of a json document
+            key (str) - name of top level attribute holding the array, default is 'content'
+        Returns:
+            generator of decoded items
+    """
+    buffer = JsonStreamBuffer(chunks)
+    if key is None:
+        for item in iter_array(buffer):
+            yield item
+        return
+
+    buffer.expect('{')
+    if buffer.peek() == '}':
+        return
+    while True:
+        name = json.loads(buffer.read_value())
+        buffer.expect(':')
+        if name == key and buffer.peek() == '[':
+            for item in iter_array(buffer):
+                yield item
+            return
+        buffer.read_value()
+        if buffer.expect(',}') == '}':
+            logger.debug('attribute "{}" not found in json stream'.format(key))
+            return
+
+
+def iter_array(buffer):
+    """ yield decoded items of the json array starting at buffer position
+    """
+    buffer.expect('[')
+    if buffer.peek() == ']':
+        return
+    while True:
+        yield json.loads(buffer.read_value())
+        if buffer.expect(',]') == ']':
+            return
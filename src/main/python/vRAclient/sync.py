@@ -0,0 +1,142 @@
+import os
+import json
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+class SyncSource(object):
+    """ description of a collection that can be synchronized incrementally
+    """
+
+    def __init__(self, endpoint, updated, paging='link', select=None, id='id', created=None):
+        """ class constructor
+
+            Args:
+                endpoint (str): collection endpoint, may include query parameters
+                updated (str): name of the timestamp attribute set when an item is created or updated
+                paging (str): 'link' for limit/next link paged collections or 'skip' for $skip/$top paged collections
+                select (str): value of $select that returns only item ids, None if the endpoint does not support it
+                id (str): name of the id attribute
+                created (str): name of the timestamp attribute set when an item is created, gives a stable crawl order
+
+            Returns:
+                SyncSource: instance of SyncSource
+        """
+        if paging not in ('link', 'skip'):
+            raise ValueError('paging must be either "link" or "skip"')
+        self.endpoint = endpoint
+        self.updated = updated
+        self.paging = paging
+        self.select = select
+        self.id = id
+        self.created = created
+
+
+SYNC_SOURCES = {
+    'resources': SyncSource('/catalog-service/api/consumer/resources', 'lastUpdated', created='dateCreated'),
+    'deployments': SyncSource(
+        '/deployment/api/deployments?resourceTypes=Cloud.vSphere.Machine', 'lastUpdatedAt', paging='skip', select='id',
+        created='createdAt'),
+    'machines': SyncSource('/iaas/api/machines', 'updatedAt', paging='skip', select='id', created='createdAt')
+}
+
+
+def get_sync_source(source):
+    """ return SyncSource for source which is either a SyncSource or the name of one in SYNC_SOURCES
+    """
+    if isinstance(source, SyncSource):
+        return source
+    if source not in SYNC_SOURCES:
+        raise ValueError('unknown sync source "{}" - must be one of {}'.format(source, sorted(SYNC_SOURCES)))
+    return SYNC_SOURCES[source]
+
+
+def get_updated_filter(attribute, high_water_mark):
+    """ return filter for items with attribute at or after high_water_mark
+
+        items updated at exactly the high water mark are included again since timestamps of concurrent
+        updates may be equal; applying them twice is harmless
+    """
+    return "{} ge '{}'".format(attribute, high_water_mark)
+
+
+class Snapshot(object):
+    """ local copy of a collection keyed by item id with the high water mark of the last synchronization
+    """
+
+    def __init__(self, items=None, high_water_mark=None):
+        """ class constructor
+
+            Args:
+                items (dict): items keyed by id
+                high_water_mark (str): largest updated timestamp of the items
+
+            Returns:
+                Snapshot: instance of Snapshot
+        """
+        self.items = items if items else {}
+        self.high_water_mark = high_water_mark
+        self.changes = {}
+
+    def __len__(self):
+        return len(self.items)
+
+    def apply(self, items, updated, id='id'):
+        """ insert or replace items advancing the high water mark, return tuple of added and updated counts
+        """
+        added = 0
+        changed = 0
+        for item in items:
+            item_id = item[id]
+            if item_id in self.items:
+                if self.items[item_id] != item:
+                    changed += 1
+            else:
+                added += 1
+            self.items[item_id] = item
+            timestamp = item.get(updated)
+            if timestamp and (not self.high_water_mark or timestamp > self.high_water_mark):
+                self.high_water_mark = timestamp
+        return added, changed
+
+    def reconcile(self, ids):
+        """ remove items whose id is not in ids, return list of removed ids
+        """
+        ids = set(ids)
+        removed = [item_id for item_id in self.items if item_id not in ids]
+        for item_id in removed:
+            del self.items[item_id]
+        return removed
+
+    def get_missing(self, ids):
+        """ return list of ids that have no item in the snapshot
+        """
+        return [item_id for item_id in dict.fromkeys(ids) if item_id not in self.items]
+
+    @classmethod
+    def load(cls, path):
+        """ return snapshot read from path or empty snapshot if path does not exist or is unreadable
+        """
+        path = os.path.expanduser(path)
+        if not os.path.exists(path):
+            return cls()
+        try:
+            with open(path) as handle:
+                data = json.load(handle)
+        except (IOError, ValueError) as exception:
+            logger.warning('unable to read snapshot {} - starting full sync - {}'.format(path, str(exception)))
+            return cls()
+        return cls(items=data.get('items'), high_water_mark=data.get('high_water_mark'))
+
+    def save(self, path):
+        """ write snapshot to path atomically
+        """
+        path = os.path.expanduser(path)
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        temporary_path = '{}.{}.tmp'.format(path, os.getpid())
+        with open(temporary_path, 'w') as handle:
+            json.dump({'high_water_mark': self.high_water_mark, 'items': self.items}, handle)
+        os.replace(temporary_path, path)
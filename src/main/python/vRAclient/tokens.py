@@ -0,0 +1,221 @@
+import os
+import json
+import base64
+import threading
+from time import time
+
+import requests
+from RESTclient import RESTclient
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_REFRESH_MARGIN = 300
+DEFAULT_TOKEN_LIFETIME = 1800
+
+
+def get_refresh_token(hostname, username, password, tenant, session=None, rate_limiter=None):
+    """ return refresh token from CSP login with username and password, waiting for rate_limiter if given
+    """
+    http = session if session else requests
+    url = 'https://{}/csp/gateway/am/api/login?access_token'.format(hostname)
+    if rate_limiter:
+        rate_limiter.acquire(url)
+    response = http.post(
+        url,
+        headers={
+            'Accept': 'application/json',
+            'Content-Type': 'application/json'
+        },
+        json={
+            'username': username,
+            'password': password,
+            'tenant': tenant
+        },
+        verify=RESTclient.cabundle)
+    return response.json()['refresh_token']
+
+
+def get_access_token(hostname, refresh_token, session=None, rate_limiter=None):
+    """ return access token from iaas login with refresh_token, waiting for rate_limiter if given
+    """
+    http = session if session else requests
+    url = 'https://{}/iaas/api/login'.format(hostname)
+    if rate_limiter:
+        rate_limiter.acquire(url)
+    response = http.post(
+        url,
+        data=json.dumps({
+            'refreshToken': refresh_token
+        }),
+        headers={
+            'Content-Type': 'application/json'
+        },
+        verify=RESTclient.cabundle)
+    response.raise_for_status()
+    return response.json()['token']
+
+
+def get_token_expiry(token, default_lifetime=DEFAULT_TOKEN_LIFETIME):
+    """ return expiry time of token read from its jwt exp claim or default_lifetime seconds from now
+    """
+    try:
+        payload = token.split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload.encode('ascii')).decode('utf-8'))['exp'])
+    except Exception:
+        logger.debug('unable to read expiry from token - using default lifetime of {} seconds'.format(default_lifetime))
+        return time() + default_lifetime
+
+
+class TokenManager(object):
+    """ obtain, cache and refresh the bearer token of a user
+
+        the refresh token is used to obtain new access tokens so the password login only happens when
+        there is no valid refresh token; tokens are optionally persisted to cache_path keyed by host,
+        tenant and user so short lived processes can share them
+    """
+
+    def __init__(self, hostname, username, password, tenant, cache_path=None, refresh_margin=DEFAULT_REFRESH_MARGIN,
+                 on_refresh=None, rate_limiter=None):
+        """ class constructor
+
+            Args:
+                hostname (str): the host for the vRA REST API
+                username (str): username
+                password (str): password
+                tenant (str): tenant
+                cache_path (str): file tokens are persisted to with owner only permissions, default is no file
+                refresh_margin (int): seconds before expiry the access token is refreshed, default is 300
+                on_refresh (callable): called without arguments after each refresh of the access token
+                rate_limiter (RateLimiter): limits the rate of login requests, default is no limit
+
+            Returns:
+                TokenManager: instance of TokenManager
+        """
+        self.hostname = hostname
+        self.username = username
+        self.password = password
+        self.tenant = tenant
+        self.cache_path = os.path.expanduser(cache_path) if cache_path else None
+        self.refresh_margin = refresh_margin
+        self.access_token = None
+        self.refresh_token = None
+        self.expires_at = 0
+        self.refreshes = 0
+        self.on_refresh = on_refresh
+        self.rate_limiter = rate_limiter
+        self.lock = threading.RLock()
+        self.load()
+
+    def get_key(self):
+        """ return key tokens are cached under
+        """
+        return '{}|{}|{}'.format(self.hostname, self.tenant, self.username).lower()
+
+    def is_valid(self):
+        """ return True if access token is not within refresh_margin of expiring
+        """
+        return bool(self.access_token) and time() < self.expires_at - self.refresh_margin
+
+    def get_bearer_token(self, session=None):
+        """ return bearer token refreshing access token when it is about to expire
+        """
+        with self.lock:
+            if not self.is_valid():
+                self.refresh(session=session)
+            return 'Bearer {}'.format(self.access_token)
+
+    def refresh(self, session=None):
+        """ obtain new access token using refresh token, logging in with password if refresh token is rejected
+        """
+        with self.lock:
+            access_token = None
+            if self.refresh_token:
+                logger.debug('refreshing access token for {} using refresh token'.format(self.username))
+                try:
+                    access_token = get_access_token(
+                        self.hostname, self.refresh_token, session=session, rate_limiter=self.rate_limiter)
+                except requests.exceptions.HTTPError as exception:
+                    logger.debug('refresh token rejected - {}'.format(str(exception)))
+                    self.refresh_token = None
+
+            if not access_token:
+                logger.debug('obtaining refresh token for {} using password'.format(self.username))
+                self.refresh_token = get_refresh_token(
+                    self.hostname, self.username, self.password, self.tenant, session=session,
+                    rate_limiter=self.rate_limiter)
+                access_token = get_access_token(
+                    self.hostname, self.refresh_token, session=session, rate_limiter=self.rate_limiter)
+
+            self.update(access_token)
+
+    def update(self, access_token, refresh_token=None):
+        """ store access token, and refresh token if given, obtained by a refresh and persist them
+
+            used by refresh and by clients that log in through their own session, e.g. the asyncio client
+        """
+        with self.lock:
+            self.refreshes += 1
+            if refresh_token:
+                self.refresh_token = refresh_token
+            self.access_token = access_token
+            self.expires_at = get_token_expiry(access_token)
+            self.save()
+            if self.on_refresh:
+                self.on_refresh()
+
+    def invalidate(self, bearer_token=None):
+        """ expire access token so it is refreshed on next use
+
+            when bearer_token is given the access token is only expired if it is still the current one,
+            so concurrent callers rejected with the same token trigger a single refresh
+        """
+        with self.lock:
+            if bearer_token and bearer_token != 'Bearer {}'.format(self.access_token):
+                return
+            self.expires_at = 0
+
+    def load(self):
+        """ load tokens from cache file
+        """
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path) as handle:
+                entry = json.load(handle).get(self.get_key())
+        except (IOError, ValueError) as exception:
+            logger.warning('unable to read token cache {} - {}'.format(self.cache_path, str(exception)))
+            return
+        if entry:
+            logger.debug('loaded cached tokens for {}'.format(self.username))
+            self.access_token = entry.get('access_token')
+            self.refresh_token = entry.get('refresh_token')
+            self.expires_at = entry.get('expires_at', 0)
+
+    def save(self):
+        """ save tokens to cache file readable only by the owner
+        """
+        if not self.cache_path:
+            return
+        entries = {}
+        if os.path.exists(self.cache_path):
+            try:
+                with open(self.cache_path) as handle:
+                    entries = json.load(handle)
+            except (IOError, ValueError):
+                entries = {}
+        entries[self.get_key()] = {
+            'access_token': self.access_token,
+            'refresh_token': self.refresh_token,
+            'expires_at': self.expires_at
+        }
+        directory = os.path.dirname(self.cache_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, mode=0o700)
+        temporary_path = '{}.{}.tmp'.format(self.cache_path, os.getpid())
+        descriptor = os.open(temporary_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(descriptor, 'w') as handle:
+            json.dump(entries, handle)
+        os.replace(temporary_path, self.cache_path)
@@ -0,0 +1,127 @@
+import os
+import json
+import inspect
+import functools
+import threading
+from time import perf_counter
+from contextlib import contextmanager
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def null_span():
+    """ context manager recording nothing, used when tracing is off
+    """
+    yield {}
+
+
+class Tracer(object):
+    """ thread safe recorder of timed spans written as a Chrome trace-event file
+
+        each span is a complete event with its start, duration, thread id and arguments; spans of the same
+        thread that overlap in time are shown nested, so an operation shows the HTTP calls and sleeps it made;
+        the file can be opened in Perfetto or chrome://tracing
+    """
+
+    def __init__(self):
+        self.started = perf_counter()
+        self.pid = os.getpid()
+        self.events = []
+        self.threads = {}
+        self.lock = threading.Lock()
+
+    def get_timestamp(self):
+        """ return microseconds since the tracer was created
+        """
+        return (perf_counter() - self.started) * 1000000
+
+    @contextmanager
+    def span(self, name, category='operation', **args):
+        """ record span named name around the block, the yielded dict may be updated with more arguments
+        """
+        thread = threading.current_thread()
+        started = self.get_timestamp()
+        try:
+            yield args
+        except Exception as exception:
+            args['error'] = type(exception).__name__
+            raise
+        finally:
+            event = {
+                'name': name,
+                'cat': category,
+                'ph': 'X',
+                'ts': started,
+                'dur': self.get_timestamp() - started,
+                'pid': self.pid,
+                'tid': thread.ident,
+                'args': args
+            }
+            with self.lock:
+                self.events.append(event)
+                self.threads[thread.ident] = thread.name
+
+    def trace_items(self, name, items, category='operation', **args):
+        """ yield items of generator within a span covering its iteration
+        """
+        with self.span(name, category=category, **args):
+            try:
+                for item in items:
+                    yield item
+            finally:
+                items.close()
+
+    def get_trace(self):
+        """ return recorded spans as a Chrome trace-event document
+        """
+        with self.lock:
+            events = list(self.events)
+            threads = dict(self.threads)
+        metadata = [
+            {'name': 'thread_name', 'ph': 'M', 'pid': self.pid, 'tid': ident, 'args': {'name': name}}
+            for ident, name in sorted(threads.items())
+        ]
+        return {
+            'traceEvents': metadata + sorted(events, key=lambda event: event['ts']),
+            'displayTimeUnit': 'ms'
+        }
+
+    def save(self, path):
+        """ write recorded spans to path as a Chrome trace-event json file
+        """
+        logger.debug('writing {} spans to "{}"'.format(len(self.events), path))
+        with open(os.path.expanduser(path), 'w') as handle:
+            json.dump(self.get_trace(), handle)
+
+    def reset(self):
+        """ discard all recorded spans
+        """
+        with self.lock:
+            self.events = []
+            self.threads = {}
+
+
+def traced(function):
+    """ decorator recording a span of each call of a client method when the client has a tracer
+
+        the span of a generator method covers its iteration; a method returning a generator gets a second
+        span covering the iteration of the returned generator
+    """
+    name = function.__name__
+
+    @functools.wraps(function)
+    def wrapper(self, *args, **kwargs):
+        tracer = self.tracer
+        if not tracer:
+            return function(self, *args, **kwargs)
+        if inspect.isgeneratorfunction(function):
+            return tracer.trace_items(name, function(self, *args, **kwargs))
+        with tracer.span(name):
+            result = function(self, *args, **kwargs)
+        if inspect.isgenerator(result):
+            return tracer.trace_items(name, result)
+        return result
+
+    return wrapper
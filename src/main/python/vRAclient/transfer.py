@@ -0,0 +1,67 @@
+import re
+import threading
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+ID_PATTERN = re.compile(r'^([0-9a-fA-F]{8}-[0-9a-fA-F-]{27,}|[0-9]+|(?=.*[0-9])[0-9a-zA-Z-]{16,})$')
+
+
+def get_endpoint_template(url):
+    """ return path of url without host and query with id segments replaced by {id}
+
+        so requests for different resources of the same collection are counted under one endpoint
+    """
+    path = url.split('?')[0]
+    if '://' in path:
+        path = '/' + path.split('://', 1)[1].partition('/')[2]
+    segments = ['{id}' if ID_PATTERN.match(segment) else segment for segment in path.split('/')]
+    return '/'.join(segments)
+
+
+def get_wire_bytes(response, default):
+    """ return number of bytes read from the connection for response, before content decoding, or default
+    """
+    try:
+        wire_bytes = response.raw.tell()
+    except Exception:
+        return default
+    if isinstance(wire_bytes, int) and wire_bytes > 0:
+        return wire_bytes
+    return default
+
+
+class TransferStats(object):
+    """ thread safe per endpoint counters of bytes received on the wire and after content decoding
+    """
+
+    def __init__(self):
+        self.endpoints = {}
+        self.lock = threading.Lock()
+
+    def record(self, endpoint, wire_bytes, decoded_bytes):
+        """ add one response of endpoint to the counters
+        """
+        with self.lock:
+            counters = self.endpoints.get(endpoint)
+            if counters is None:
+                counters = self.endpoints[endpoint] = {'requests': 0, 'wire_bytes': 0, 'decoded_bytes': 0}
+            counters['requests'] += 1
+            counters['wire_bytes'] += wire_bytes
+            counters['decoded_bytes'] += decoded_bytes
+
+    def get_stats(self):
+        """ return dict of endpoint to copy of its counters including the compression ratio
+        """
+        with self.lock:
+            stats = dict((endpoint, dict(counters)) for endpoint, counters in self.endpoints.items())
+        for counters in stats.values():
+            counters['ratio'] = counters['decoded_bytes'] / counters['wire_bytes'] if counters['wire_bytes'] else None
+        return stats
+
+    def reset(self):
+        """ clear all counters
+        """
+        with self.lock:
+            self.endpoints.clear()
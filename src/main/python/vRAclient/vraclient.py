@@ -1,21 +1,72 @@
 import os
+import copy
 import json
 from time import sleep
+from time import monotonic
 from datetime import datetime
+from datetime import timedelta
 import requests
-from retrying import retry
 from RESTclient import RESTclient
+from .session import get_session
+from .session import get_pool_stats
+from .session import SESSION_OPTIONS
+from .paging import DEFAULT_PAGE_SIZE
+from .paging import DEFAULT_MAX_WORKERS
+from .paging import get_skip_top_endpoint
+from .paging import ordered_map
+from .paging import get_worker_share
+from .paging import Paginator
+from .paging import PageSizeTuner
+from .streaming import DEFAULT_CHUNK_SIZE
+from .streaming import iter_json_items
+from .tokens import TokenManager
+from .tokens import get_refresh_token
+from .tokens import get_access_token
+from .polling import PollSchedule
+from .polling import CompletionHistory
+from .polling import get_request_key
+from .cache import TTLCache
+from .cache import DEFAULT_CACHE_SIZE
+from .cache import DEFAULT_CACHE_TTL
+from .cache import VALIDATED_TTL
+from .cache import get_validators
+from .cache import get_conditional_headers
+from .sync import Snapshot
+from .sync import get_sync_source
+from .sync import get_updated_filter
+from .crawl import CrawlStore
+from .crawl import crawl_pages
+from .inventory import Inventory
+from .join import get_prefixed
+from .join import hash_join
+from .records import get_projected_pages
+from .transfer import TransferStats
+from .transfer import get_endpoint_template
+from .transfer import get_wire_bytes
+from .metrics import Metrics
+from .trace import traced
+from .trace import null_span
+from .retry import RetryPolicy
+from .retry import BackoffGate
+from .retry import REJECTED_STATUS_CODES
+from .retry import RETRY_STATUS_CODES
+from .retry import get_retry_after
 
 import logging
 logger = logging.getLogger(__name__)
 
 logging.getLogger('urllib3.connectionpool').setLevel(logging.CRITICAL)
 
+SUBTENANTS_LIMIT = 1000000
+REQUEST_FILTER_SIZE = 50
 
-# VRA_HOST = 'vradev.fms07vraapp101.fm.intel.com'
-# VRA_TENANT = 'VRADEV' 
+
+VRA_HOST = 'vradev.fms07vraapp101.fm.intel.com'
+VRA_TENANT = 'VRADEV'
 # VRA_HOST = 'it.vra.icloud.intel.com'
 # VRA_TENANT = 'IT'
+
+
 class ResourceNotFound(Exception):
     """ ResourceNotFound
     """
@@ -46,41 +97,17 @@ class NoPermission(Exception):
     pass
 
 
-def get_bearer_token(hostname, username, password, tenant):
+def get_bearer_token(hostname, username, password, tenant, session=None):
     """ return bearer token for vRA
+
+        the login requests are sent through session when provided so they share its connection pool
     """
     endpoint = 'https://{}/csp/gateway/am/api/login?access_token'.format(hostname)
     logger.debug('obtaining bearer token from {}'.format(endpoint))
 
     try:
-        response = requests.post(
-            endpoint,
-            headers={
-                'Accept': 'application/json',
-                'Content-Type': 'application/json'
-            },
-            json={
-                'username': username,
-                'password': password,
-                'tenant': tenant
-            },
-            verify=RESTclient.cabundle)
-
-        refreshtoken = response.json()['refresh_token']
-        endpoint2 =  'https://{}/iaas/api/login'.format(hostname)
-        data = {
-               "refreshToken": refreshtoken }
-        
-        response1 = requests.post(
-            endpoint2,
-            data =json.dumps( data )  ,
-            headers={
-                  'Content-Type': 'application/json'
-                 },
-            verify=RESTclient.cabundle)
-        access_token =  "Bearer " + response1.json()['token']
-        return   access_token
-
+        refresh_token = get_refresh_token(hostname, username, password, tenant, session=session)
+        return 'Bearer ' + get_access_token(hostname, refresh_token, session=session)
 
     except Exception as exception:
         logger.error('error occurred obtaining bearer token from {} - {}'.format(endpoint, str(exception)))
@@ -104,6 +131,100 @@ def get_endpoint_resource_name(endpoint):
     return resource_split[0]
 
 
+def get_or_filter(expression, values):
+    """ return filter joining expression formatted with each value using or
+    """
+    return ' or '.join(expression.format(value) for value in values)
+
+
+def get_chunks(items, size):
+    """ return list of lists of at most size items
+    """
+    return [items[index:index + size] for index in range(0, len(items), size)]
+
+
+def is_request_complete(state, status):
+    """ return True if request state is status or a failed state
+    """
+    return state == status or 'failed' in state
+
+
+def get_paged_endpoint(endpoint, page_size=None, orderby=None, filter=None, fields=None):
+    """ return endpoint with limit, orderby, filter and select query parameters for link paged collections
+    """
+    separator = '?'
+    if '?' in endpoint:
+        separator = '&'
+    api_endpoint = '{}{}limit={}'.format(endpoint, separator, page_size if page_size else 1000)
+    if orderby:
+        api_endpoint = '{}&$orderby={}'.format(api_endpoint, orderby)
+    if filter:
+        api_endpoint = '{}&$filter={}'.format(api_endpoint, filter)
+    return get_select_endpoint(api_endpoint, fields)
+
+
+def get_select_endpoint(endpoint, fields):
+    """ return endpoint with $select query parameter for fields appended, or endpoint if there are no fields
+    """
+    if not fields:
+        return endpoint
+    separator = '?'
+    if '?' in endpoint:
+        separator = '&'
+    return '{}{}$select={}'.format(endpoint, separator, ','.join(fields))
+
+
+def get_trimmed(item, fields):
+    """ return item with only the attributes in fields, for endpoints that ignore $select
+    """
+    if len(item) <= len(fields) and all(name in fields for name in item):
+        return item
+    return dict((name, value) for name, value in item.items() if name in fields)
+
+
+def get_next_page_path(links, hostname):
+    """ return path of next page href in links relative to hostname
+    """
+    for link in links:
+        if link['rel'] == 'next':
+            href = link['href']
+            href_split = href.split(hostname)
+            if len(href_split) > 1:
+                return href_split[1]
+
+
+def get_authorization_header(headers):
+    """ return name of the authorization header in headers or None
+    """
+    for name in headers:
+        if name.lower() == 'authorization':
+            return name
+
+
+def get_json(response):
+    """ return decoded json body of response or None if response has no body
+    """
+    response.raise_for_status()
+    if not response.content:
+        return None
+    return response.json()
+
+
+def get_request_id(response):
+    """ return id of catalog request submitted with response from its body or Location header, or None
+    """
+    if response.content:
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        if isinstance(body, dict) and body.get('id'):
+            return body['id']
+    location = response.headers.get('Location')
+    if location:
+        return location.split('?')[0].rstrip('/').split('/')[-1]
+
+
 def validate_lease_days(days):
     """ validate lease days
     """
@@ -124,20 +245,339 @@ class vRAclient(RESTclient):
             Args:
                 hostname (str): hostname of API server
                 kwargs (dict): arbritrary number of key word arguments
+                    session (requests.Session): session to send all requests through, default is a new pooled session
+                    pool_connections (int): number of host pools to cache, default is 10
+                    pool_maxsize (int): maximum number of connections kept per host pool, default is 10
+                    pool_block (bool): block when pool has no free connection, default is False
+                    keep_alive (bool): keep connections open between requests, default is True
+                    compress (bool): ask for gzip or deflate compressed responses, default is True
+                    token_manager (TokenManager): obtains and refreshes the bearer token, required if
+                        bearer_token is not provided
+                    cache_size (int): maximum number of cached catalog items and templates, default is 1024
+                    cache_ttl (int): seconds cached catalog items and templates are valid, default is 300
+                    retry_policy (RetryPolicy): retries of throttled and failed requests, default is RetryPolicy(),
+                        None disables retries
+                    rate_limiter (RateLimiter): limits the rate of requests, may be shared with other clients,
+                        default is no limit
+                    metrics (Metrics): records request metrics, may be shared with other clients, default is new Metrics
+                    tracer (Tracer): records a span of every operation, HTTP call and sleep, default is no tracing
 
             Returns:
                 vRAclient: instance of vRAclient
         """
         logger.debug('executing vRAclient constructor')
 
-        if 'bearer_token' not in kwargs:
+        if 'bearer_token' not in kwargs and 'token_manager' not in kwargs:
             raise ValueError('a bearer_token must be provided to vRAclient')
 
         if 'username' not in kwargs:
             raise ValueError('a username must be provided to vRAclient')
 
+        session = kwargs.pop('session', None)
+        pool_connections = kwargs.pop('pool_connections', None)
+        pool_maxsize = kwargs.pop('pool_maxsize', None)
+        pool_block = kwargs.pop('pool_block', False)
+        keep_alive = kwargs.pop('keep_alive', True)
+        compress = kwargs.pop('compress', True)
+        token_manager = kwargs.pop('token_manager', None)
+        cache_size = kwargs.pop('cache_size', DEFAULT_CACHE_SIZE)
+        cache_ttl = kwargs.pop('cache_ttl', DEFAULT_CACHE_TTL)
+        retry_policy = kwargs.pop('retry_policy', RetryPolicy())
+        rate_limiter = kwargs.pop('rate_limiter', None)
+        metrics = kwargs.pop('metrics', None)
+        tracer = kwargs.pop('tracer', None)
+
+        if not session:
+            session = get_session(
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                pool_block=pool_block,
+                keep_alive=keep_alive,
+                compress=compress)
+
+        if token_manager and rate_limiter and not token_manager.rate_limiter:
+            token_manager.rate_limiter = rate_limiter
+
+        if 'bearer_token' not in kwargs:
+            with tracer.span('login', category='auth') if tracer else null_span():
+                kwargs['bearer_token'] = token_manager.get_bearer_token(session=session)
+
         super(vRAclient, self).__init__(hostname, **kwargs)
 
+        self.bearer_token = kwargs['bearer_token']
+        self.session = session
+        self.token_manager = token_manager
+        self.completion_history = CompletionHistory()
+        self.cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self.transfer_stats = TransferStats()
+        self.retry_policy = retry_policy
+        self.backoff_gate = BackoffGate()
+        self.rate_limiter = rate_limiter
+        self.metrics = metrics if metrics else Metrics()
+        self.tracer = tracer
+        if token_manager and not token_manager.on_refresh:
+            token_manager.on_refresh = self.metrics.record_token_refresh
+
+    def invalidate_cache(self, kind=None):
+        """ remove cached entries of kind ('catalog_item', 'template' or 'response') or all cached entries
+        """
+        logger.debug('invalidating {} cache entries'.format(kind if kind else 'all'))
+        self.cache.invalidate(kind=kind)
+
+    @traced
+    def get_catalog_item_id(self, name):
+        """ return id of entitled catalog item with name, cached for the cache ttl
+        """
+        def get_catalog_item_id():
+            catalog_item = self.get_endpoint_resource(
+                endpoint='/catalog-service/api/consumer/entitledCatalogItems',
+                with_filter="tolower(name) eq '{}'".format(name.lower()))
+            return catalog_item['catalogItem']['id']
+
+        return self.cache.get_or_set(('catalog_item', name.lower()), get_catalog_item_id)
+
+    @traced
+    def get_template(self, endpoint):
+        """ return copy of request template from endpoint, cached for the cache ttl
+        """
+        return self.cache.get_or_set(('template', endpoint), lambda: self.get(endpoint), copy_value=True)
+
+    @traced
+    def get_cached_json(self, endpoint, headers=None):
+        """ return copy of decoded json from GET of endpoint using the response cache
+
+            a cached response with an ETag or Last-Modified validator is revalidated with If-None-Match or
+            If-Modified-Since and served when the server answers 304; a response without validators is served
+            from the cache for the cache ttl
+        """
+        headers = dict(headers if headers else self.get_headers())
+        authorization = get_authorization_header(headers)
+        key = ('response', endpoint, headers[authorization] if authorization else None)
+        entry = self.cache.get(key)
+        if entry and not entry['validators']:
+            return copy.deepcopy(entry['body'])
+        if entry:
+            headers.update(get_conditional_headers(entry['validators']))
+
+        response = self.request('GET', endpoint, headers=headers)
+        if response.status_code == 304 and entry:
+            logger.debug('cached response of "{}" is not modified'.format(endpoint))
+            entry = {'body': entry['body'], 'validators': dict(entry['validators'], **get_validators(response))}
+        else:
+            entry = {'body': get_json(response), 'validators': get_validators(response)}
+        self.cache.set(key, entry, ttl=VALIDATED_TTL if entry['validators'] else None)
+        return copy.deepcopy(entry['body'])
+
+    def get_bearer_token(self):
+        """ return current bearer token, refreshing it ahead of expiry when a token manager is used
+        """
+        if self.token_manager:
+            if self.tracer and not self.token_manager.is_valid():
+                with self.span('login', category='auth'):
+                    self.bearer_token = self.token_manager.get_bearer_token(session=self.session)
+            else:
+                self.bearer_token = self.token_manager.get_bearer_token(session=self.session)
+        return self.bearer_token
+
+    def refresh_bearer_token(self, rejected_token=None):
+        """ refresh bearer token after rejected_token was refused and return the new bearer token
+        """
+        self.token_manager.invalidate(rejected_token)
+        return self.get_bearer_token()
+
+    def get_headers(self):
+        """ return default headers for requests
+        """
+        return {
+            'Accept': 'application/json',
+            'Content-Type': 'application/json',
+            'Authorization': self.get_bearer_token()
+        }
+
+    def request(self, method, endpoint, **kwargs):
+        """ send request to endpoint through the client session and return the response
+
+            endpoint may be a path on hostname or an absolute url; when a token manager is used a request
+            rejected with 401 is sent once more with a refreshed bearer token
+
+            throttled (429, 503), failed (502, 504) and unsent requests are retried according to the retry
+            policy; POST is only retried when the server rejected it with 429 or 503 unless idempotent=True
+            is passed, and a throttling response holds back the requests of all threads of the client for at
+            least its Retry-After; a response asking to wait longer than the policy maximum is returned unretried;
+            every request sent, including retries, first waits for the rate limiter
+        """
+        idempotent = kwargs.pop('idempotent', None)
+        if endpoint.startswith('https://') or endpoint.startswith('http://'):
+            url = endpoint
+        else:
+            url = 'https://{}{}'.format(self.hostname, endpoint)
+        if 'headers' not in kwargs:
+            kwargs['headers'] = self.get_headers()
+        if 'verify' not in kwargs:
+            kwargs['verify'] = self.cabundle
+
+        endpoint_template = get_endpoint_template(url)
+        attempt = 0
+        while True:
+            self.wait_for_backoff()
+            started = monotonic()
+            try:
+                with self.span('{} {}'.format(method, endpoint_template), category='http', url=endpoint_template) as span_args:
+                    response = self.send(method, url, kwargs)
+                    span_args['status'] = response.status_code
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as exception:
+                self.metrics.record_request(endpoint_template, method, type(exception).__name__, monotonic() - started)
+                if not self.can_retry(method, url, attempt, idempotent=idempotent):
+                    raise
+                self.metrics.record_retry(endpoint_template, method, type(exception).__name__)
+                delay = self.retry_policy.get_delay(attempt)
+                logger.debug('{} request to "{}" failed - retrying in {:.1f}s - {}'.format(method, url, delay, str(exception)))
+                self.wait(delay)
+                attempt += 1
+                continue
+
+            self.metrics.record_request(endpoint_template, method, response.status_code, monotonic() - started)
+            retry_after = get_retry_after(response) if response.status_code in RETRY_STATUS_CODES else None
+            if not self.can_retry(
+                    method, url, attempt, status_code=response.status_code, idempotent=idempotent, retry_after=retry_after):
+                if retry_after and response.status_code in REJECTED_STATUS_CODES:
+                    # the response is returned but no thread may send before the server is ready again
+                    self.backoff_gate.close(retry_after)
+                break
+            self.metrics.record_retry(endpoint_template, method, response.status_code)
+            delay = self.retry_policy.get_delay(attempt, retry_after=retry_after)
+            logger.debug('{} request to "{}" returned {} - retrying in {:.1f}s'.format(
+                method, url, response.status_code, delay))
+            response.close()
+            if response.status_code in REJECTED_STATUS_CODES:
+                self.backoff_gate.close(delay)
+            else:
+                self.wait(delay)
+            attempt += 1
+
+        if not kwargs.get('stream'):
+            self.record_transfer(url, response, len(response.content or b''))
+        return response
+
+    def send(self, method, url, kwargs):
+        """ send request through the client session resending it once with a refreshed token if it is unauthorized
+        """
+        self.wait_for_rate_limit(url)
+        response = self.session.request(method, url, **kwargs)
+
+        if response.status_code == 401 and self.token_manager:
+            authorization = get_authorization_header(kwargs['headers'])
+            if authorization:
+                logger.debug('request to "{}" was unauthorized - refreshing bearer token'.format(url))
+                response.close()
+                headers = dict(kwargs['headers'])
+                headers[authorization] = self.refresh_bearer_token(rejected_token=headers[authorization])
+                kwargs['headers'] = headers
+                self.wait_for_rate_limit(url)
+                response = self.session.request(method, url, **kwargs)
+
+        return response
+
+    def wait_for_rate_limit(self, url):
+        """ wait until the rate limiter allows a request to url
+        """
+        if self.rate_limiter:
+            delay = self.rate_limiter.reserve(url)
+            if delay > 0:
+                self.wait(delay, name='rate_limit')
+
+    def wait_for_backoff(self):
+        """ wait until the server stopped throttling the client
+        """
+        delay = self.backoff_gate.get_wait()
+        if delay > 0:
+            with self.span('backoff', category='wait', seconds=delay):
+                self.backoff_gate.wait()
+
+    def wait(self, delay, name='sleep'):
+        """ sleep for delay seconds
+        """
+        with self.span(name, category='wait', seconds=delay):
+            sleep(delay)
+
+    def span(self, name, category='operation', **args):
+        """ return context manager recording a span named name when the client has a tracer
+        """
+        if self.tracer:
+            return self.tracer.span(name, category=category, **args)
+        return null_span()
+
+    def can_retry(self, method, url, attempt, status_code=None, idempotent=None, retry_after=None):
+        """ return True if attempt of request to url that failed with status_code, or without response, is retried
+        """
+        policy = self.retry_policy
+        if not policy or attempt >= policy.retries:
+            return False
+        if not policy.is_retryable(method, status_code=status_code, idempotent=idempotent):
+            return False
+        if not policy.can_wait(retry_after):
+            logger.debug('request to "{}" asked to retry after {:.1f}s - longer than {}s maximum'.format(
+                url, retry_after, policy.maximum))
+            return False
+        if not policy.spend(get_endpoint_template(url)):
+            logger.debug('retry budget of "{}" is exhausted'.format(get_endpoint_template(url)))
+            return False
+        return True
+
+    def record_transfer(self, url, response, decoded_bytes):
+        """ add bytes received on the wire and after decoding for response of url to the transfer stats
+        """
+        endpoint = get_endpoint_template(url)
+        wire_bytes = get_wire_bytes(response, decoded_bytes)
+        self.transfer_stats.record(endpoint, wire_bytes, decoded_bytes)
+        self.metrics.record_bytes(endpoint, wire_bytes, decoded_bytes)
+
+    def get_transfer_stats(self):
+        """ return dict of endpoint template to requests, wire_bytes, decoded_bytes and compression ratio
+        """
+        return self.transfer_stats.get_stats()
+
+    def get(self, endpoint, **kwargs):
+        """ return json from GET of endpoint
+        """
+        return get_json(self.request('GET', endpoint, **kwargs))
+
+    def post(self, endpoint, **kwargs):
+        """ return json from POST to endpoint
+        """
+        return get_json(self.request('POST', endpoint, **kwargs))
+
+    def put(self, endpoint, **kwargs):
+        """ return json from PUT to endpoint
+        """
+        return get_json(self.request('PUT', endpoint, **kwargs))
+
+    def delete(self, endpoint, **kwargs):
+        """ return json from DELETE of endpoint
+        """
+        return get_json(self.request('DELETE', endpoint, **kwargs))
+
+    def get_metrics(self):
+        """ return request metrics of all endpoints in Prometheus text exposition format
+        """
+        return self.metrics.get_prometheus()
+
+    def record_pages(self, endpoint):
+        """ return function recording the number of pages a crawl of collection endpoint retrieved
+        """
+        return lambda pages: self.metrics.record_pages(get_endpoint_template(endpoint), pages)
+
+    def get_pool_stats(self):
+        """ return connection reuse statistics for the client session
+        """
+        return get_pool_stats(self.session)
+
+    def close(self):
+        """ close all pooled connections
+        """
+        self.session.close()
+
+    @traced
     def get_endpoint_resource(self, endpoint=None, with_filter=None):
         """ return resource from endpoint using with_filter
         """
@@ -163,15 +603,23 @@ class vRAclient(RESTclient):
 
         return resource['content'][0]
 
-    def wait_for_request(self, request_id=None, status='successful', delay=10, timeout=120):
+    @traced
+    def wait_for_request(self, request_id=None, status='successful', delay=10, timeout=120, schedule=None,
+                         adaptive=False):
         """ wait for request with request_id to reach state of status
 
+            checks start fast and back off up to delay seconds apart; the timeout is measured against a
+            monotonic clock so time spent in the requests counts towards it
+
             Arguments:
                 request_id (str) - id of the request
                 status (str) - state of the request that will result in execution returning to caller
                     default is 'successful'
-                delay (int) - number of seconds to wait between checks, default is 10
+                delay (int) - maximum number of seconds to wait between checks, default is 10
                 timeout (int) - total number of seconds to wait before raising exception, default is 120
+                schedule (PollSchedule) - schedule of delays between checks, default backs off from 1 second to delay
+                adaptive (bool) - wait for most of the time requests of the same catalog item took to complete
+                    before checking again, default is False
             Raises:
                 WaitTimeExceeded - if request state doesn't reach status before waiting timeout seconds
                 RequestFailed - if request state failed
@@ -183,93 +631,426 @@ class vRAclient(RESTclient):
         if not request_id:
             return request_id
 
-        total_wait_time = 0
+        start = monotonic()
+        deadline = start + timeout
+        delays = None
         while True:
-            if total_wait_time >= timeout:
-                raise WaitTimeExceeded("request id '{}' exceeded timeout of '{}' seconds".format(request_id, timeout))
-
             request = self.get('/catalog-service/api/consumer/requests/{}'.format(request_id))
             request_state = request['state'].lower()
             logger.debug("state for request id '{}' is '{}'".format(request_id, request_state))
 
             if request_state == status:
+                self.completion_history.record(get_request_key(request), monotonic() - start)
                 return request_id
             elif 'failed' in request_state:
                 raise RequestFailed("request id '{}' failed with status '{}'".format(request_id, request_state))
-            else:
-                sleep(delay)
-                total_wait_time += delay
+
+            remaining = deadline - monotonic()
+            if remaining <= 0:
+                raise WaitTimeExceeded("request id '{}' exceeded timeout of '{}' seconds".format(request_id, timeout))
+
+            if not delays:
+                if not schedule:
+                    expected = self.completion_history.get_expected(get_request_key(request)) if adaptive else None
+                    schedule = PollSchedule(maximum=delay, expected=expected)
+                delays = schedule.get_delays()
+            self.wait(min(next(delays), remaining))
+
+    def get_request_states(self, request_ids, chunk_size=REQUEST_FILTER_SIZE):
+        """ return dict of request id to lower case state retrieved with one filtered query per chunk of ids
+        """
+        states = {}
+        for chunk in get_chunks(request_ids, chunk_size):
+            api_endpoint = get_paged_endpoint(
+                '/catalog-service/api/consumer/requests',
+                page_size=len(chunk),
+                filter=get_or_filter("id eq '{}'", chunk))
+            for data in self.get_page(api_endpoint):
+                for request in data:
+                    states[request['id']] = request['state'].lower()
+        return states
+
+    @traced
+    def wait_for_requests(self, request_ids=None, status='successful', delay=10, timeout=120,
+                          chunk_size=REQUEST_FILTER_SIZE, schedule=None):
+        """ wait for all requests with request_ids to reach state of status or fail
+
+            every check retrieves the state of all pending requests with filtered collection queries of up to
+            chunk_size ids, requests that reach status or a failed state are not checked again
+
+            Arguments:
+                request_ids (list) - ids of the requests
+                status (str) - state of the request that is considered complete, default is 'successful'
+                delay (int) - maximum number of seconds to wait between checks, default is 10
+                timeout (int) - total number of seconds to wait, default is 120
+                chunk_size (int) - maximum number of ids filtered in a single query, default is 50
+                schedule (PollSchedule) - schedule of delays between checks, default backs off from 1 second to delay
+            Returns:
+                dict of request id to its last known state, None if the request was never found;
+                requests still pending when timeout is reached keep their last known state
+        """
+        request_ids = list(dict.fromkeys(request_ids if request_ids else []))
+        logger.debug("waiting for status to be '{}' for {} requests".format(status, len(request_ids)))
+
+        results = dict((request_id, None) for request_id in request_ids)
+        pending = list(request_ids)
+        deadline = monotonic() + timeout
+        delays = (schedule if schedule else PollSchedule(maximum=delay)).get_delays()
+        while pending:
+            states = self.get_request_states(pending, chunk_size=chunk_size)
+            results.update(states)
+            pending = [request_id for request_id in pending if not is_request_complete(results[request_id] or '', status)]
+            logger.debug('{} of {} requests still pending'.format(len(pending), len(request_ids)))
+            if not pending:
+                break
+            remaining = deadline - monotonic()
+            if remaining <= 0:
+                logger.warning('requests {} exceeded timeout of {} seconds'.format(', '.join(pending), timeout))
+                break
+            self.wait(min(next(delays), remaining))
+
+        return results
 
     def get_next_page_href(self, links):
         """ get next page href from links
         """
         logger.debug('getting next page href')
-        for link in links:
-            if link['rel'] == 'next':
-                href = link['href']
-                href_split = href.split(self.hostname)
-                if len(href_split) > 1:
-                    return href_split[1]
-        else:
+        href = get_next_page_path(links, self.hostname)
+        if not href:
             logger.debug('unable to find next page href')
+        return href
 
-    def get_page(self, endpoint):
+    @traced
+    def get_page(self, endpoint, prefetch_depth=None, max_items=None):
         """ get page from endpoint
+
+            Arguments:
+                endpoint (str) - endpoint of first page
+                prefetch_depth (int) - number of next pages retrieved in the background while the caller
+                    processes the current page, default is none
+                max_items (int) - maximum number of items to return, default is all items
+            Returns:
+                generator of page content
         """
-        while True:
-            logger.debug('retrieving page from "{}"'.format(endpoint))
-            page = self.get(endpoint)
-            if page and page['content']:
-                if isinstance(page['content'], list):
-                    logger.debug('retrieved {} items from "{}"'.format(len(page['content']), endpoint))
-                yield page['content']
-                endpoint = self.get_next_page_href(page['links'])
-                if not endpoint:
-                    logger.debug('no more pages to retrieve - exiting')
-                    break
-            else:
-                logger.debug('no page content detected - exiting')
-                break
+        return Paginator(
+            self.get, endpoint, style='link', get_next=self.get_next_page_href,
+            prefetch_depth=prefetch_depth, max_items=max_items, record_pages=self.record_pages(endpoint)).get_pages()
 
-    def get_resources(self, page_size=None, filter=None):
-        """ get resources
+    @traced
+    def get_stream(self, endpoint, key='content', chunk_size=DEFAULT_CHUNK_SIZE, **kwargs):
+        """ yield items of the key array of endpoint response decoding them incrementally as the body arrives
+
+            peak memory is bounded by the size of a single item instead of the whole response body
+
+            Arguments:
+                endpoint (str) - endpoint to GET
+                key (str) - name of the attribute holding the array of items, default is 'content'
+                chunk_size (int) - number of bytes to read from the connection at a time
+            Returns:
+                generator of items
         """
-        endpoint = "/catalog-service/api/consumer/resources"
-        orderby_p = "orderby=dateCreated"
-        limit_p = "limit={}".format(page_size if page_size else 1000)
-        api_endpoint = "{}?{}&${}".format(endpoint, limit_p, orderby_p)
+        response = self.request('GET', endpoint, stream=True, **kwargs)
+        decoded_bytes = [0]
+
+        def get_chunks():
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                decoded_bytes[0] += len(chunk)
+                yield chunk
+
+        try:
+            response.raise_for_status()
+            for item in iter_json_items(get_chunks(), key=key):
+                yield item
+        finally:
+            self.record_transfer(endpoint, response, decoded_bytes[0])
+            response.close()
+
+    @traced
+    def get_collection(self, endpoint, page_size=DEFAULT_PAGE_SIZE, max_workers=DEFAULT_MAX_WORKERS, fields=None,
+                       prefetch_depth=None, max_items=None, tune_page_size=False):
+        """ yield all items from $skip/$top paged collection endpoint
+
+            the first page is retrieved to read totalElements, the remaining pages are then retrieved
+            concurrently on a bounded thread pool and their items are yielded in collection order
+
+            Arguments:
+                endpoint (str) - collection endpoint, may include query parameters
+                page_size (int) - number of items to request per page, default is 200
+                max_workers (int) - maximum number of pages retrieved concurrently, default is 8
+                fields (list) - names of the attributes to retrieve with $select, items are trimmed to them
+                    when the endpoint ignores $select, default is all attributes
+                prefetch_depth (int) - number of pages retrieved in the background ahead of the caller, default is none
+                max_items (int) - maximum number of items to return, default is all items
+                tune_page_size (bool) - retrieve pages one at a time with page size tuned to the observed
+                    latency up to what the server allows, default is False
+            Returns:
+                generator of items
+        """
+        if fields:
+            endpoint = get_select_endpoint(endpoint, fields)
+            fields = set(fields)
+        paginator = Paginator(
+            self.get, endpoint, page_size=page_size, max_workers=1 if tune_page_size else max_workers,
+            prefetch_depth=prefetch_depth, max_items=max_items, tuner=PageSizeTuner() if tune_page_size else None,
+            record_pages=self.record_pages(endpoint))
+        for item in paginator:
+            yield get_trimmed(item, fields) if fields else item
+
+    def get_machines(self, page_size=DEFAULT_PAGE_SIZE, max_workers=DEFAULT_MAX_WORKERS, fields=None):
+        """ yield all machines using concurrent $skip/$top paging
+        """
+        return self.get_collection('/iaas/api/machines', page_size=page_size, max_workers=max_workers, fields=fields)
+
+    def get_deployments(self, resource_types='Cloud.vSphere.Machine', status='CREATE_SUCCESSFUL',
+                        page_size=DEFAULT_PAGE_SIZE, max_workers=DEFAULT_MAX_WORKERS, fields=None):
+        """ yield all deployments with resource_types and status using concurrent $skip/$top paging
+        """
+        parameters = []
+        if resource_types:
+            parameters.append('resourceTypes={}'.format(resource_types))
+        if status:
+            parameters.append('status={}'.format(status))
+        endpoint = '/deployment/api/deployments'
+        if parameters:
+            endpoint = '{}?{}'.format(endpoint, '&'.join(parameters))
+        return self.get_collection(endpoint, page_size=page_size, max_workers=max_workers, fields=fields)
+
+    def get_quota_policies(self, page_size=DEFAULT_PAGE_SIZE, max_workers=DEFAULT_MAX_WORKERS, fields=None):
+        """ yield all resource quota policies using concurrent $skip/$top paging
+        """
+        return self.get_collection(
+            '/policy/api/policies?search=Resource Quota', page_size=page_size, max_workers=max_workers, fields=fields)
+
+    def get_projects(self, page_size=DEFAULT_PAGE_SIZE, max_workers=DEFAULT_MAX_WORKERS, fields=None):
+        """ yield all projects using concurrent $skip/$top paging
+        """
+        return self.get_collection('/iaas/api/projects', page_size=page_size, max_workers=max_workers, fields=fields)
+
+    @traced
+    def get_inventory(self, kinds=None, max_workers=DEFAULT_MAX_WORKERS):
+        """ return Inventory of machines, deployments, projects and quota policies indexed for lookups
+
+            Arguments:
+                kinds (list) - kinds to crawl, default is all of machines, deployments, projects and quota_policies
+                max_workers (int) - maximum number of pages retrieved concurrently by all crawls, default is 8
+            Returns:
+                Inventory: refreshed inventory
+        """
+        return Inventory(client=self).refresh(kinds=kinds, max_workers=max_workers)
+
+    @traced
+    def get_machine_records(self, outer=True, page_size=DEFAULT_PAGE_SIZE, max_workers=DEFAULT_MAX_WORKERS):
+        """ yield flat records of each machine joined with its deployment, project and quota policies
+
+            deployments, projects and quota policies are crawled once each and hash joined on their id
+            fields while machines are streamed through the joins, so memory is bounded by the smaller
+            collections; attribute names are prefixed with machine., deployment., project. and quota_policy.
+            and a machine is yielded once per quota policy of its project
+
+            Arguments:
+                outer (bool) - yield machines without deployment, project or quota policy, default is True
+                page_size (int) - number of items to request per page, default is 200
+                max_workers (int) - maximum number of pages retrieved concurrently, shared by the concurrent
+                    crawls of deployments, projects and quota policies, default is 8
+            Returns:
+                generator of dict
+        """
+        crawls = [self.get_deployments, self.get_projects, self.get_quota_policies]
+        workers = get_worker_share(max_workers, len(crawls))
+        deployments, projects, quota_policies = ordered_map(
+            lambda crawl: list(crawl(page_size=page_size, max_workers=workers)), crawls, max_workers=len(crawls))
+        logger.debug('joining machines with {} deployments, {} projects and {} quota policies'.format(
+            len(deployments), len(projects), len(quota_policies)))
+
+        records = (get_prefixed(machine, 'machine.') for machine in self.get_machines(page_size=page_size, max_workers=max_workers))
+        records = hash_join(records, deployments, 'machine.deploymentId', 'id', 'deployment.', outer=outer)
+        records = hash_join(records, projects, 'deployment.projectId', 'id', 'project.', outer=outer)
+        return hash_join(records, quota_policies, 'project.id', 'projectId', 'quota_policy.', outer=outer)
+
+    @traced
+    def get_source_items(self, source, filter=None, select=None, page_size=DEFAULT_PAGE_SIZE):
+        """ yield items of sync source ordered by their updated timestamp
+
+            Arguments:
+                source (SyncSource|str) - sync source or name of one in SYNC_SOURCES
+                filter (str) - $filter expression
+                select (str) - $select expression
+                page_size (int) - number of items to request per page, default is 200
+            Returns:
+                generator of items
+        """
+        source = get_sync_source(source)
+        if source.paging == 'link':
+            endpoint = get_paged_endpoint(source.endpoint, page_size=page_size, orderby=source.updated, filter=filter)
+            if select:
+                endpoint = '{}&$select={}'.format(endpoint, select)
+            for content in self.get_page(endpoint):
+                for item in content:
+                    yield item
+            return
+
+        parameters = ['$orderby={}'.format(source.updated)]
+        if filter:
+            parameters.append('$filter={}'.format(filter))
+        if select:
+            parameters.append('$select={}'.format(select))
+        separator = '&' if '?' in source.endpoint else '?'
+        endpoint = '{}{}{}'.format(source.endpoint, separator, '&'.join(parameters))
+        for item in self.get_collection(endpoint, page_size=page_size):
+            yield item
+
+    def get_source_items_by_id(self, source, ids, page_size=DEFAULT_PAGE_SIZE, chunk_size=REQUEST_FILTER_SIZE):
+        """ yield items of sync source with ids retrieved with one or-chained filter query per chunk of ids
+        """
+        source = get_sync_source(source)
+        expression = "{} eq '{{}}'".format(source.id)
+        for chunk in get_chunks(list(ids), chunk_size):
+            for item in self.get_source_items(source, filter=get_or_filter(expression, chunk), page_size=page_size):
+                yield item
+
+    def get_source_total(self, source):
+        """ return total number of items in sync source retrieving a single item page, None if not reported
+        """
+        source = get_sync_source(source)
+        if source.paging == 'link':
+            page = self.get(get_paged_endpoint(source.endpoint, page_size=1))
+            return page.get('metadata', {}).get('totalElements')
+        page = self.get(get_skip_top_endpoint(source.endpoint, 0, 1))
+        return page.get('totalElements')
+
+    @traced
+    def sync(self, source, snapshot=None, path=None, page_size=DEFAULT_PAGE_SIZE):
+        """ synchronize local snapshot of sync source and return it
+
+            the first synchronization retrieves the whole collection; later ones only retrieve items
+            created or updated since the snapshot high water mark, then compare the server total with
+            the snapshot size and only when they differ retrieve all ids to remove deleted items and
+            retrieve items missing from the snapshot, e.g. ones skipped while offsets shifted during a crawl
+
+            Arguments:
+                source (SyncSource|str) - sync source or name of one in SYNC_SOURCES: resources, deployments or machines
+                snapshot (Snapshot) - snapshot to update, default is the snapshot loaded from path
+                path (str) - file the snapshot is loaded from and saved to
+                page_size (int) - number of items to request per page, default is 200
+            Returns:
+                Snapshot: updated snapshot, its changes attribute holds the added, updated and removed counts
+        """
+        source = get_sync_source(source)
+        if snapshot is None:
+            snapshot = Snapshot.load(path) if path else Snapshot()
+
+        filter = None
+        if snapshot.high_water_mark:
+            filter = get_updated_filter(source.updated, snapshot.high_water_mark)
+            logger.debug('retrieving items of "{}" updated since {}'.format(source.endpoint, snapshot.high_water_mark))
+        else:
+            logger.debug('no high water mark - retrieving all items of "{}"'.format(source.endpoint))
+
+        added, updated = snapshot.apply(
+            self.get_source_items(source, filter=filter, page_size=page_size), source.updated, id=source.id)
+
+        removed = []
         if filter:
-            filter_p = 'filter={}'.format(filter)
-            api_endpoint = "{}&${}".format(api_endpoint, filter_p)
+            total = self.get_source_total(source)
+            if total != len(snapshot):
+                logger.debug('server reports {} items and snapshot has {} - reconciling ids'.format(total, len(snapshot)))
+                items = list(self.get_source_items(source, select=source.select, page_size=page_size))
+                ids = [item[source.id] for item in items]
+                removed = snapshot.reconcile(ids)
+                missing = snapshot.get_missing(ids)
+                if missing:
+                    logger.debug('retrieving {} items missing from snapshot'.format(len(missing)))
+                    if source.select:
+                        items = self.get_source_items_by_id(source, missing, page_size=page_size)
+                    missing = set(missing)
+                    added += snapshot.apply(
+                        (item for item in items if item[source.id] in missing), source.updated, id=source.id)[0]
+
+        snapshot.changes = {
+            'added': added,
+            'updated': updated,
+            'removed': len(removed)
+        }
+        logger.debug('synchronized "{}" - {}'.format(source.endpoint, snapshot.changes))
+        if path:
+            snapshot.save(path)
+        return snapshot
+
+    def get_projected_page(self, endpoint, projection=None, fields=None):
+        """ get page from endpoint with items trimmed to fields and converted to records of projection if given
+        """
+        pages = self.get_page(endpoint)
+        if fields:
+            fields = set(fields)
+            pages = ([get_trimmed(item, fields) for item in page] for page in pages)
+        if projection:
+            pages = get_projected_pages(pages, projection)
+        return pages
+
+    @traced
+    def crawl(self, source, directory, page_size=DEFAULT_PAGE_SIZE, restart=False):
+        """ retrieve all items of sync source into a store in directory, checkpointing after every page
+
+            when a previous crawl of the same source in directory failed it is resumed after its last
+            completed page; a completed crawl is not repeated unless restart is True
+
+            Arguments:
+                source (SyncSource|str) - sync source or name of one in SYNC_SOURCES: resources, deployments or machines
+                directory (str) - directory the items and checkpoint are stored in
+                page_size (int) - number of items to request per page, default is 200
+                restart (bool) - discard stored items and start over, default is False
+            Returns:
+                CrawlStore: store whose get_items method yields the crawled items
+        """
+        source = get_sync_source(source)
+        orderby = source.created or source.id
+        if source.paging == 'link':
+            endpoint = get_paged_endpoint(source.endpoint, page_size=page_size, orderby=orderby)
+        else:
+            separator = '&' if '?' in source.endpoint else '?'
+            endpoint = '{}{}$orderby={}'.format(source.endpoint, separator, orderby)
+        store = CrawlStore(directory)
+        checkpoint = crawl_pages(
+            self.get, store, endpoint, style=source.paging, get_next=self.get_next_page_href,
+            page_size=page_size, restart=restart)
+        self.record_pages(endpoint)(checkpoint['pages'])
+        return store
+
+    @traced
+    def get_resources(self, page_size=None, filter=None, projection=None, fields=None):
+        """ get resources
+
+            Arguments:
+                page_size (int) - return generator of pages of page_size resources, default is a list of all resources
+                filter (str) - $filter expression
+                projection (Projection) - return compact records holding only the projection fields instead of dicts
+                fields (list) - names of the attributes to retrieve with $select, default is all attributes
+        """
+        api_endpoint = get_paged_endpoint(
+            '/catalog-service/api/consumer/resources', page_size=page_size, orderby='dateCreated', filter=filter, fields=fields)
 
         if page_size:
             logger.debug('retrieving paged resources from "{}"'.format(api_endpoint))
-            return self.get_page(api_endpoint)
+            return self.get_projected_page(api_endpoint, projection=projection, fields=fields)
 
         logger.debug('retrieving all resources from "{}"'.format(api_endpoint))
         result = []
-        for data in self.get_page(api_endpoint):
+        for data in self.get_projected_page(api_endpoint, projection=projection, fields=fields):
             result.extend(data)
         logger.debug('retrieved total of {} resources from "{}"'.format(len(result), api_endpoint))
         return result
     
-    def get_resources_deploymentsapi(self, page_size=None, filter=None):
-        deployments_endpoint = "/deployment/api/deployments"
-        limit_p = "limit={}".format(page_size if page_size else 1000)
-        orderby_p = "orderby=dateCreated"
-        deployments_url = "{}?{}&${}".format(deployments_endpoint, limit_p, orderby_p)
-
-        if filter:
-            filter_p = 'filter={}'.format(filter)
-            deployments_url = '{}&${}'.format(deployments_url, filter_p)
+    def get_resources_deploymentsapi(self, page_size=None, filter=None, projection=None, fields=None):
+        deployments_url = get_paged_endpoint(
+            '/deployment/api/deployments', page_size=page_size, orderby='dateCreated', filter=filter, fields=fields)
 
         if page_size:
             logger.debug('retrieving paged resources from "{}"'.format(deployments_url))
-            return self.get_page(deployments_url)
+            return self.get_projected_page(deployments_url, projection=projection, fields=fields)
 
         logger.debug('retrieving all resources from "{}"'.format(deployments_url))
         result = []
-        for data in self.get_page(deployments_url):
+        for data in self.get_projected_page(deployments_url, projection=projection, fields=fields):
             result.extend(data)
         logger.debug('retrieved total of {} resources from "{}"'.format(len(result), deployments_url))
         return result
@@ -280,7 +1061,7 @@ class vRAclient(RESTclient):
                 'accept': 'application/json',
                 'authorization': access_token
         }
-        api_output = requests.request("GET", url, headers=headers, verify=RESTclient.cabundle).json()
+        api_output = get_json(self.request("GET", url, headers=headers))
         return api_output
 
     def get_resources_deploymentsapi_details_new(self, access_token, hostname, num):
@@ -289,43 +1070,50 @@ class vRAclient(RESTclient):
                 'accept': 'application/json',
                 'authorization': access_token
         }
-        api_output = requests.request("GET", url, headers=headers, verify=RESTclient.cabundle).json()['content']
+        api_output = get_json(self.request("GET", url, headers=headers))['content']
         return api_output
 
-    def get_reservations(self, page_size=None, filter=None):
+    @traced
+    def get_reservations(self, page_size=None, filter=None, projection=None, fields=None):
         """ get reservations
+
+            Arguments:
+                page_size (int) - return generator of pages of page_size reservations, default is a list of all reservations
+                filter (str) - $filter expression
+                projection (Projection) - return compact records holding only the projection fields instead of dicts
+                fields (list) - names of the attributes to retrieve with $select, default is all attributes
         """
-        endpoint = '/reservation-service/api/reservations'
-        orderby_p = 'orderby=id'
-        limit_p = "limit={}".format(page_size if page_size else 1000)
-        api_endpoint = "{}?{}&${}".format(endpoint, limit_p, orderby_p)
-        if filter:
-            filter_p = 'filter={}'.format(filter)
-            api_endpoint = "{}&${}".format(api_endpoint, filter_p)
+        api_endpoint = get_paged_endpoint(
+            '/reservation-service/api/reservations', page_size=page_size, orderby='id', filter=filter, fields=fields)
 
         if page_size:
             logger.debug('retrieving paged reservations from "{}"'.format(api_endpoint))
-            return self.get_page(api_endpoint)
+            return self.get_projected_page(api_endpoint, projection=projection, fields=fields)
 
         logger.debug('retrieving all reservations from "{}"'.format(api_endpoint))
         result = []
-        for data in self.get_page(api_endpoint):
+        for data in self.get_projected_page(api_endpoint, projection=projection, fields=fields):
             result.extend(data)
         logger.debug('retrieved total of {} reservations from "{}"'.format(len(result), api_endpoint))
         return result
 
-    def get_subtenants(self):
+    @traced
+    def get_subtenants(self, stream=False):
         """ get subtenants
 
             NOTE: As of release 7.2 use Identity Service https://{{hostname}}/identity/api/tenants/{tenantId}/subtenants
             The endpoint below has been deprecated. However, currently don't have access to consume the identity endpoint above.
+
+            Arguments:
+                stream (bool) - return generator decoding subtenants one at a time from the response, default is False
         """
-        endpoint = '/iaas/api/projects'
-        orderby = 'orderby=id'
         # NOTE: paging is not supported for this endpoint for some reason
         # only way to get all data is set a large limit
-        limit = 1000000
-        api_endpoint = '{}?limit={}&${}'.format(endpoint, limit, orderby)
+        api_endpoint = get_paged_endpoint('/iaas/api/projects', page_size=SUBTENANTS_LIMIT, orderby='id')
+
+        if stream:
+            logger.debug('streaming all subtenants from "{}"'.format(api_endpoint))
+            return self.get_stream(api_endpoint)
 
         logger.debug('retrieving all subtenants from "{}"'.format(api_endpoint))
         result = []
@@ -333,13 +1121,16 @@ class vRAclient(RESTclient):
             result.extend(data)
         logger.debug('retrieved total of {} subtenants from "{}"'.format(len(result), api_endpoint))
         return result
-    def get_subtenants_new(self, access_token, hostname):
+
+    def get_subtenants_new(self, access_token, hostname, stream=False):
         url = 'https://{}/iaas/api/projects?size=10000'.format(hostname)
         headers = {
                 'accept': "application/json",
                 'authorization': access_token
          }
-        api_output = requests.request("GET",url, headers=headers,  verify=RESTclient.cabundle).json()['content']
+        if stream:
+            return self.get_stream(url, headers=headers)
+        api_output = self.get_cached_json(url, headers=headers)['content']
         return api_output
     def get_reservations_new(self, access_token, hostname):
         url = 'https://{}/policy/api/policies?search=Resource Quota&size=200'.format(hostname)
@@ -347,7 +1138,7 @@ class vRAclient(RESTclient):
                 'accept': "application/json",
                 'authorization': access_token
          }
-        api_output = requests.request("GET",url, headers=headers,  verify=RESTclient.cabundle).json()
+        api_output = get_json(self.request("GET", url, headers=headers))
         return api_output
     
     def get_reservations_new_page(self, access_token, hostname,num):
@@ -356,7 +1147,7 @@ class vRAclient(RESTclient):
                 'accept': "application/json",
                 'authorization': access_token
          }
-        api_output = requests.request("GET",url, headers=headers,  verify=RESTclient.cabundle).json()['content']
+        api_output = get_json(self.request("GET", url, headers=headers))['content']
         return api_output
     
     def get_reservations_new_details(self, access_token, hostname ,ID):
@@ -365,7 +1156,7 @@ class vRAclient(RESTclient):
                 'accept': "application/json",
                 'authorization': access_token
          }
-        api_output = requests.request("GET",url, headers=headers,  verify=RESTclient.cabundle).json()
+        api_output = self.get_cached_json(url, headers=headers)
         return api_output
     
     def get_vmdetails(self, access_token, hostname ):
@@ -374,7 +1165,7 @@ class vRAclient(RESTclient):
                 'accept': "application/json",
                 'authorization': access_token
          }
-        api_output = requests.request("GET",url, headers=headers,  verify=RESTclient.cabundle).json()
+        api_output = get_json(self.request("GET", url, headers=headers))
         return api_output
     
     def get_vmdetails_name(self, access_token, hostname,num ):
@@ -383,7 +1174,7 @@ class vRAclient(RESTclient):
                 'accept': "application/json",
                 'authorization': access_token
          }
-        api_output = requests.request("GET",url, headers=headers,  verify=RESTclient.cabundle).json()['content']
+        api_output = get_json(self.request("GET", url, headers=headers))['content']
         return api_output
     
     def get_vmdetails_hostname(self, access_token, hostname, ID):
@@ -392,7 +1183,7 @@ class vRAclient(RESTclient):
                 'accept': "application/json",
                 'authorization': access_token
          }
-        api_output = requests.request("GET",url, headers=headers,  verify=RESTclient.cabundle).json()
+        api_output = get_json(self.request("GET", url, headers=headers))
         return api_output
         
     
@@ -402,40 +1193,47 @@ class vRAclient(RESTclient):
                 'accept': "application/json",
                 'authorization': access_token
          }
-        api_output = requests.request("GET",url, headers=headers,  verify=RESTclient.cabundle).json()['content']
+        api_output = get_json(self.request("GET", url, headers=headers))['content']
         return api_output
     
                                       
-    def extend_lease_action(self, server_name=None, days=180, wait_for_request=True):
-        """ extend lease by days for server_name
+    @traced
+    def get_resources_by_names(self, server_names, chunk_size=REQUEST_FILTER_SIZE):
+        """ return dict of lower case server name to list of resources with operations having that name
 
-            submit CatalogResourceRequest action to Renew Lease
+            resources are retrieved with one or-chained filter query per chunk of names
+        """
+        names = list(dict.fromkeys(server_name.lower() for server_name in server_names))
+        resources = dict((name, []) for name in names)
+        for chunk in get_chunks(names, chunk_size):
+            api_endpoint = get_paged_endpoint(
+                '/catalog-service/api/consumer/resources?withOperations=true',
+                page_size=len(chunk),
+                filter=get_or_filter("tolower(name) eq '{}'", chunk))
+            for data in self.get_page(api_endpoint):
+                for resource in data:
+                    resources.setdefault(resource['name'].lower(), []).append(resource)
+        return resources
+
+    @traced
+    def get_lease_action_id(self, resource, server_name):
+        """ return id of Renew Lease operation of resource
 
-            Arguments:
-                server_name (list) - list of server names to renew lease for
-                days (int) - amount of days for lease renewal, default is 180
-                wait_for_request (bool) - wait for request to succeed, default is True
             Raises:
-                ResourceNotFound - if resource with server_name is not found
-                MultipleResourcesFound - if multiple resources with name were found
                 NoPermission - user does not have permission to execute action against server_name
-            Returns:
-                -
         """
-        lease_days = validate_lease_days(days)
-
-        resource = self.get_endpoint_resource(
-            endpoint='/catalog-service/api/consumer/resources?withOperations=true',
-            with_filter="tolower(name) eq '{}'".format(server_name.lower()))
-
-        resource_id = resource['id']
         action_id = get_id(resource['operations'], 'Renew Lease')
         if not action_id:
             raise NoPermission(
                 'user "{}" does not have permission to execute operation on server "{}"'.format(
                     self.username, server_name))
+        return action_id
 
-        template = self.get(
+    @traced
+    def submit_lease_action(self, resource_id, action_id, server_name, days):
+        """ submit Renew Lease action for resource and return the request id
+        """
+        template = self.get_template(
             '/catalog-service/api/consumer/resources/{}/actions/{}/requests/template'.format(
                 resource_id, action_id))
         current_time = datetime.utcnow().replace(microsecond=0)
@@ -444,25 +1242,148 @@ class vRAclient(RESTclient):
         logger.debug('submitting request to set new lease date of {} for server {}'.format(new_lease_date, server_name))
         template['data']['provider-NewLease'] = new_lease_date
         template['data']['provider-VirtualMachineName'] = server_name
-        template['data']['provider-numIncrement'] = lease_days
+        template['data']['provider-numIncrement'] = days
 
-        response = self.post(
+        response = self.request(
+            'POST',
             '/catalog-service/api/consumer/resources/{}/actions/{}/requests'.format(
                 resource_id, action_id),
             json=template)
+        response.raise_for_status()
+
+        request_id = get_request_id(response)
+        if request_id:
+            return request_id
+
+        logger.debug('submission response has no request id - looking up request for resource {}'.format(resource_id))
+        return self.find_resource_request_id(resource_id, current_time)
+
+    @traced
+    def find_resource_request_id(self, resource_id, since):
+        """ return id of the latest request by the user for resource_id created after since
+
+            requests are filtered by user and creation time and then matched on the resource they act on, so
+            concurrent submissions for other resources do not interfere
+
+            Raises:
+                ResourceNotFound - if no request for resource_id is found
+        """
+        api_endpoint = get_paged_endpoint(
+            '/catalog-service/api/consumer/requests',
+            orderby='dateCreated desc',
+            filter="startswith(requestedBy, '{}') and dateCreated gt '{}'".format(self.username, since.isoformat()))
+        for data in self.get_page(api_endpoint):
+            for request in data:
+                if request.get('resourceRef', {}).get('id') == resource_id:
+                    return request['id']
+
+        raise ResourceNotFound(
+            'unable to locate request for resource "{}" created after "{}"'.format(resource_id, since.isoformat()))
+
+    @traced
+    def extend_lease_action(self, server_name=None, days=180, wait_for_request=True):
+        """ extend lease by days for server_name
 
-        request = self.get_endpoint_resource(
-            endpoint='/catalog-service/api/consumer/requests',
-            with_filter="startswith(requestedBy, '{}') and dateCreated gt '{}'".format(
-                self.username, current_time.isoformat()))
+            submit CatalogResourceRequest action to Renew Lease
 
-        request_id = request['id']
+            Arguments:
+                server_name (list) - list of server names to renew lease for
+                days (int) - amount of days for lease renewal, default is 180
+                wait_for_request (bool) - wait for request to succeed, default is True
+            Raises:
+                ResourceNotFound - if resource with server_name is not found
+                MultipleResourcesFound - if multiple resources with name were found
+                NoPermission - user does not have permission to execute action against server_name
+            Returns:
+                -
+        """
+        lease_days = validate_lease_days(days)
+
+        resource = self.get_endpoint_resource(
+            endpoint='/catalog-service/api/consumer/resources?withOperations=true',
+            with_filter="tolower(name) eq '{}'".format(server_name.lower()))
+
+        resource_id = resource['id']
+        action_id = self.get_lease_action_id(resource, server_name)
+
+        request_id = self.submit_lease_action(resource_id, action_id, server_name, lease_days)
 
         if not wait_for_request:
             return request_id
 
         return self.wait_for_request(request_id=request_id)
 
+    @traced
+    def extend_lease_actions(self, server_names=None, days=180, wait_for_request=False, timeout=600,
+                             max_workers=DEFAULT_MAX_WORKERS, chunk_size=REQUEST_FILTER_SIZE):
+        """ extend lease by days for each of server_names
+
+            resources are resolved with batched filter queries, then the Renew Lease action is submitted for
+            each server with at most max_workers submissions in flight; a failure for one server does not stop
+            the others
+
+            Arguments:
+                server_names (list) - list of server names to renew lease for
+                days (int) - amount of days for lease renewal, default is 180
+                wait_for_request (bool) - wait for all requests to complete, default is False
+                timeout (int) - total number of seconds to wait for requests when wait_for_request is True
+                max_workers (int) - maximum number of concurrent submissions, default is 8
+                chunk_size (int) - maximum number of names filtered in a single query, default is 50
+            Returns:
+                dict of server name to dict with 'request_id', 'state' and 'error' where error is the exception
+                raised for that server or None; when waiting, a request that did not reach 'successful' before
+                timeout, or was never found, has a WaitTimeExceeded error
+        """
+        lease_days = validate_lease_days(days)
+        server_names = list(dict.fromkeys(server_names if server_names else []))
+        report = dict(
+            (server_name, {'request_id': None, 'state': None, 'error': None}) for server_name in server_names)
+
+        resources = self.get_resources_by_names(server_names, chunk_size=chunk_size)
+        submissions = []
+        for server_name in server_names:
+            matches = resources[server_name.lower()]
+            try:
+                if not matches:
+                    raise ResourceNotFound('unable to locate resource with name "{}"'.format(server_name))
+                if len(matches) > 1:
+                    raise MultipleResourcesFound('found multiple resources with name "{}"'.format(server_name))
+                action_id = self.get_lease_action_id(matches[0], server_name)
+                submissions.append((server_name, matches[0]['id'], action_id))
+            except Exception as exception:
+                report[server_name]['error'] = exception
+
+        def submit(submission):
+            server_name, resource_id, action_id = submission
+            try:
+                return server_name, self.submit_lease_action(resource_id, action_id, server_name, lease_days), None
+            except Exception as exception:
+                logger.error('error occurred renewing lease for {} - {}'.format(server_name, str(exception)))
+                return server_name, None, exception
+
+        for server_name, request_id, error in ordered_map(submit, submissions, max_workers=max_workers):
+            report[server_name]['request_id'] = request_id
+            report[server_name]['error'] = error
+
+        if wait_for_request:
+            request_ids = [result['request_id'] for result in report.values() if result['request_id']]
+            states = self.wait_for_requests(request_ids=request_ids, timeout=timeout)
+            for result in report.values():
+                if not result['request_id']:
+                    continue
+                state = states.get(result['request_id'])
+                result['state'] = state
+                if state and 'failed' in state:
+                    result['error'] = RequestFailed(
+                        "request id '{}' failed with status '{}'".format(result['request_id'], state))
+                elif state != 'successful':
+                    result['error'] = WaitTimeExceeded(
+                        "request id '{}' did not complete within '{}' seconds, last status '{}'".format(
+                            result['request_id'], timeout, state))
+
+        return report
+
+    @traced
     def extend_lease(self, server_names=None, days=180, wait_for_request=True):
         """ extend lease by days for all server_names
 
@@ -480,12 +1401,9 @@ class vRAclient(RESTclient):
         """
         lease_days = validate_lease_days(days)
 
-        catalog_item = self.get_endpoint_resource(
-            endpoint='/catalog-service/api/consumer/entitledCatalogItems',
-            with_filter="tolower(name) eq 'renew multiple leases'")
-        catalog_id = catalog_item['catalogItem']['id']
+        catalog_id = self.get_catalog_item_id('Renew Multiple Leases')
 
-        template = self.get(
+        template = self.get_template(
             '/catalog-service/api/consumer/entitledCatalogItems/{}/requests/template'.format(catalog_id))
         template['data']['numIncrement'] = lease_days
         template['data']['vmNames'] = server_names
@@ -501,7 +1419,7 @@ class vRAclient(RESTclient):
         return self.wait_for_request(request_id=request_id)
 
     @classmethod
-    def get_vRAclient(cls, hostname=None, username=None, password=None, tenant=None):
+    def get_vRAclient(cls, hostname=None, username=None, password=None, tenant=None, token_cache=None, **kwargs):
         """ return instance of vRAclient
 
             Args:
@@ -509,10 +1427,16 @@ class vRAclient(RESTclient):
                 username (str): username
                 password (str): password
                 tenant (str): tenant
+                token_cache (str): file to persist tokens to, default is VRA_TOKEN_CACHE environment variable
+                    or no file
+                kwargs (dict): connection pool options (pool_connections, pool_maxsize, pool_block, keep_alive
+                    and compress) are passed to get_session, all other options to the vRAclient constructor
 
             Returns:
                 vRAclient: instance of vRAclient
         """
+        session_kwargs = dict((name, kwargs.pop(name)) for name in SESSION_OPTIONS if name in kwargs)
+
         if not hostname:
             hostname = os.environ.get('VRA_H')
             if not hostname:
@@ -533,5 +1457,9 @@ class vRAclient(RESTclient):
             if not tenant:
                 tenant = VRA_TENANT
 
-        bearer_token = get_bearer_token(hostname, username, password, tenant)
-        return vRAclient(hostname, bearer_token=bearer_token, username=username)
+        if not token_cache:
+            token_cache = os.environ.get('VRA_TOKEN_CACHE')
+
+        session = get_session(**session_kwargs)
+        token_manager = TokenManager(hostname, username, password, tenant, cache_path=token_cache)
+        return vRAclient(hostname, username=username, session=session, token_manager=token_manager, **kwargs)
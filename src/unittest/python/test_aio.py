@@ -0,0 +1,408 @@
+
+import asyncio
+import unittest
+from itertools import count
+from datetime import datetime
+from mock import patch
+from mock import call
+from mock import AsyncMock
+from mock import MagicMock
+from mock import Mock
+
+import aiohttp
+
+from vRAclient.aio import AsyncvRAclient
+from vRAclient.aio import BufferedResponse
+from vRAclient.vraclient import RequestFailed
+from vRAclient.vraclient import WaitTimeExceeded
+from vRAclient.vraclient import ResourceNotFound
+from vRAclient.vraclient import VRA_HOST
+from vRAclient.vraclient import VRA_TENANT
+from vRAclient.retry import RetryPolicy
+from vRAclient.tokens import TokenManager
+
+import sys
+import logging
+logger = logging.getLogger(__name__)
+
+consoleHandler = logging.StreamHandler(sys.stdout)
+logFormatter = logging.Formatter("%(asctime)s %(threadName)s %(name)s [%(funcName)s] %(levelname)s %(message)s")
+consoleHandler.setFormatter(logFormatter)
+rootLogger = logging.getLogger()
+rootLogger.addHandler(consoleHandler)
+rootLogger.setLevel(logging.DEBUG)
+
+
+def run(coroutine):
+    return asyncio.get_event_loop().run_until_complete(coroutine)
+
+
+async def collect(generator):
+    return [item async for item in generator]
+
+
+def get_response_mock(status, body=b'{}', headers=None):
+    response_mock = MagicMock(status=status, headers=headers if headers else {})
+    response_mock.read = AsyncMock(return_value=body)
+    if status >= 400:
+        response_mock.raise_for_status.side_effect = aiohttp.ClientResponseError(Mock(), (), status=status)
+    return response_mock
+
+
+def get_session_mock(*responses):
+    session_mock = Mock()
+    contexts = []
+    for response in responses:
+        context = MagicMock()
+        if isinstance(response, Exception):
+            context.__aenter__ = AsyncMock(side_effect=response)
+        else:
+            context.__aenter__ = AsyncMock(return_value=response)
+        context.__aexit__ = AsyncMock(return_value=False)
+        contexts.append(context)
+    session_mock.request.side_effect = contexts
+    return session_mock
+
+
+class TestAsyncVraClient(unittest.TestCase):
+
+    def setUp(self):
+
+        asyncio.set_event_loop(asyncio.new_event_loop())
+
+    def tearDown(self):
+
+        asyncio.get_event_loop().close()
+
+    def test__init_Should_RaiseValueError_When_BearerTokenNotSpecified(self, *patches):
+        with self.assertRaises(ValueError):
+            AsyncvRAclient('hostname')
+
+    def test__init_Should_RaiseValueError_When_UsernameNotSpecified(self, *patches):
+        with self.assertRaises(ValueError):
+            AsyncvRAclient('hostname', bearer_token='--token--')
+
+    @patch('vRAclient.aio.AsyncvRAclient.get', new_callable=AsyncMock)
+    def test__get_page_Should_FollowNextLinks_When_Called(self, get_patch, *patches):
+        get_patch.side_effect = [
+            {'content': ['content-page1'], 'links': [{'rel': 'next', 'href': 'https://enterprisecloud.intel.com/page2'}]},
+            {'content': ['content-page2'], 'links': []}
+        ]
+        client = AsyncvRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        result = run(collect(client.get_page('/page1')))
+        self.assertEqual(result, [['content-page1'], ['content-page2']])
+        self.assertEqual(get_patch.mock_calls, [call('/page1'), call('/page2')])
+
+    @patch('vRAclient.aio.AsyncvRAclient.get', new_callable=AsyncMock)
+    def test__get_resources_Should_ReturnExpected_When_Called(self, get_patch, *patches):
+        get_patch.side_effect = [
+            {'content': ['p1', 'p2'], 'links': [{'rel': 'next', 'href': 'https://enterprisecloud.intel.com/page2'}]},
+            {'content': ['p3'], 'links': []}
+        ]
+        client = AsyncvRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        result = run(client.get_resources(filter="resourceType/id eq 'Infrastructure.Virtual'"))
+        self.assertEqual(result, ['p1', 'p2', 'p3'])
+        get_patch.assert_any_call("/catalog-service/api/consumer/resources?limit=1000&$orderby=dateCreated&$filter=resourceType/id eq 'Infrastructure.Virtual'")
+
+    @patch('vRAclient.aio.AsyncvRAclient.get', new_callable=AsyncMock)
+    def test__get_collection_Should_YieldItemsInOrder_When_MultiplePages(self, get_patch, *patches):
+        pages = {
+            '/iaas/api/machines?$top=2&$skip=0': {'content': ['m1', 'm2'], 'totalElements': 5},
+            '/iaas/api/machines?$top=2&$skip=2': {'content': ['m3', 'm4'], 'totalElements': 5},
+            '/iaas/api/machines?$top=2&$skip=4': {'content': ['m5'], 'totalElements': 5}
+        }
+        get_patch.side_effect = lambda endpoint: pages[endpoint]
+        client = AsyncvRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        result = run(collect(client.get_machines(page_size=2, max_workers=2)))
+        self.assertEqual(result, ['m1', 'm2', 'm3', 'm4', 'm5'])
+
+    @patch('vRAclient.aio.AsyncvRAclient.get', new_callable=AsyncMock)
+    def test__get_collection_Should_SelectAndTrimFields_When_Fields(self, get_patch, *patches):
+        pages = {
+            '/iaas/api/machines?$select=id&$top=1&$skip=0': {'content': [{'id': 'm1', '_links': {}}], 'totalElements': 2},
+            '/iaas/api/machines?$select=id&$top=1&$skip=1': {'content': [{'id': 'm2', '_links': {}}], 'totalElements': 2}
+        }
+        get_patch.side_effect = lambda endpoint: pages[endpoint]
+        client = AsyncvRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        result = run(collect(client.get_machines(page_size=1, fields=['id'])))
+        self.assertEqual(result, [{'id': 'm1'}, {'id': 'm2'}])
+
+    @patch('vRAclient.aio.AsyncvRAclient.get', new_callable=AsyncMock)
+    def test__get_vmdetails_name_Should_ReturnContent_When_Called(self, get_patch, *patches):
+        get_patch.return_value = {'content': ['m1']}
+        client = AsyncvRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        result = run(client.get_vmdetails_name('--token--', 'enterprisecloud.intel.com', 200))
+        self.assertEqual(result, ['m1'])
+        get_patch.assert_called_once_with(
+            'https://enterprisecloud.intel.com/iaas/api/machines?&$top=200&$skip=200',
+            headers={'accept': 'application/json', 'authorization': '--token--'})
+
+    @patch('vRAclient.aio.AsyncvRAclient.get', new_callable=AsyncMock)
+    def test__get_endpoint_resource_Should_RaiseResourceNotFound_When_NoResourcesFound(self, get_patch, *patches):
+        get_patch.return_value = {'content': []}
+        client = AsyncvRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        with self.assertRaises(ResourceNotFound):
+            run(client.get_endpoint_resource(
+                endpoint='/catalog-service/api/consumer/resources?withOperations=true',
+                with_filter="tolower(name) eq 'server123'"))
+
+    @patch('vRAclient.aio.asyncio.sleep', new_callable=AsyncMock)
+    @patch('vRAclient.aio.AsyncvRAclient.get', new_callable=AsyncMock)
+    def test__wait_for_request_Should_ReturnRequestId_When_RequestStateSuccessful(self, get_patch, *patches):
+        get_patch.side_effect = [
+            {'state': 'submitted'},
+            {'state': 'in_progress'},
+            {'state': 'successful'}
+        ]
+        client = AsyncvRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        result = run(client.wait_for_request(request_id='123'))
+        self.assertEqual(result, '123')
+
+    @patch('vRAclient.aio.asyncio.sleep', new_callable=AsyncMock)
+    @patch('vRAclient.aio.AsyncvRAclient.get', new_callable=AsyncMock)
+    def test__wait_for_request_Should_RaiseRequestFailed_When_RequestStateFailed(self, get_patch, *patches):
+        get_patch.side_effect = [
+            {'state': 'submitted'},
+            {'state': 'failed'}
+        ]
+        client = AsyncvRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        with self.assertRaises(RequestFailed):
+            run(client.wait_for_request(request_id='123'))
+
+    @patch('vRAclient.aio.monotonic', side_effect=count(0, 10))
+    @patch('vRAclient.aio.asyncio.sleep', new_callable=AsyncMock)
+    @patch('vRAclient.aio.AsyncvRAclient.get', new_callable=AsyncMock)
+    def test__wait_for_request_Should_RaiseWaitTimeExceeded_When_WaitTimeExceeded(self, get_patch, *patches):
+        get_patch.return_value = {'state': 'in_progress'}
+        client = AsyncvRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        with self.assertRaises(WaitTimeExceeded):
+            run(client.wait_for_request(request_id='123', delay=10, timeout=60))
+
+    @patch('vRAclient.aio.AsyncvRAclient.post', new_callable=AsyncMock)
+    @patch('vRAclient.aio.AsyncvRAclient.get', new_callable=AsyncMock)
+    @patch('vRAclient.aio.AsyncvRAclient.get_endpoint_resource', new_callable=AsyncMock)
+    def test__extend_lease_Should_ReturnRequestId_When_WaitForRequestFalse(self, get_endpoint_resource_patch, get_patch, post_patch, *patches):
+        get_endpoint_resource_patch.return_value = {'catalogItem': {'id': '123456'}}
+        get_patch.return_value = {'data': {'numIncrement': '', 'vmNames': ''}}
+        post_patch.return_value = {'id': '<--request_id-->'}
+        client = AsyncvRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        result = run(client.extend_lease(server_names=['server123'], wait_for_request=False))
+        self.assertEqual(result, '<--request_id-->')
+
+    @patch('vRAclient.aio.asyncio.sleep', new_callable=AsyncMock)
+    def test__request_Should_AwaitRateLimiterWait_When_RateLimited(self, sleep_patch, *patches):
+        response_mock = MagicMock()
+        response_mock.read = AsyncMock(return_value=b'{"content": []}')
+        session_mock = Mock()
+        session_mock.request.return_value.__aenter__ = AsyncMock(return_value=response_mock)
+        session_mock.request.return_value.__aexit__ = AsyncMock(return_value=False)
+        rate_limiter_mock = Mock()
+        rate_limiter_mock.reserve.return_value = 0.5
+        client = AsyncvRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1',
+                                session=session_mock, rate_limiter=rate_limiter_mock)
+        result = run(client.get('/iaas/api/machines'))
+        self.assertEqual(result, {'content': []})
+        rate_limiter_mock.reserve.assert_called_once_with('https://enterprisecloud.intel.com/iaas/api/machines')
+        sleep_patch.assert_called_once_with(0.5)
+
+    @patch('vRAclient.aio.AsyncBackoffGate')
+    def test__request_Should_RetryAndCloseGate_When_Throttled(self, backoff_gate_patch, *patches):
+        backoff_gate_patch.return_value.wait = AsyncMock()
+        session_mock = get_session_mock(
+            get_response_mock(429, headers={'Retry-After': '7'}), get_response_mock(200, b'{"id": 1}'))
+        client = AsyncvRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1',
+                                session=session_mock, retry_policy=RetryPolicy(jitter=0))
+        result = run(client.post('/catalog-service/api/consumer/requests', json={}))
+        self.assertEqual(result, {'id': 1})
+        backoff_gate_patch.return_value.close.assert_called_once_with(7)
+        self.assertEqual(backoff_gate_patch.return_value.wait.call_count, 2)
+
+    @patch('vRAclient.aio.asyncio.sleep', new_callable=AsyncMock)
+    def test__request_Should_RetryWithBackoff_When_GatewayTimeout(self, sleep_patch, *patches):
+        session_mock = get_session_mock(get_response_mock(504), get_response_mock(502), get_response_mock(200, b'{"id": 1}'))
+        client = AsyncvRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1',
+                                session=session_mock, retry_policy=RetryPolicy(initial=1, factor=2, jitter=0))
+        result = run(client.get('/iaas/api/machines'))
+        self.assertEqual(result, {'id': 1})
+        self.assertEqual(sleep_patch.call_args_list, [call(1), call(2)])
+
+    @patch('vRAclient.aio.asyncio.sleep', new_callable=AsyncMock)
+    def test__request_Should_NotRetryPost_When_GatewayTimeout(self, *patches):
+        session_mock = get_session_mock(get_response_mock(504))
+        client = AsyncvRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1', session=session_mock)
+        with self.assertRaises(aiohttp.ClientResponseError):
+            run(client.post('/catalog-service/api/consumer/requests', json={}))
+        self.assertEqual(session_mock.request.call_count, 1)
+
+    @patch('vRAclient.aio.asyncio.sleep', new_callable=AsyncMock)
+    def test__request_Should_RetryConnectionError_When_Get(self, sleep_patch, *patches):
+        session_mock = get_session_mock(aiohttp.ClientConnectionError('reset'), get_response_mock(200, b'{"id": 1}'))
+        client = AsyncvRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1', session=session_mock)
+        result = run(client.get('/iaas/api/machines'))
+        self.assertEqual(result, {'id': 1})
+        self.assertEqual(sleep_patch.call_count, 1)
+
+    @patch('vRAclient.aio.AsyncBackoffGate')
+    def test__request_Should_RaiseAndCloseGate_When_RetryAfterExceedsMaximum(self, backoff_gate_patch, *patches):
+        backoff_gate_patch.return_value.wait = AsyncMock()
+        session_mock = get_session_mock(get_response_mock(503, headers={'Retry-After': '120'}))
+        client = AsyncvRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1',
+                                session=session_mock, retry_policy=RetryPolicy(maximum=0.2))
+        with self.assertRaises(aiohttp.ClientResponseError):
+            run(client.get('/iaas/api/machines'))
+        self.assertEqual(session_mock.request.call_count, 1)
+        backoff_gate_patch.return_value.close.assert_called_once_with(120)
+
+    def test__request_Should_NotRetry_When_NoRetryPolicy(self, *patches):
+        session_mock = get_session_mock(get_response_mock(502))
+        client = AsyncvRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1',
+                                session=session_mock, retry_policy=None)
+        with self.assertRaises(aiohttp.ClientResponseError):
+            run(client.get('/iaas/api/machines'))
+        self.assertEqual(session_mock.request.call_count, 1)
+
+    def test__request_Should_ResendWithRefreshedToken_When_Unauthorized(self, *patches):
+        session_mock = get_session_mock(get_response_mock(401), get_response_mock(200, b'{"id": 1}'))
+        token_manager_mock = Mock(access_token='old')
+        token_manager_mock.is_valid.return_value = True
+        token_manager_mock.invalidate.side_effect = lambda token: setattr(token_manager_mock.is_valid, 'return_value', False)
+        client = AsyncvRAclient('enterprisecloud.intel.com', username='ad_lereyes1', session=session_mock,
+                                token_manager=token_manager_mock)
+
+        async def refresh_access_token():
+            token_manager_mock.access_token = 'new'
+            token_manager_mock.is_valid.return_value = True
+
+        client.refresh_access_token = refresh_access_token
+        result = run(client.get('/iaas/api/machines'))
+        self.assertEqual(result, {'id': 1})
+        token_manager_mock.invalidate.assert_called_once_with('Bearer old')
+        self.assertEqual(session_mock.request.call_args_list[1][1]['headers']['Authorization'], 'Bearer new')
+
+    def test__request_Should_ResendOnlyOnce_When_UnauthorizedAgain(self, *patches):
+        session_mock = get_session_mock(get_response_mock(401), get_response_mock(401))
+        token_manager_mock = Mock(access_token='token')
+        token_manager_mock.is_valid.return_value = True
+        client = AsyncvRAclient('enterprisecloud.intel.com', username='ad_lereyes1', session=session_mock,
+                                token_manager=token_manager_mock)
+        with self.assertRaises(aiohttp.ClientResponseError):
+            run(client.get('/iaas/api/machines'))
+        self.assertEqual(session_mock.request.call_count, 2)
+
+    def test__get_bearer_token_Should_LoginThroughSession_When_NoRefreshToken(self, *patches):
+        session_mock = get_session_mock(
+            get_response_mock(200, b'{"refresh_token": "--refresh--"}'), get_response_mock(200, b'{"token": "new"}'))
+        token_manager = TokenManager('enterprisecloud.intel.com', 'ad_lereyes1', 'password', 'tenant')
+        client = AsyncvRAclient('enterprisecloud.intel.com', username='ad_lereyes1', session=session_mock,
+                                token_manager=token_manager)
+        result = run(client.get_bearer_token())
+        self.assertEqual(result, 'Bearer new')
+        self.assertEqual(token_manager.refresh_token, '--refresh--')
+        self.assertEqual(token_manager.access_token, 'new')
+        self.assertEqual(session_mock.request.call_args_list, [
+            call('POST', 'https://enterprisecloud.intel.com/csp/gateway/am/api/login?access_token',
+                 headers={'Accept': 'application/json', 'Content-Type': 'application/json'},
+                 json={'username': 'ad_lereyes1', 'password': 'password', 'tenant': 'tenant'}),
+            call('POST', 'https://enterprisecloud.intel.com/iaas/api/login',
+                 headers={'Content-Type': 'application/json'}, json={'refreshToken': '--refresh--'})
+        ])
+
+    def test__get_bearer_token_Should_LoginWithPassword_When_RefreshTokenRejected(self, *patches):
+        session_mock = get_session_mock(
+            get_response_mock(400), get_response_mock(200, b'{"refresh_token": "--new-refresh--"}'),
+            get_response_mock(200, b'{"token": "new"}'))
+        token_manager = TokenManager('enterprisecloud.intel.com', 'ad_lereyes1', 'password', 'tenant')
+        token_manager.refresh_token = '--refresh--'
+        client = AsyncvRAclient('enterprisecloud.intel.com', username='ad_lereyes1', session=session_mock,
+                                token_manager=token_manager)
+        result = run(client.get_bearer_token())
+        self.assertEqual(result, 'Bearer new')
+        self.assertEqual(token_manager.refresh_token, '--new-refresh--')
+        self.assertEqual(session_mock.request.call_args_list[2][1]['json'], {'refreshToken': '--new-refresh--'})
+
+    def test__get_bearer_token_Should_RefreshOnce_When_CalledConcurrently(self, *patches):
+        token_manager = TokenManager('enterprisecloud.intel.com', 'ad_lereyes1', 'password', 'tenant')
+        client = AsyncvRAclient('enterprisecloud.intel.com', username='ad_lereyes1', token_manager=token_manager)
+        calls = count()
+
+        async def refresh_access_token():
+            next(calls)
+            await asyncio.sleep(0)
+            token_manager.update('token', refresh_token='--refresh--')
+
+        client.refresh_access_token = refresh_access_token
+
+        async def get_bearer_tokens():
+            return await asyncio.gather(client.get_bearer_token(), client.get_bearer_token())
+
+        with patch('vRAclient.tokens.get_token_expiry', return_value=float('inf')):
+            result = run(get_bearer_tokens())
+        self.assertEqual(result, ['Bearer token', 'Bearer token'])
+        self.assertEqual(next(calls), 1)
+
+    @patch('vRAclient.aio.os.environ.get', return_value=None)
+    @patch('vRAclient.aio.TokenManager')
+    def test__get_vRAclient_Should_UseTokenManager_When_Called(self, token_manager_patch, *patches):
+        token_manager_patch.return_value.is_valid.return_value = True
+        token_manager_patch.return_value.access_token = 'token'
+        client = run(AsyncvRAclient.get_vRAclient(
+            hostname='hostname', username='username', password='password', tenant='tenant', token_cache='~/.vra/tokens'))
+        token_manager_patch.assert_called_once_with('hostname', 'username', 'password', 'tenant', cache_path='~/.vra/tokens')
+        self.assertEqual(client.bearer_token, 'Bearer token')
+
+    @patch('vRAclient.aio.os.environ.get', return_value=None)
+    @patch('vRAclient.aio.TokenManager')
+    def test__get_vRAclient_Should_UseDefaultHostAndTenant_When_NotSpecified(self, token_manager_patch, *patches):
+        token_manager_patch.return_value.is_valid.return_value = True
+        token_manager_patch.return_value.access_token = 'token'
+        client = run(AsyncvRAclient.get_vRAclient(username='username', password='password'))
+        token_manager_patch.assert_called_once_with(VRA_HOST, 'username', 'password', VRA_TENANT, cache_path=None)
+        self.assertEqual(client.hostname, VRA_HOST)
+
+    @patch('vRAclient.aio.os.environ.get', return_value=None)
+    def test__get_vRAclient_Should_RaiseValueError_When_NoPassword(self, *patches):
+        with self.assertRaises(ValueError):
+            run(AsyncvRAclient.get_vRAclient(username='username'))
+
+    def get_lease_client(self, response):
+        client = AsyncvRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        client.get_endpoint_resource = AsyncMock(return_value={
+            'id': 'resource1', 'operations': [{'name': 'Renew Lease', 'id': 'action1'}]})
+        client.get = AsyncMock(return_value={'data': {}})
+        client.request_response = AsyncMock(return_value=response)
+        return client
+
+    def test__extend_lease_action_Should_ReturnIdFromResponseBody_When_Submitted(self, *patches):
+        client = self.get_lease_client(BufferedResponse(201, {}, b'{"id": "request1"}'))
+        result = run(client.extend_lease_action(server_name='server1', days=30, wait_for_request=False))
+        self.assertEqual(result, 'request1')
+        self.assertEqual(client.get_endpoint_resource.call_count, 1)
+
+    def test__extend_lease_action_Should_ReturnIdFromLocation_When_NoBody(self, *patches):
+        client = self.get_lease_client(BufferedResponse(
+            201, {'Location': 'https://enterprisecloud.intel.com/catalog-service/api/consumer/requests/request2'}, b''))
+        result = run(client.extend_lease_action(server_name='server1', days=30, wait_for_request=False))
+        self.assertEqual(result, 'request2')
+
+    def test__extend_lease_action_Should_FindRequestOfResource_When_NoIdInResponse(self, *patches):
+        client = self.get_lease_client(BufferedResponse(201, {}, b''))
+
+        async def get_page(endpoint, fields=None):
+            yield [
+                {'id': 'request3', 'resourceRef': {'id': 'resource2'}},
+                {'id': 'request4', 'resourceRef': {'id': 'resource1'}}
+            ]
+
+        client.get_page = get_page
+        result = run(client.extend_lease_action(server_name='server1', days=30, wait_for_request=False))
+        self.assertEqual(result, 'request4')
+
+    def test__find_resource_request_id_Should_RaiseResourceNotFound_When_NoRequestForResource(self, *patches):
+        client = AsyncvRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+
+        async def get_page(endpoint, fields=None):
+            yield [{'id': 'request3', 'resourceRef': {'id': 'resource2'}}]
+
+        client.get_page = get_page
+        with self.assertRaises(ResourceNotFound):
+            run(client.find_resource_request_id('resource1', datetime(2026, 10, 18)))
@@ -0,0 +1,96 @@
+
+import unittest
+from mock import patch
+from mock import Mock
+
+from vRAclient.cache import TTLCache
+from vRAclient.cache import get_validators
+from vRAclient.cache import get_conditional_headers
+
+import sys
+import logging
+logger = logging.getLogger(__name__)
+
+consoleHandler = logging.StreamHandler(sys.stdout)
+logFormatter = logging.Formatter("%(asctime)s %(threadName)s %(name)s [%(funcName)s] %(levelname)s %(message)s")
+consoleHandler.setFormatter(logFormatter)
+rootLogger = logging.getLogger()
+rootLogger.addHandler(consoleHandler)
+rootLogger.setLevel(logging.DEBUG)
+
+
+class TestCache(unittest.TestCase):
+
+    def setUp(self):
+
+        pass
+
+    def tearDown(self):
+
+        pass
+
+    def test__get_Should_ReturnValue_When_NotExpired(self, *patches):
+        cache = TTLCache(ttl=60)
+        cache.set('key', 'value')
+        self.assertEqual(cache.get('key'), 'value')
+        self.assertEqual(cache.hits, 1)
+
+    @patch('vRAclient.cache.monotonic')
+    def test__get_Should_ReturnDefault_When_Expired(self, monotonic_patch, *patches):
+        monotonic_patch.return_value = 100
+        cache = TTLCache(ttl=60)
+        cache.set('key', 'value')
+        monotonic_patch.return_value = 161
+        self.assertIsNone(cache.get('key'))
+        self.assertEqual(len(cache), 0)
+
+    def test__set_Should_EvictLeastRecentlyUsed_When_MaxsizeReached(self, *patches):
+        cache = TTLCache(maxsize=2)
+        cache.set('key1', 'value1')
+        cache.set('key2', 'value2')
+        cache.get('key1')
+        cache.set('key3', 'value3')
+        self.assertEqual(cache.get('key1'), 'value1')
+        self.assertIsNone(cache.get('key2'))
+        self.assertEqual(cache.get('key3'), 'value3')
+
+    def test__get_or_set_Should_CallFunctionOnce_When_Cached(self, *patches):
+        cache = TTLCache()
+        function = Mock(return_value='value')
+        cache.get_or_set('key', function)
+        result = cache.get_or_set('key', function)
+        self.assertEqual(result, 'value')
+        function.assert_called_once_with()
+
+    def test__get_or_set_Should_ReturnCopy_When_CopyValueTrue(self, *patches):
+        cache = TTLCache()
+        result = cache.get_or_set('key', lambda: {'data': {'vmNames': []}}, copy_value=True)
+        result['data']['vmNames'].append('server1')
+        self.assertEqual(cache.get_or_set('key', Mock(), copy_value=True), {'data': {'vmNames': []}})
+
+    def test__invalidate_Should_RemoveKind_When_KindSpecified(self, *patches):
+        cache = TTLCache()
+        cache.set(('template', '/t1'), 't1')
+        cache.set(('template', '/t2'), 't2')
+        cache.set(('catalog_item', 'renew'), 'c1')
+        cache.invalidate(kind='template')
+        self.assertEqual(len(cache), 1)
+        cache.invalidate()
+        self.assertEqual(len(cache), 0)
+
+    def test__get_validators_Should_ReturnValidators_When_Present(self, *patches):
+        response_mock = Mock(headers={'ETag': '"v1"', 'Last-Modified': 'Mon, 12 Oct 2026 08:00:00 GMT', 'Content-Type': 'application/json'})
+        self.assertEqual(get_validators(response_mock), {'ETag': '"v1"', 'Last-Modified': 'Mon, 12 Oct 2026 08:00:00 GMT'})
+        self.assertEqual(get_validators(Mock(headers={'ETag': ''})), {})
+
+    def test__get_conditional_headers_Should_ReturnConditionalHeaders_When_Called(self, *patches):
+        result = get_conditional_headers({'ETag': '"v1"', 'Last-Modified': 'Mon, 12 Oct 2026 08:00:00 GMT'})
+        self.assertEqual(result, {'If-None-Match': '"v1"', 'If-Modified-Since': 'Mon, 12 Oct 2026 08:00:00 GMT'})
+        self.assertEqual(get_conditional_headers({}), {})
+
+    @patch('vRAclient.cache.monotonic', return_value=100)
+    def test__get_Should_KeepEntry_When_TtlInfinite(self, monotonic_patch, *patches):
+        cache = TTLCache(ttl=1)
+        cache.set('key', 'value', ttl=float('inf'))
+        monotonic_patch.return_value = 10 ** 9
+        self.assertEqual(cache.get('key'), 'value')
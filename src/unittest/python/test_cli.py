@@ -0,0 +1,116 @@
+
+import io
+import unittest
+from mock import patch
+from mock import Mock
+
+from vRAclient.cli import main
+from vRAclient.cli import export
+from vRAclient.cli import write_csv
+from vRAclient.cli import write_jsonl
+from vRAclient.cli import get_parser
+
+import sys
+import logging
+logger = logging.getLogger(__name__)
+
+consoleHandler = logging.StreamHandler(sys.stdout)
+logFormatter = logging.Formatter("%(asctime)s %(threadName)s %(name)s [%(funcName)s] %(levelname)s %(message)s")
+consoleHandler.setFormatter(logFormatter)
+rootLogger = logging.getLogger()
+rootLogger.addHandler(consoleHandler)
+rootLogger.setLevel(logging.DEBUG)
+
+
+class TestCli(unittest.TestCase):
+
+    def setUp(self):
+
+        pass
+
+    def tearDown(self):
+
+        pass
+
+    def test__write_jsonl_Should_WriteLinePerItem_When_Called(self, *patches):
+        handle = io.StringIO()
+        result = write_jsonl(iter([{'id': '1'}, {'id': '2'}]), handle)
+        self.assertEqual(result, 2)
+        self.assertEqual(handle.getvalue(), '{"id": "1"}\n{"id": "2"}\n')
+
+    def test__write_csv_Should_UseFirstItemColumns_When_NoFields(self, *patches):
+        handle = io.StringIO()
+        result = write_csv(iter([{'id': '1', 'tags': ['a']}, {'id': '2', 'tags': [], 'extra': 'x'}]), handle)
+        self.assertEqual(result, 2)
+        self.assertEqual(handle.getvalue().splitlines(), ['id,tags', '1,"[""a""]"', '2,[]'])
+
+    def test__write_csv_Should_WriteHeader_When_NoItemsAndFields(self, *patches):
+        handle = io.StringIO()
+        result = write_csv(iter([]), handle, fields=['id', 'name'])
+        self.assertEqual(result, 0)
+        self.assertEqual(handle.getvalue().splitlines(), ['id,name'])
+
+    def test__export_Should_StopRetrieving_When_MaxItems(self, *patches):
+        retrieved = []
+
+        def get_machines(**kwargs):
+            for index in range(100):
+                retrieved.append(index)
+                yield {'id': index}
+
+        client_mock = Mock()
+        client_mock.get_machines.side_effect = get_machines
+        handle = io.StringIO()
+        result = export(client_mock, 'machines', handle, max_items=3, fields=['id'], page_size=50, max_workers=2)
+        self.assertEqual(result, 3)
+        self.assertEqual(len(retrieved), 3)
+        client_mock.get_machines.assert_called_once_with(page_size=50, max_workers=2, fields=['id'])
+
+    def test__export_Should_FlattenPages_When_Resources(self, *patches):
+        client_mock = Mock()
+        client_mock.get_resources.return_value = iter([[{'id': '1'}], [{'id': '2'}]])
+        handle = io.StringIO()
+        result = export(client_mock, 'resources', handle, format='csv')
+        self.assertEqual(result, 2)
+        self.assertEqual(handle.getvalue().splitlines(), ['id', '1', '2'])
+        client_mock.get_resources.assert_called_once_with(page_size=200, fields=None)
+
+    def test__get_parser_Should_RejectMaxWorkers_When_NotPositive(self, *patches):
+        for value in ('0', '-1', 'many'):
+            with self.assertRaises(SystemExit):
+                get_parser().parse_args(['machines', '--max-workers', value])
+
+    def test__get_parser_Should_ParseMaxWorkers_When_Positive(self, *patches):
+        args = get_parser().parse_args(['machines', '--max-workers', '4'])
+        self.assertEqual(args.max_workers, 4)
+
+    def test__get_parser_Should_RejectCollection_When_Unknown(self, *patches):
+        with self.assertRaises(SystemExit):
+            get_parser().parse_args(['requests'])
+
+    @patch('vRAclient.cli.export', return_value=0)
+    @patch('vRAclient.cli.vRAclient.get_vRAclient')
+    def test__main_Should_ExportToStdout_When_NoOutput(self, get_vRAclient_patch, export_patch, *patches):
+        result = main(['deployments', '--fields', 'id, name', '--max-workers', '4', '--format', 'csv'])
+        self.assertEqual(result, 0)
+        get_vRAclient_patch.assert_called_once_with(
+            hostname=None, username=None, tenant=None, token_cache=None, pool_maxsize=4)
+        export_patch.assert_called_once_with(
+            get_vRAclient_patch.return_value, 'deployments', sys.stdout, format='csv', fields=['id', 'name'],
+            page_size=200, max_workers=4, max_items=None)
+        get_vRAclient_patch.return_value.close.assert_called_once_with()
+
+    @patch('vRAclient.cli.export', return_value=0)
+    @patch('vRAclient.cli.vRAclient.get_vRAclient')
+    def test__main_Should_PassRateLimiter_When_RateSpecified(self, get_vRAclient_patch, *patches):
+        main(['machines', '--rate', '5'])
+        rate_limiter = get_vRAclient_patch.call_args[1]['rate_limiter']
+        self.assertEqual(rate_limiter.rate, 5)
+
+    @patch('vRAclient.cli.Tracer')
+    @patch('vRAclient.cli.export', return_value=0)
+    @patch('vRAclient.cli.vRAclient.get_vRAclient')
+    def test__main_Should_SaveTrace_When_TraceSpecified(self, get_vRAclient_patch, export_patch, tracer_patch, *patches):
+        main(['machines', '--trace', 'trace.json'])
+        self.assertEqual(get_vRAclient_patch.call_args[1]['tracer'], tracer_patch.return_value)
+        tracer_patch.return_value.save.assert_called_once_with('trace.json')
@@ -0,0 +1,124 @@
+
+import os
+import shutil
+import tempfile
+import unittest
+from mock import patch
+from mock import Mock
+
+from vRAclient.crawl import CrawlStore
+from vRAclient.crawl import crawl_pages
+
+import sys
+import logging
+logger = logging.getLogger(__name__)
+
+consoleHandler = logging.StreamHandler(sys.stdout)
+logFormatter = logging.Formatter("%(asctime)s %(threadName)s %(name)s [%(funcName)s] %(levelname)s %(message)s")
+consoleHandler.setFormatter(logFormatter)
+rootLogger = logging.getLogger()
+rootLogger.addHandler(consoleHandler)
+rootLogger.setLevel(logging.DEBUG)
+
+
+class TestCrawl(unittest.TestCase):
+
+    def setUp(self):
+
+        self.directory = os.path.join(tempfile.mkdtemp(), 'crawl')
+
+    def tearDown(self):
+
+        shutil.rmtree(os.path.dirname(self.directory))
+
+    def get_link_get(self, fail_on=None):
+        pages = {
+            'page1': {'content': [{'id': '1'}, {'id': '2'}], 'links': ['page2']},
+            'page2': {'content': [{'id': '3'}], 'links': ['page3']},
+            'page3': {'content': [{'id': '4'}], 'links': []}
+        }
+
+        def get(endpoint):
+            if endpoint == fail_on:
+                raise IOError('connection reset')
+            return pages[endpoint]
+
+        return Mock(side_effect=get)
+
+    def get_next(self, links):
+        return links[0] if links else None
+
+    def test__crawl_pages_Should_RaiseValueError_When_LinkWithoutGetNext(self, *patches):
+        with self.assertRaises(ValueError):
+            crawl_pages(Mock(), CrawlStore(self.directory), 'page1')
+
+    def test__crawl_pages_Should_StoreAllItems_When_LinkStyle(self, *patches):
+        store = CrawlStore(self.directory)
+        result = crawl_pages(self.get_link_get(), store, 'page1', get_next=self.get_next)
+        self.assertTrue(result['complete'])
+        self.assertEqual(result['pages'], 3)
+        self.assertEqual([item['id'] for item in store.get_items()], ['1', '2', '3', '4'])
+
+    def test__crawl_pages_Should_ResumeAfterLastCompletedPage_When_PreviousCrawlFailed(self, *patches):
+        store = CrawlStore(self.directory)
+        with self.assertRaises(IOError):
+            crawl_pages(self.get_link_get(fail_on='page3'), store, 'page1', get_next=self.get_next)
+        self.assertEqual([item['id'] for item in store.get_items()], ['1', '2', '3'])
+        get_mock = self.get_link_get()
+        result = crawl_pages(get_mock, store, 'page1', get_next=self.get_next)
+        get_mock.assert_called_once_with('page3')
+        self.assertEqual(result['items'], 4)
+        self.assertEqual([item['id'] for item in store.get_items()], ['1', '2', '3', '4'])
+
+    def test__crawl_pages_Should_NotRepeat_When_Complete(self, *patches):
+        store = CrawlStore(self.directory)
+        crawl_pages(self.get_link_get(), store, 'page1', get_next=self.get_next)
+        get_mock = self.get_link_get()
+        crawl_pages(get_mock, store, 'page1', get_next=self.get_next)
+        get_mock.assert_not_called()
+
+    def test__crawl_pages_Should_StartOver_When_Restart(self, *patches):
+        store = CrawlStore(self.directory)
+        crawl_pages(self.get_link_get(), store, 'page1', get_next=self.get_next)
+        result = crawl_pages(self.get_link_get(), store, 'page1', get_next=self.get_next, restart=True)
+        self.assertEqual(result['items'], 4)
+        self.assertEqual(len(list(store.get_items())), 4)
+
+    def test__crawl_pages_Should_DiscardUncheckpointedPage_When_Resumed(self, *patches):
+        store = CrawlStore(self.directory)
+        with self.assertRaises(IOError):
+            crawl_pages(self.get_link_get(fail_on='page2'), store, 'page1', get_next=self.get_next)
+        # simulate a page written without its checkpoint
+        with open(store.items_path, 'ab') as handle:
+            handle.write(b'{"id": "3"}\n')
+        crawl_pages(self.get_link_get(), store, 'page1', get_next=self.get_next)
+        self.assertEqual([item['id'] for item in store.get_items()], ['1', '2', '3', '4'])
+
+    def test__crawl_pages_Should_ResumeFromSkipOffset_When_SkipStyle(self, *patches):
+        items = [{'id': str(index)} for index in range(5)]
+        calls = []
+
+        def get(endpoint):
+            calls.append(endpoint)
+            skip = int(endpoint.split('$skip=')[1])
+            if skip == 4 and len(calls) == 3:
+                raise IOError('gateway timeout')
+            return {'content': items[skip:skip + 2], 'totalElements': 5}
+
+        store = CrawlStore(self.directory)
+        with self.assertRaises(IOError):
+            crawl_pages(get, store, '/iaas/api/machines', style='skip', page_size=2)
+        result = crawl_pages(get, store, '/iaas/api/machines', style='skip', page_size=2)
+        self.assertEqual(calls[-1], '/iaas/api/machines?$top=2&$skip=4')
+        self.assertEqual(result['skip'], 5)
+        self.assertEqual([item['id'] for item in store.get_items()], ['0', '1', '2', '3', '4'])
+
+    def test__start_Should_StartOver_When_DifferentEndpoint(self, *patches):
+        store = CrawlStore(self.directory)
+        crawl_pages(self.get_link_get(), store, 'page1', get_next=self.get_next)
+        checkpoint = store.start('page2', 'link')
+        self.assertEqual(checkpoint['pages'], 0)
+        self.assertEqual(list(store.get_items()), [])
+
+    def test__get_items_Should_YieldNothing_When_NoCrawl(self, *patches):
+        self.assertEqual(list(CrawlStore(self.directory).get_items()), [])
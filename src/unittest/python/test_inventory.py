@@ -0,0 +1,126 @@
+
+import unittest
+from mock import patch
+from mock import Mock
+
+from vRAclient.inventory import Inventory
+from vRAclient.inventory import get_index
+from vRAclient.inventory import get_groups
+from vRAclient.inventory import get_lower
+
+import sys
+import logging
+logger = logging.getLogger(__name__)
+
+consoleHandler = logging.StreamHandler(sys.stdout)
+logFormatter = logging.Formatter("%(asctime)s %(threadName)s %(name)s [%(funcName)s] %(levelname)s %(message)s")
+consoleHandler.setFormatter(logFormatter)
+rootLogger = logging.getLogger()
+rootLogger.addHandler(consoleHandler)
+rootLogger.setLevel(logging.DEBUG)
+
+
+class TestInventory(unittest.TestCase):
+
+    def setUp(self):
+
+        self.machines = [
+            {'id': 'm1', 'name': 'VM1', 'projectId': 'p1', 'deploymentId': 'd1'},
+            {'id': 'm2', 'name': 'vm2', 'projectId': 'p1', 'deploymentId': 'd2'},
+            {'id': 'm3', 'name': 'vm1', 'projectId': 'p2'}
+        ]
+        self.deployments = [
+            {'id': 'd1', 'name': 'deployments_m1', 'projectId': 'p1'},
+            {'id': 'd2', 'name': 'deployments_m2', 'projectId': 'p1'}
+        ]
+        self.projects = [
+            {'id': 'p1', 'name': 'Project1'},
+            {'id': 'p2', 'name': 'Project2'}
+        ]
+        self.quota_policies = [
+            {'id': 'q1', 'projectId': 'p1'},
+            {'id': 'q2'}
+        ]
+
+    def tearDown(self):
+
+        pass
+
+    def get_inventory(self, client=None):
+        return Inventory(
+            client=client, machines=self.machines, deployments=self.deployments, projects=self.projects,
+            quota_policies=self.quota_policies)
+
+    def test__get_lower_Should_ReturnValue_When_NotString(self, *patches):
+        self.assertEqual(get_lower(1), 1)
+        self.assertEqual(get_lower('ABC'), 'abc')
+
+    def test__get_index_Should_SkipItems_When_AttributeMissing(self, *patches):
+        result = get_index(self.quota_policies, 'projectId')
+        self.assertEqual(result, {'p1': {'id': 'q1', 'projectId': 'p1'}})
+
+    def test__get_groups_Should_GroupItems_When_Called(self, *patches):
+        result = get_groups(self.machines, 'name', key=get_lower)
+        self.assertEqual(sorted(result), ['vm1', 'vm2'])
+        self.assertEqual([machine['id'] for machine in result['vm1']], ['m1', 'm3'])
+
+    def test__Inventory_Should_IndexMachines_When_Called(self, *patches):
+        inventory = self.get_inventory()
+        self.assertEqual(inventory.get_machine('m2')['name'], 'vm2')
+        self.assertEqual([machine['id'] for machine in inventory.get_machines_by_name('Vm1')], ['m1', 'm3'])
+        self.assertEqual([machine['id'] for machine in inventory.get_machines_by_project('p1')], ['m1', 'm2'])
+        self.assertEqual([machine['id'] for machine in inventory.get_machines_by_deployment('d2')], ['m2'])
+        self.assertIsNone(inventory.get_machine('m9'))
+        self.assertEqual(inventory.get_machines_by_name('vm9'), [])
+
+    def test__Inventory_Should_IndexDeploymentsProjectsAndPolicies_When_Called(self, *patches):
+        inventory = self.get_inventory()
+        self.assertEqual(inventory.get_deployment('d1')['name'], 'deployments_m1')
+        self.assertEqual(inventory.get_deployments_by_name('DEPLOYMENTS_M2')[0]['id'], 'd2')
+        self.assertEqual(len(inventory.get_deployments_by_project('p1')), 2)
+        self.assertEqual(inventory.get_machine_deployment(inventory.get_machine('m1'))['id'], 'd1')
+        self.assertIsNone(inventory.get_machine_deployment(inventory.get_machine('m3')))
+        self.assertEqual(inventory.get_project('p2')['name'], 'Project2')
+        self.assertEqual(inventory.get_project_by_name('project1')['id'], 'p1')
+        self.assertEqual(inventory.get_quota_policy('q2'), {'id': 'q2'})
+        self.assertEqual(inventory.get_quota_policies_by_project('p1'), [{'id': 'q1', 'projectId': 'p1'}])
+
+    def test__refresh_Should_RaiseValueError_When_NoClient(self, *patches):
+        with self.assertRaises(ValueError):
+            self.get_inventory().refresh()
+
+    def test__refresh_Should_RaiseValueError_When_UnknownKind(self, *patches):
+        with self.assertRaises(ValueError):
+            self.get_inventory(client=Mock()).refresh(kinds=['requests'])
+
+    def test__refresh_Should_CrawlAllKinds_When_NoKinds(self, *patches):
+        client_mock = Mock()
+        client_mock.get_machines.return_value = iter(self.machines)
+        client_mock.get_deployments.return_value = iter(self.deployments)
+        client_mock.get_projects.return_value = iter(self.projects)
+        client_mock.get_quota_policies.return_value = iter(self.quota_policies)
+        inventory = Inventory(client=client_mock).refresh()
+        self.assertEqual(inventory.get_machine('m1')['name'], 'VM1')
+        self.assertEqual(inventory.get_project('p1')['name'], 'Project1')
+        self.assertEqual(inventory.get_quota_policy('q1')['projectId'], 'p1')
+        self.assertEqual(inventory.get_deployment('d2')['name'], 'deployments_m2')
+
+    def test__refresh_Should_SplitMaxWorkersBetweenKinds_When_Called(self, *patches):
+        client_mock = Mock()
+        client_mock.get_machines.return_value = iter([])
+        client_mock.get_deployments.return_value = iter([])
+        client_mock.get_projects.return_value = iter([])
+        client_mock.get_quota_policies.return_value = iter([])
+        Inventory(client=client_mock).refresh(max_workers=8)
+        client_mock.get_machines.assert_called_once_with(max_workers=2)
+        client_mock.get_quota_policies.assert_called_once_with(max_workers=2)
+
+    def test__refresh_Should_OnlyReplaceKinds_When_Kinds(self, *patches):
+        client_mock = Mock()
+        client_mock.get_machines.return_value = iter([{'id': 'm4', 'name': 'vm4'}])
+        inventory = self.get_inventory(client=client_mock)
+        inventory.refresh(kinds=['machines'])
+        self.assertIsNone(inventory.get_machine('m1'))
+        self.assertEqual(inventory.get_machine('m4')['name'], 'vm4')
+        self.assertEqual(inventory.get_deployment('d1')['name'], 'deployments_m1')
+        client_mock.get_deployments.assert_not_called()
@@ -0,0 +1,68 @@
+
+import unittest
+from mock import patch
+from mock import Mock
+
+from vRAclient.join import get_prefixed
+from vRAclient.join import get_hash_table
+from vRAclient.join import hash_join
+
+import sys
+import logging
+logger = logging.getLogger(__name__)
+
+consoleHandler = logging.StreamHandler(sys.stdout)
+logFormatter = logging.Formatter("%(asctime)s %(threadName)s %(name)s [%(funcName)s] %(levelname)s %(message)s")
+consoleHandler.setFormatter(logFormatter)
+rootLogger = logging.getLogger()
+rootLogger.addHandler(consoleHandler)
+rootLogger.setLevel(logging.DEBUG)
+
+
+class TestJoin(unittest.TestCase):
+
+    def setUp(self):
+
+        pass
+
+    def tearDown(self):
+
+        pass
+
+    def test__get_prefixed_Should_PrefixAttributes_When_Called(self, *patches):
+        result = get_prefixed({'id': 'm1', 'name': 'vm1'}, 'machine.')
+        self.assertEqual(result, {'machine.id': 'm1', 'machine.name': 'vm1'})
+
+    def test__get_hash_table_Should_GroupItemsAndSkipMissingKeys_When_Called(self, *patches):
+        result = get_hash_table([{'projectId': 'p1', 'id': 'q1'}, {'projectId': 'p1', 'id': 'q2'}, {'id': 'q3'}], 'projectId')
+        self.assertEqual(result, {'p1': [{'projectId': 'p1', 'id': 'q1'}, {'projectId': 'p1', 'id': 'q2'}]})
+
+    def test__hash_join_Should_JoinRecords_When_Matches(self, *patches):
+        records = [{'machine.id': 'm1', 'machine.deploymentId': 'd1'}]
+        items = [{'id': 'd1', 'name': 'deployment1'}, {'id': 'd2', 'name': 'deployment2'}]
+        result = list(hash_join(records, items, 'machine.deploymentId', 'id', 'deployment.'))
+        expected_result = [{'machine.id': 'm1', 'machine.deploymentId': 'd1', 'deployment.id': 'd1', 'deployment.name': 'deployment1'}]
+        self.assertEqual(result, expected_result)
+
+    def test__hash_join_Should_YieldRecordPerMatch_When_ManyMatches(self, *patches):
+        records = [{'project.id': 'p1'}]
+        items = [{'id': 'q1', 'projectId': 'p1'}, {'id': 'q2', 'projectId': 'p1'}]
+        result = list(hash_join(records, items, 'project.id', 'projectId', 'quota_policy.'))
+        self.assertEqual([record['quota_policy.id'] for record in result], ['q1', 'q2'])
+
+    def test__hash_join_Should_YieldUnmatchedRecords_When_Outer(self, *patches):
+        records = [{'machine.id': 'm1'}, {'machine.id': 'm2', 'machine.deploymentId': 'd9'}]
+        result = list(hash_join(records, [{'id': 'd1'}], 'machine.deploymentId', 'id', 'deployment.'))
+        self.assertEqual(result, records)
+
+    def test__hash_join_Should_SkipUnmatchedRecords_When_NotOuter(self, *patches):
+        records = [{'machine.id': 'm1'}, {'machine.id': 'm2', 'machine.deploymentId': 'd1'}]
+        result = list(hash_join(records, [{'id': 'd1'}], 'machine.deploymentId', 'id', 'deployment.', outer=False))
+        self.assertEqual(result, [{'machine.id': 'm2', 'machine.deploymentId': 'd1', 'deployment.id': 'd1'}])
+
+    def test__hash_join_Should_StreamRecords_When_Called(self, *patches):
+        records_mock = Mock()
+        records_mock.__iter__ = Mock(return_value=iter([{'machine.deploymentId': 'd1'}]))
+        result = hash_join(records_mock, [{'id': 'd1'}], 'machine.deploymentId', 'id', 'deployment.')
+        records_mock.__iter__.assert_not_called()
+        self.assertEqual(next(result), {'machine.deploymentId': 'd1', 'deployment.id': 'd1'})
@@ -0,0 +1,97 @@
+
+import unittest
+from mock import Mock
+
+from vRAclient.metrics import Metrics
+from vRAclient.metrics import get_labels
+
+import sys
+import logging
+logger = logging.getLogger(__name__)
+
+consoleHandler = logging.StreamHandler(sys.stdout)
+logFormatter = logging.Formatter("%(asctime)s %(threadName)s %(name)s [%(funcName)s] %(levelname)s %(message)s")
+consoleHandler.setFormatter(logFormatter)
+rootLogger = logging.getLogger()
+rootLogger.addHandler(consoleHandler)
+rootLogger.setLevel(logging.DEBUG)
+
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+
+        pass
+
+    def tearDown(self):
+
+        pass
+
+    def test__get_labels_Should_EscapeValues_When_Called(self, *patches):
+        result = get_labels(('endpoint', 'method'), ('/a"b\\c', 'GET'), ('le', '+Inf'))
+        self.assertEqual(result, '{endpoint="/a\\"b\\\\c",method="GET",le="+Inf"}')
+        self.assertEqual(get_labels((), ()), '')
+
+    def test__get_prometheus_Should_ExportCumulativeHistogram_When_RequestsRecorded(self, *patches):
+        metrics = Metrics(latency_buckets=(0.1, 1))
+        metrics.record_request('/iaas/api/machines/{id}', 'GET', 200, 0.05)
+        metrics.record_request('/iaas/api/machines/{id}', 'GET', 200, 0.5)
+        metrics.record_request('/iaas/api/machines/{id}', 'GET', 503, 2.0)
+        result = metrics.get_prometheus().splitlines()
+        self.assertIn('# TYPE vraclient_request_duration_seconds histogram', result)
+        self.assertIn('vraclient_requests_total{endpoint="/iaas/api/machines/{id}",method="GET",status="200"} 2', result)
+        self.assertIn('vraclient_requests_total{endpoint="/iaas/api/machines/{id}",method="GET",status="503"} 1', result)
+        self.assertIn('vraclient_request_duration_seconds_bucket{endpoint="/iaas/api/machines/{id}",method="GET",le="0.1"} 1', result)
+        self.assertIn('vraclient_request_duration_seconds_bucket{endpoint="/iaas/api/machines/{id}",method="GET",le="1"} 2', result)
+        self.assertIn('vraclient_request_duration_seconds_bucket{endpoint="/iaas/api/machines/{id}",method="GET",le="+Inf"} 3', result)
+        self.assertIn('vraclient_request_duration_seconds_sum{endpoint="/iaas/api/machines/{id}",method="GET"} 2.55', result)
+        self.assertIn('vraclient_request_duration_seconds_count{endpoint="/iaas/api/machines/{id}",method="GET"} 3', result)
+
+    def test__get_prometheus_Should_ExportCounters_When_Recorded(self, *patches):
+        metrics = Metrics()
+        metrics.record_bytes('/iaas/api/machines', 100, 400)
+        metrics.record_bytes('/iaas/api/machines', 50, 200)
+        metrics.record_retry('/iaas/api/machines', 'GET', 502)
+        metrics.record_pages('/iaas/api/machines', 4)
+        metrics.record_pages('/iaas/api/machines', 6)
+        metrics.record_token_refresh()
+        result = metrics.get_prometheus().splitlines()
+        self.assertIn('vraclient_response_bytes_total{endpoint="/iaas/api/machines"} 150', result)
+        self.assertIn('vraclient_response_decoded_bytes_total{endpoint="/iaas/api/machines"} 600', result)
+        self.assertIn('vraclient_retries_total{endpoint="/iaas/api/machines",method="GET",reason="502"} 1', result)
+        self.assertIn('vraclient_crawl_pages_sum{endpoint="/iaas/api/machines"} 10', result)
+        self.assertIn('vraclient_crawl_pages_count{endpoint="/iaas/api/machines"} 2', result)
+        self.assertIn('vraclient_token_refreshes_total 1', result)
+
+    def test__get_stats_Should_SummarizeEndpoints_When_Recorded(self, *patches):
+        metrics = Metrics()
+        metrics.record_request('/iaas/api/machines', 'GET', 200, 1.0)
+        metrics.record_request('/iaas/api/machines', 'GET', 'ConnectionError', 3.0)
+        metrics.record_retry('/iaas/api/machines', 'GET', 'ConnectionError')
+        result = metrics.get_stats()['/iaas/api/machines']
+        self.assertEqual(result['requests'], 2)
+        self.assertEqual(result['errors'], 1)
+        self.assertEqual(result['retries'], 1)
+        self.assertEqual(result['latency_mean'], 2.0)
+
+    def test__add_hook_Should_CallHook_When_EventRecorded(self, *patches):
+        hook_mock = Mock()
+        metrics = Metrics()
+        metrics.add_hook(hook_mock)
+        metrics.record_retry('/iaas/api/machines', 'GET', 429)
+        hook_mock.assert_called_once_with('retry', {'endpoint': '/iaas/api/machines', 'method': 'GET', 'reason': 429})
+        metrics.remove_hook(hook_mock)
+        metrics.record_token_refresh()
+        self.assertEqual(hook_mock.call_count, 1)
+
+    def test__call_hooks_Should_IgnoreHookError_When_HookRaises(self, *patches):
+        metrics = Metrics()
+        metrics.add_hook(Mock(side_effect=ValueError('hook')))
+        metrics.record_token_refresh()
+        self.assertEqual(metrics.token_refreshes, 1)
+
+    def test__reset_Should_ClearMetrics_When_Called(self, *patches):
+        metrics = Metrics()
+        metrics.record_request('/iaas/api/machines', 'GET', 200, 1.0)
+        metrics.reset()
+        self.assertEqual(metrics.get_stats(), {})
@@ -0,0 +1,236 @@
+
+import threading
+import unittest
+from mock import Mock
+from mock import patch
+from mock import call
+from time import sleep
+
+from vRAclient.paging import get_skip_offsets
+from vRAclient.paging import get_skip_top_endpoint
+from vRAclient.paging import ordered_map
+from vRAclient.paging import get_worker_share
+from vRAclient.paging import prefetch
+from vRAclient.paging import Paginator
+from vRAclient.paging import PageSizeTuner
+
+import sys
+import logging
+logger = logging.getLogger(__name__)
+
+consoleHandler = logging.StreamHandler(sys.stdout)
+logFormatter = logging.Formatter("%(asctime)s %(threadName)s %(name)s [%(funcName)s] %(levelname)s %(message)s")
+consoleHandler.setFormatter(logFormatter)
+rootLogger = logging.getLogger()
+rootLogger.addHandler(consoleHandler)
+rootLogger.setLevel(logging.DEBUG)
+
+
+class TestPaging(unittest.TestCase):
+
+    def setUp(self):
+
+        pass
+
+    def tearDown(self):
+
+        pass
+
+    def test__get_skip_offsets_Should_ReturnExpected_When_Called(self, *patches):
+        result = get_skip_offsets(1001, 200, start=200)
+        expected_result = [200, 400, 600, 800, 1000]
+        self.assertEqual(result, expected_result)
+
+    def test__get_skip_offsets_Should_RaiseValueError_When_PageSizeLessThanOne(self, *patches):
+        with self.assertRaises(ValueError):
+            get_skip_offsets(100, 0)
+
+    def test__get_skip_top_endpoint_Should_AppendWithAmpersand_When_EndpointHasQuery(self, *patches):
+        result = get_skip_top_endpoint('/policy/api/policies?search=Resource Quota', 400, 200)
+        expected_result = '/policy/api/policies?search=Resource Quota&$top=200&$skip=400'
+        self.assertEqual(result, expected_result)
+
+    def test__get_skip_top_endpoint_Should_AppendWithQuestionMark_When_EndpointHasNoQuery(self, *patches):
+        result = get_skip_top_endpoint('/iaas/api/machines', 0, 200)
+        expected_result = '/iaas/api/machines?$top=200&$skip=0'
+        self.assertEqual(result, expected_result)
+
+    def test__get_worker_share_Should_SplitMaxWorkers_When_Called(self, *patches):
+        self.assertEqual(get_worker_share(8, 4), 2)
+        self.assertEqual(get_worker_share(8, 3), 2)
+        self.assertEqual(get_worker_share(2, 4), 1)
+
+    def test__ordered_map_Should_YieldResultsInOrder_When_CallsCompleteOutOfOrder(self, *patches):
+
+        def function(item):
+            sleep(0.01 * (5 - item))
+            return item * 10
+
+        result = list(ordered_map(function, range(5), max_workers=5))
+        expected_result = [0, 10, 20, 30, 40]
+        self.assertEqual(result, expected_result)
+
+    def test__ordered_map_Should_RaiseException_When_FunctionRaises(self, *patches):
+        function = Mock(side_effect=[1, Exception('page failed'), 3])
+        result = ordered_map(function, range(3), max_workers=1)
+        self.assertEqual(next(result), 1)
+        with self.assertRaises(Exception):
+            next(result)
+
+    def test__ordered_map_Should_BoundSubmittedCalls_When_ConsumerStopsEarly(self, *patches):
+        function = Mock(side_effect=lambda item: item)
+        result = ordered_map(function, range(1000), max_workers=2)
+        self.assertEqual(next(result), 0)
+        result.close()
+        self.assertLessEqual(function.call_count, 5)
+
+    def test__prefetch_Should_YieldItemsInOrder_When_Called(self, *patches):
+        result = list(prefetch(iter(range(10)), depth=3))
+        self.assertEqual(result, list(range(10)))
+
+    def test__prefetch_Should_RaiseValueError_When_DepthInvalid(self, *patches):
+        with self.assertRaises(ValueError):
+            list(prefetch(iter([1]), depth=0))
+
+    def test__prefetch_Should_ReadAheadWhileCallerProcesses_When_Called(self, *patches):
+        read = threading.Event()
+
+        def get_items():
+            yield 1
+            read.set()
+            yield 2
+
+        result = prefetch(get_items(), depth=1)
+        self.assertEqual(next(result), 1)
+        self.assertTrue(read.wait(5))
+        self.assertEqual(list(result), [2])
+
+    def test__prefetch_Should_RaiseException_When_ItemsRaise(self, *patches):
+        def get_items():
+            yield 1
+            raise KeyError('page')
+
+        result = prefetch(get_items())
+        self.assertEqual(next(result), 1)
+        with self.assertRaises(KeyError):
+            next(result)
+
+    def test__prefetch_Should_StopReadingAndCloseItems_When_CallerStopsEarly(self, *patches):
+        read = []
+        closed = threading.Event()
+
+        def get_items():
+            try:
+                for item in range(100):
+                    read.append(item)
+                    yield item
+            finally:
+                closed.set()
+
+        result = prefetch(get_items(), depth=2)
+        self.assertEqual(next(result), 0)
+        result.close()
+        self.assertTrue(closed.wait(5))
+        self.assertLessEqual(len(read), 5)
+
+    def get_skip_get(self, total, cap=None):
+        items = list(range(total))
+
+        def get(endpoint):
+            query = dict(parameter.split('=') for parameter in endpoint.split('?')[1].split('&'))
+            skip = int(query['$skip'])
+            top = int(query['$top'])
+            if cap:
+                top = min(top, cap)
+            return {'content': items[skip:skip + top], 'totalElements': total}
+
+        return Mock(side_effect=get)
+
+    def test__Paginator_Should_RaiseValueError_When_StyleInvalid(self, *patches):
+        with self.assertRaises(ValueError):
+            Paginator(Mock(), '/iaas/api/machines', style='page')
+
+    def test__Paginator_Should_RaiseValueError_When_LinkWithoutGetNext(self, *patches):
+        with self.assertRaises(ValueError):
+            Paginator(Mock(), '/catalog-service/api/consumer/resources', style='link')
+
+    def test__get_items_Should_FollowLinks_When_LinkStyle(self, *patches):
+        get_mock = Mock(side_effect=[
+            {'content': [1, 2], 'links': ['next']},
+            {'content': [3], 'links': []}
+        ])
+        get_next_mock = Mock(side_effect=['page2', None])
+        result = list(Paginator(get_mock, 'page1', style='link', get_next=get_next_mock))
+        self.assertEqual(result, [1, 2, 3])
+        self.assertEqual(get_mock.call_args_list, [call('page1'), call('page2')])
+
+    def test__get_pages_Should_CapItems_When_MaxItems(self, *patches):
+        get_mock = Mock(side_effect=[
+            {'content': [1, 2], 'links': []},
+            {'content': [3, 4], 'links': []},
+            {'content': [5, 6], 'links': []}
+        ])
+        get_next_mock = Mock(return_value='next')
+        result = list(Paginator(get_mock, 'page1', style='link', get_next=get_next_mock, max_items=3).get_pages())
+        self.assertEqual(result, [[1, 2], [3]])
+        self.assertEqual(get_mock.call_count, 2)
+
+    def test__get_items_Should_RetrieveConcurrently_When_MaxWorkers(self, *patches):
+        get_mock = self.get_skip_get(7)
+        result = list(Paginator(get_mock, '/iaas/api/machines', page_size=2, max_workers=3))
+        self.assertEqual(result, list(range(7)))
+        self.assertEqual(get_mock.call_count, 4)
+
+    def test__get_items_Should_UseServerPageSize_When_ServerCapsTop(self, *patches):
+        get_mock = self.get_skip_get(7, cap=3)
+        result = list(Paginator(get_mock, '/iaas/api/machines', page_size=100))
+        self.assertEqual(result, list(range(7)))
+        self.assertEqual(get_mock.call_args_list[1], call('/iaas/api/machines?$top=3&$skip=3'))
+
+    def test__get_items_Should_NotRequestBeyondMaxItems_When_SkipStyle(self, *patches):
+        get_mock = self.get_skip_get(100)
+        result = list(Paginator(get_mock, '/iaas/api/machines', page_size=10, max_workers=4, max_items=25))
+        self.assertEqual(result, list(range(25)))
+        self.assertEqual(get_mock.call_count, 3)
+
+    def test__get_pages_Should_RecordPagesRetrieved_When_RecordPages(self, *patches):
+        record_pages_mock = Mock()
+        result = list(Paginator(self.get_skip_get(7), '/iaas/api/machines', page_size=2, record_pages=record_pages_mock))
+        self.assertEqual(result, list(range(7)))
+        record_pages_mock.assert_called_once_with(4)
+
+    def test__get_pages_Should_RecordPagesRetrieved_When_StoppedEarly(self, *patches):
+        record_pages_mock = Mock()
+        pages = Paginator(self.get_skip_get(7), '/iaas/api/machines', page_size=2, record_pages=record_pages_mock).get_pages()
+        next(pages)
+        pages.close()
+        record_pages_mock.assert_called_once_with(1)
+
+    def test__get_items_Should_PrefetchPages_When_PrefetchDepth(self, *patches):
+        get_mock = self.get_skip_get(5)
+        result = list(Paginator(get_mock, '/iaas/api/machines', page_size=2, prefetch_depth=2))
+        self.assertEqual(result, list(range(5)))
+
+    @patch('vRAclient.paging.monotonic')
+    def test__get_items_Should_TunePageSize_When_Tuner(self, monotonic_patch, *patches):
+        # each page takes 0.25s so the page size doubles up to the server cap of 8
+        monotonic_patch.side_effect = [value * 0.25 for value in range(100)]
+        get_mock = self.get_skip_get(40, cap=8)
+        result = list(Paginator(get_mock, '/iaas/api/machines', page_size=2, tuner=PageSizeTuner(target=1, minimum=1)))
+        self.assertEqual(result, list(range(40)))
+        tops = [int(endpoint.split('$top=')[1].split('&')[0]) for (endpoint,), _ in get_mock.call_args_list]
+        self.assertEqual(tops, [2, 4, 8, 16, 8, 8, 2])
+
+    def test__get_next_Should_ClampFactor_When_Called(self, *patches):
+        tuner = PageSizeTuner(target=1, minimum=10, maximum=1000)
+        self.assertEqual(tuner.get_next(100, 0.1), 200)
+        self.assertEqual(tuner.get_next(100, 10), 50)
+        self.assertEqual(tuner.get_next(100, 0.5), 200)
+        self.assertEqual(tuner.get_next(15, 10), 10)
+        self.assertEqual(tuner.get_next(800, 0), 1000)
+
+    def test__cap_Should_LimitMaximum_When_Called(self, *patches):
+        tuner = PageSizeTuner(minimum=50, maximum=1000)
+        tuner.cap(20)
+        self.assertEqual(tuner.get_next(20, 0.01), 20)
+        self.assertEqual(tuner.get_next(20, 100), 20)
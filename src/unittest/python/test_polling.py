@@ -0,0 +1,63 @@
+
+import unittest
+
+from vRAclient.polling import PollSchedule
+from vRAclient.polling import CompletionHistory
+from vRAclient.polling import get_request_key
+
+import sys
+import logging
+logger = logging.getLogger(__name__)
+
+consoleHandler = logging.StreamHandler(sys.stdout)
+logFormatter = logging.Formatter("%(asctime)s %(threadName)s %(name)s [%(funcName)s] %(levelname)s %(message)s")
+consoleHandler.setFormatter(logFormatter)
+rootLogger = logging.getLogger()
+rootLogger.addHandler(consoleHandler)
+rootLogger.setLevel(logging.DEBUG)
+
+
+class TestPolling(unittest.TestCase):
+
+    def setUp(self):
+
+        pass
+
+    def tearDown(self):
+
+        pass
+
+    def get_delays(self, schedule, number):
+        delays = schedule.get_delays()
+        return [next(delays) for _ in range(number)]
+
+    def test__get_delays_Should_BackOffToMaximum_When_NoJitter(self, *patches):
+        schedule = PollSchedule(initial=1, factor=2, maximum=10, jitter=0)
+        result = self.get_delays(schedule, 6)
+        expected_result = [1, 2, 4, 8, 10, 10]
+        self.assertEqual(result, expected_result)
+
+    def test__get_delays_Should_WaitForExpectedFirst_When_ExpectedSpecified(self, *patches):
+        schedule = PollSchedule(initial=1, factor=2, maximum=10, jitter=0, expected=60)
+        result = self.get_delays(schedule, 3)
+        expected_result = [48, 1, 2]
+        self.assertEqual(result, expected_result)
+
+    def test__get_delays_Should_StayWithinJitter_When_JitterSpecified(self, *patches):
+        schedule = PollSchedule(initial=4, factor=1, maximum=4, jitter=0.25)
+        for delay in self.get_delays(schedule, 50):
+            self.assertTrue(3 <= delay <= 5)
+
+    def test__get_expected_Should_ReturnMedian_When_DurationsRecorded(self, *patches):
+        history = CompletionHistory(size=3)
+        for duration in [100, 10, 30, 20]:
+            history.record('renew', duration)
+        self.assertEqual(history.get_expected('renew'), 20)
+        self.assertIsNone(history.get_expected('unknown'))
+
+    def test__get_request_key_Should_ReturnCatalogItemId_When_CatalogItemRef(self, *patches):
+        request = {'catalogItemRef': {'id': '123', 'label': 'Renew Multiple Leases'}, 'requestedItemName': 'Renew'}
+        self.assertEqual(get_request_key(request), '123')
+
+    def test__get_request_key_Should_ReturnRequestedItemName_When_NoReferences(self, *patches):
+        self.assertEqual(get_request_key({'requestedItemName': 'Renew Lease'}), 'Renew Lease')
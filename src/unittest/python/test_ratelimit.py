@@ -0,0 +1,110 @@
+
+import unittest
+import threading
+from mock import patch
+
+from vRAclient.ratelimit import TokenBucket
+from vRAclient.ratelimit import RateLimiter
+from vRAclient.ratelimit import get_host
+from vRAclient.ratelimit import get_endpoint_family
+
+import sys
+import logging
+logger = logging.getLogger(__name__)
+
+consoleHandler = logging.StreamHandler(sys.stdout)
+logFormatter = logging.Formatter("%(asctime)s %(threadName)s %(name)s [%(funcName)s] %(levelname)s %(message)s")
+consoleHandler.setFormatter(logFormatter)
+rootLogger = logging.getLogger()
+rootLogger.addHandler(consoleHandler)
+rootLogger.setLevel(logging.DEBUG)
+
+
+class TestRateLimit(unittest.TestCase):
+
+    def setUp(self):
+
+        pass
+
+    def tearDown(self):
+
+        pass
+
+    def test__get_host_Should_ReturnHost_When_AbsoluteUrl(self, *patches):
+        self.assertEqual(get_host('https://VRA.example.com/iaas/api/machines?$top=10'), 'vra.example.com')
+        self.assertIsNone(get_host('/iaas/api/machines'))
+
+    def test__get_endpoint_family_Should_ReturnFirstPathSegment_When_Called(self, *patches):
+        self.assertEqual(get_endpoint_family('https://vra.example.com/catalog-service/api/consumer/requests'), 'catalog-service')
+        self.assertEqual(get_endpoint_family('/deployment/api/deployments?$top=10'), 'deployment')
+        self.assertIsNone(get_endpoint_family('https://vra.example.com'))
+
+    def test__init_Should_RaiseValueError_When_RateNotPositive(self, *patches):
+        with self.assertRaises(ValueError):
+            TokenBucket(0)
+
+    @patch('vRAclient.ratelimit.monotonic')
+    def test__reserve_Should_AllowBurstThenQueue_When_BucketEmpties(self, monotonic_patch, *patches):
+        monotonic_patch.return_value = 100
+        bucket = TokenBucket(2, capacity=2)
+        self.assertEqual([bucket.reserve() for _ in range(4)], [0, 0, 0.5, 1.0])
+
+    @patch('vRAclient.ratelimit.monotonic')
+    def test__reserve_Should_RefillUpToCapacity_When_TimePasses(self, monotonic_patch, *patches):
+        monotonic_patch.return_value = 100
+        bucket = TokenBucket(2, capacity=2)
+        bucket.reserve()
+        bucket.reserve()
+        monotonic_patch.return_value = 100.5
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertEqual(bucket.reserve(), 0.5)
+        monotonic_patch.return_value = 200
+        self.assertEqual([bucket.reserve() for _ in range(3)], [0, 0, 0.5])
+
+    @patch('vRAclient.ratelimit.monotonic', return_value=100)
+    def test__reserve_Should_QueueEveryCaller_When_CalledFromManyThreads(self, *patches):
+        bucket = TokenBucket(10, capacity=1)
+        waits = []
+        lock = threading.Lock()
+
+        def reserve():
+            wait = bucket.reserve()
+            with lock:
+                waits.append(wait)
+
+        threads = [threading.Thread(target=reserve) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(round(wait, 6) for wait in waits), [round(index / 10.0, 6) for index in range(20)])
+
+    def test__reserve_Should_ReturnZero_When_NoLimitConfigured(self, *patches):
+        limiter = RateLimiter()
+        self.assertEqual([limiter.reserve('https://vra.example.com/iaas/api/machines') for _ in range(100)], [0] * 100)
+
+    @patch('vRAclient.ratelimit.monotonic', return_value=100)
+    def test__reserve_Should_LimitEachHostSeparately_When_RateConfigured(self, *patches):
+        limiter = RateLimiter(rate=1, hosts={'VRA2.example.com': (2, 2)})
+        self.assertEqual(limiter.reserve('https://vra1.example.com/iaas/api/machines'), 0)
+        self.assertEqual(limiter.reserve('https://vra1.example.com/deployment/api/deployments'), 1)
+        self.assertEqual(limiter.reserve('https://vra2.example.com/iaas/api/machines'), 0)
+        self.assertEqual(limiter.reserve('https://vra2.example.com/iaas/api/machines'), 0)
+        self.assertEqual(limiter.reserve('https://vra2.example.com/iaas/api/machines'), 0.5)
+
+    @patch('vRAclient.ratelimit.monotonic', return_value=100)
+    def test__reserve_Should_LimitFamily_When_FamilyConfigured(self, *patches):
+        limiter = RateLimiter(rate=100, families={'catalog-service': 1})
+        self.assertEqual(limiter.reserve('https://vra.example.com/catalog-service/api/consumer/requests'), 0)
+        self.assertEqual(limiter.reserve('https://vra.example.com/catalog-service/api/consumer/resources'), 1)
+        self.assertEqual(limiter.reserve('https://vra.example.com/iaas/api/machines'), 0)
+        self.assertEqual(limiter.reserve('https://vra2.example.com/catalog-service/api/consumer/requests'), 0)
+
+    @patch('vRAclient.ratelimit.sleep')
+    @patch('vRAclient.ratelimit.monotonic', return_value=100)
+    def test__acquire_Should_Sleep_When_RateExceeded(self, monotonic_patch, sleep_patch, *patches):
+        limiter = RateLimiter(rate=4, burst=1)
+        self.assertEqual(limiter.acquire('https://vra.example.com/iaas/api/machines'), 0)
+        sleep_patch.assert_not_called()
+        self.assertEqual(limiter.acquire('https://vra.example.com/iaas/api/machines'), 0.25)
+        sleep_patch.assert_called_once_with(0.25)
@@ -0,0 +1,99 @@
+
+import unittest
+from mock import patch
+from mock import Mock
+
+from vRAclient.records import Projection
+from vRAclient.records import get_value
+from vRAclient.records import get_attribute_name
+from vRAclient.records import get_intern
+from vRAclient.records import get_projected_pages
+
+import sys
+import logging
+logger = logging.getLogger(__name__)
+
+consoleHandler = logging.StreamHandler(sys.stdout)
+logFormatter = logging.Formatter("%(asctime)s %(threadName)s %(name)s [%(funcName)s] %(levelname)s %(message)s")
+consoleHandler.setFormatter(logFormatter)
+rootLogger = logging.getLogger()
+rootLogger.addHandler(consoleHandler)
+rootLogger.setLevel(logging.DEBUG)
+
+
+class TestRecords(unittest.TestCase):
+
+    def setUp(self):
+
+        self.item = {
+            'id': 'r1',
+            'name': 'vm1',
+            'status': 'ACTIVE',
+            'resourceType': {'id': 'Infrastructure.Virtual', 'label': 'Virtual Machine'},
+            'operations': [{'id': 'o1'}]
+        }
+
+    def tearDown(self):
+
+        pass
+
+    def test__get_value_Should_ReturnNestedValue_When_Path(self, *patches):
+        self.assertEqual(get_value(self.item, 'resourceType.id'), 'Infrastructure.Virtual')
+
+    def test__get_value_Should_ReturnNone_When_PathMissing(self, *patches):
+        self.assertIsNone(get_value(self.item, 'resourceType.missing.id'))
+        self.assertIsNone(get_value(self.item, 'name.first'))
+
+    def test__get_intern_Should_ReturnSameObject_When_EqualStrings(self, *patches):
+        first = ''.join(['ACT', 'IVE'])
+        second = ''.join(['ACTI', 'VE'])
+        self.assertIsNot(first, second)
+        self.assertIs(get_intern(first), get_intern(second))
+        self.assertEqual(get_intern(5), 5)
+
+    def test__project_Should_KeepDeclaredFields_When_List(self, *patches):
+        projection = Projection('Resource', ['id', 'status', 'resourceType.id'])
+        result = projection.project(self.item)
+        self.assertEqual(result.id, 'r1')
+        self.assertEqual(result.status, 'ACTIVE')
+        self.assertEqual(result.resourceType_id, 'Infrastructure.Virtual')
+        self.assertEqual(len(result), 3)
+        self.assertFalse(hasattr(result, '__dict__'))
+
+    def test__project_Should_UseAttributeNames_When_Dict(self, *patches):
+        projection = Projection('Resource', {'id': 'id', 'type': 'resourceType.id'})
+        result = projection.project(self.item)
+        self.assertEqual(result._asdict(), {'id': 'r1', 'type': 'Infrastructure.Virtual'})
+
+    def test__project_Should_InternValues_When_Interned(self, *patches):
+        projection = Projection('Resource', ['id', 'status'], interned=['status'])
+        first = projection.project({'id': 'r1', 'status': ''.join(['ACT', 'IVE'])})
+        second = projection.project({'id': 'r2', 'status': ''.join(['ACTI', 'VE'])})
+        self.assertIs(first.status, second.status)
+
+    def test__Projection_Should_RaiseValueError_When_InternedFieldNotProjected(self, *patches):
+        with self.assertRaises(ValueError):
+            Projection('Resource', ['id'], interned=['status'])
+
+    def test__get_attribute_name_Should_ReturnValidName_When_NameInvalid(self, *patches):
+        self.assertEqual(get_attribute_name('resourceType.id'), 'resourceType_id')
+        self.assertEqual(get_attribute_name('_links'), 'links')
+        self.assertEqual(get_attribute_name('from'), 'from_')
+        self.assertEqual(get_attribute_name('data.class'), 'data_class')
+        self.assertEqual(get_attribute_name('2fa'), 'field_2fa')
+
+    def test__project_Should_SanitiseAttributeNames_When_PathsAreNotIdentifiers(self, *patches):
+        projection = Projection('Request', ['_links', 'from', 'id'], interned=['from'])
+        result = projection.project({'_links': [], 'from': 'user1', 'id': 'r1'})
+        self.assertEqual(result.links, [])
+        self.assertEqual(result.from_, 'user1')
+        self.assertEqual(result.id, 'r1')
+
+    def test__Projection_Should_RaiseValueError_When_AttributeNamesCollide(self, *patches):
+        with self.assertRaises(ValueError):
+            Projection('Resource', ['links', '_links'])
+
+    def test__get_projected_pages_Should_YieldRecordPages_When_Called(self, *patches):
+        projection = Projection('Resource', ['id'])
+        result = list(get_projected_pages(iter([[{'id': 'r1'}, {'id': 'r2'}], [{'id': 'r3'}]]), projection))
+        self.assertEqual([[record.id for record in page] for page in result], [['r1', 'r2'], ['r3']])
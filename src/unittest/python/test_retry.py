@@ -0,0 +1,120 @@
+
+import asyncio
+import unittest
+from mock import patch
+from mock import Mock
+from mock import AsyncMock
+from email.utils import formatdate
+
+from vRAclient.retry import RetryPolicy
+from vRAclient.retry import BackoffGate
+from vRAclient.retry import AsyncBackoffGate
+from vRAclient.retry import get_retry_after
+
+import sys
+import logging
+logger = logging.getLogger(__name__)
+
+consoleHandler = logging.StreamHandler(sys.stdout)
+logFormatter = logging.Formatter("%(asctime)s %(threadName)s %(name)s [%(funcName)s] %(levelname)s %(message)s")
+consoleHandler.setFormatter(logFormatter)
+rootLogger = logging.getLogger()
+rootLogger.addHandler(consoleHandler)
+rootLogger.setLevel(logging.DEBUG)
+
+
+class TestRetry(unittest.TestCase):
+
+    def setUp(self):
+
+        pass
+
+    def tearDown(self):
+
+        pass
+
+    def test__get_retry_after_Should_ReturnSeconds_When_Seconds(self, *patches):
+        self.assertEqual(get_retry_after(Mock(headers={'Retry-After': '120'})), 120)
+
+    @patch('vRAclient.retry.time', return_value=1000000000)
+    def test__get_retry_after_Should_ReturnSecondsUntilDate_When_Date(self, *patches):
+        response_mock = Mock(headers={'Retry-After': formatdate(1000000030, usegmt=True)})
+        self.assertEqual(get_retry_after(response_mock), 30)
+
+    def test__get_retry_after_Should_ReturnNone_When_MissingOrInvalid(self, *patches):
+        self.assertIsNone(get_retry_after(Mock(headers={})))
+        self.assertIsNone(get_retry_after(Mock(headers={'Retry-After': 'soon'})))
+
+    def test__is_retryable_Should_RetryIdempotentMethods_When_Retryable(self, *patches):
+        policy = RetryPolicy()
+        self.assertTrue(policy.is_retryable('GET', status_code=502))
+        self.assertTrue(policy.is_retryable('get'))
+        self.assertFalse(policy.is_retryable('GET', status_code=500))
+        self.assertFalse(policy.is_retryable('GET', status_code=200))
+
+    def test__is_retryable_Should_OnlyRetryRejectedPost_When_NotIdempotent(self, *patches):
+        policy = RetryPolicy()
+        self.assertTrue(policy.is_retryable('POST', status_code=429))
+        self.assertTrue(policy.is_retryable('POST', status_code=503))
+        self.assertFalse(policy.is_retryable('POST', status_code=504))
+        self.assertFalse(policy.is_retryable('POST'))
+        self.assertTrue(policy.is_retryable('POST', status_code=504, idempotent=True))
+
+    @patch('vRAclient.retry.monotonic')
+    def test__spend_Should_LimitRetriesPerEndpoint_When_BudgetExhausted(self, monotonic_patch, *patches):
+        monotonic_patch.return_value = 100
+        policy = RetryPolicy(budget=2, window=60)
+        self.assertTrue(policy.spend('/iaas/api/machines'))
+        self.assertTrue(policy.spend('/iaas/api/machines'))
+        self.assertFalse(policy.spend('/iaas/api/machines'))
+        self.assertTrue(policy.spend('/iaas/api/projects'))
+        monotonic_patch.return_value = 161
+        self.assertTrue(policy.spend('/iaas/api/machines'))
+
+    def test__get_delay_Should_BackOffExponentially_When_NoJitter(self, *patches):
+        policy = RetryPolicy(initial=1, factor=2, maximum=10, jitter=0)
+        self.assertEqual([policy.get_delay(attempt) for attempt in range(5)], [1, 2, 4, 8, 10])
+
+    def test__get_delay_Should_HonorRetryAfter_When_Given(self, *patches):
+        policy = RetryPolicy(initial=1, maximum=60, jitter=0)
+        self.assertEqual(policy.get_delay(0, retry_after=30), 30)
+        self.assertEqual(policy.get_delay(0, retry_after=300), 300)
+        self.assertEqual(policy.get_delay(3, retry_after=0), 8)
+
+    def test__can_wait_Should_ReturnFalse_When_RetryAfterExceedsMaximum(self, *patches):
+        policy = RetryPolicy(maximum=60)
+        self.assertTrue(policy.can_wait(None))
+        self.assertTrue(policy.can_wait(60))
+        self.assertFalse(policy.can_wait(120))
+
+    def test__get_delay_Should_StayWithinJitter_When_Jitter(self, *patches):
+        policy = RetryPolicy(initial=10, jitter=0.2)
+        for _ in range(20):
+            delay = policy.get_delay(0)
+            self.assertTrue(8 <= delay <= 12)
+
+    @patch('vRAclient.retry.sleep')
+    @patch('vRAclient.retry.monotonic')
+    def test__wait_Should_SleepUntilOpen_When_Closed(self, monotonic_patch, sleep_patch, *patches):
+        monotonic_patch.side_effect = [100, 100, 100, 104, 110]
+        gate = BackoffGate()
+        gate.close(5)
+        gate.close(2)
+        gate.wait()
+        self.assertEqual([args[0] for args, _ in sleep_patch.call_args_list], [5, 1])
+
+    @patch('vRAclient.retry.sleep')
+    def test__wait_Should_NotSleep_When_Open(self, sleep_patch, *patches):
+        BackoffGate().wait()
+        sleep_patch.assert_not_called()
+
+    @patch('vRAclient.retry.asyncio.sleep', new_callable=AsyncMock)
+    @patch('vRAclient.retry.monotonic')
+    def test__wait_Should_AwaitUntilOpen_When_AsyncGateClosed(self, monotonic_patch, sleep_patch, *patches):
+        monotonic_patch.side_effect = [100, 100, 103, 110]
+        gate = AsyncBackoffGate()
+        gate.close(5)
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(gate.wait())
+        loop.close()
+        self.assertEqual([args[0] for args, _ in sleep_patch.call_args_list], [5, 2])
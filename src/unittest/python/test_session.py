@@ -0,0 +1,66 @@
+
+import unittest
+from mock import patch
+from mock import Mock
+
+from vRAclient.session import get_session
+from vRAclient.session import get_pool_stats
+
+import sys
+import logging
+logger = logging.getLogger(__name__)
+
+consoleHandler = logging.StreamHandler(sys.stdout)
+logFormatter = logging.Formatter("%(asctime)s %(threadName)s %(name)s [%(funcName)s] %(levelname)s %(message)s")
+consoleHandler.setFormatter(logFormatter)
+rootLogger = logging.getLogger()
+rootLogger.addHandler(consoleHandler)
+rootLogger.setLevel(logging.DEBUG)
+
+
+class TestSession(unittest.TestCase):
+
+    def setUp(self):
+
+        pass
+
+    def tearDown(self):
+
+        pass
+
+    def test__get_session_Should_MountPooledAdapter_When_Called(self, *patches):
+        session = get_session(pool_connections=4, pool_maxsize=32, pool_block=True)
+        adapter = session.get_adapter('https://hostname')
+        self.assertEqual(adapter._pool_connections, 4)
+        self.assertEqual(adapter._pool_maxsize, 32)
+        self.assertTrue(adapter._pool_block)
+
+    def test__get_session_Should_SetConnectionClose_When_KeepAliveFalse(self, *patches):
+        session = get_session(keep_alive=False)
+        self.assertEqual(session.headers['Connection'], 'close')
+
+    def test__get_session_Should_AcceptCompressedResponses_When_Called(self, *patches):
+        session = get_session()
+        self.assertEqual(session.headers['Accept-Encoding'], 'gzip, deflate')
+
+    def test__get_session_Should_AcceptIdentity_When_CompressFalse(self, *patches):
+        session = get_session(compress=False)
+        self.assertEqual(session.headers['Accept-Encoding'], 'identity')
+
+    def test__get_session_Should_NotSetConnectionClose_When_KeepAliveTrue(self, *patches):
+        session = get_session()
+        self.assertNotEqual(session.headers.get('Connection'), 'close')
+
+    def test__get_pool_stats_Should_ReturnExpected_When_Called(self, *patches):
+        session = get_session()
+        pool1 = Mock(num_connections=2, num_requests=50)
+        pool2 = Mock(num_connections=1, num_requests=1)
+        pools = {'key1': pool1, 'key2': pool2}
+        session.get_adapter('https://hostname').poolmanager.pools = pools
+        result = get_pool_stats(session)
+        expected_result = {
+            'connections': 3,
+            'requests': 51,
+            'reused': 48
+        }
+        self.assertEqual(result, expected_result)
@@ -0,0 +1,70 @@
+
+import json
+import unittest
+
+from vRAclient.streaming import iter_json_items
+
+import sys
+import logging
+logger = logging.getLogger(__name__)
+
+consoleHandler = logging.StreamHandler(sys.stdout)
+logFormatter = logging.Formatter("%(asctime)s %(threadName)s %(name)s [%(funcName)s] %(levelname)s %(message)s")
+consoleHandler.setFormatter(logFormatter)
+rootLogger = logging.getLogger()
+rootLogger.addHandler(consoleHandler)
+rootLogger.setLevel(logging.DEBUG)
+
+
+class TestStreaming(unittest.TestCase):
+
+    def setUp(self):
+
+        pass
+
+    def tearDown(self):
+
+        pass
+
+    def get_chunks(self, document, size):
+        raw = json.dumps(document).encode('utf-8')
+        return [raw[index:index + size] for index in range(0, len(raw), size)]
+
+    def test__iter_json_items_Should_YieldContentItems_When_ChunksSplitItems(self, *patches):
+        content = [
+            {'id': '1', 'name': 'Heroes "del" Silencio', 'tags': ['a', 'b\\c']},
+            {'id': '2', 'name': 'Caifanes', 'count': 10, 'enabled': True, 'owner': None},
+            {'id': '3', 'name': 'Fobia é中', 'nested': {'items': [{'x': []}, {}]}}
+        ]
+        document = {'links': [{'rel': 'next', 'href': 'page2'}], 'content': content, 'metadata': {'size': 3}}
+        for size in [1, 2, 3, 7, 64]:
+            result = list(iter_json_items(self.get_chunks(document, size)))
+            self.assertEqual(result, content)
+
+    def test__iter_json_items_Should_YieldScalars_When_ArrayOfScalars(self, *patches):
+        document = {'content': [1, -2.5, 'three', True, None]}
+        result = list(iter_json_items(self.get_chunks(document, 2)))
+        self.assertEqual(result, [1, -2.5, 'three', True, None])
+
+    def test__iter_json_items_Should_YieldNothing_When_KeyNotFound(self, *patches):
+        result = list(iter_json_items(self.get_chunks({'links': [], 'metadata': {}}, 3)))
+        self.assertEqual(result, [])
+
+    def test__iter_json_items_Should_YieldNothing_When_ContentEmpty(self, *patches):
+        result = list(iter_json_items(self.get_chunks({'content': []}, 3)))
+        self.assertEqual(result, [])
+
+    def test__iter_json_items_Should_YieldDocumentItems_When_KeyNone(self, *patches):
+        result = list(iter_json_items(self.get_chunks([{'id': '1'}, {'id': '2'}], 4), key=None))
+        self.assertEqual(result, [{'id': '1'}, {'id': '2'}])
+
+    def test__iter_json_items_Should_RaiseValueError_When_DocumentTruncated(self, *patches):
+        chunks = self.get_chunks({'content': [{'id': '1'}, {'id': '2'}]}, 5)[:-2]
+        with self.assertRaises(ValueError):
+            list(iter_json_items(chunks))
+
+    def test__iter_json_items_Should_ReadChunksLazily_When_Iterated(self, *patches):
+        chunks = iter(self.get_chunks({'content': [{'id': '1'}, {'id': '2'}, {'id': '3'}]}, 4))
+        result = iter_json_items(chunks)
+        self.assertEqual(next(result), {'id': '1'})
+        self.assertTrue(len(list(chunks)) > 0)
@@ -0,0 +1,95 @@
+
+import os
+import shutil
+import tempfile
+import unittest
+from mock import patch
+from mock import Mock
+
+from vRAclient.sync import SyncSource
+from vRAclient.sync import Snapshot
+from vRAclient.sync import get_sync_source
+from vRAclient.sync import get_updated_filter
+from vRAclient.sync import SYNC_SOURCES
+
+import sys
+import logging
+logger = logging.getLogger(__name__)
+
+consoleHandler = logging.StreamHandler(sys.stdout)
+logFormatter = logging.Formatter("%(asctime)s %(threadName)s %(name)s [%(funcName)s] %(levelname)s %(message)s")
+consoleHandler.setFormatter(logFormatter)
+rootLogger = logging.getLogger()
+rootLogger.addHandler(consoleHandler)
+rootLogger.setLevel(logging.DEBUG)
+
+
+class TestSync(unittest.TestCase):
+
+    def setUp(self):
+
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+
+        shutil.rmtree(self.directory)
+
+    def test__SyncSource_Should_RaiseValueError_When_PagingInvalid(self, *patches):
+        with self.assertRaises(ValueError):
+            SyncSource('/iaas/api/machines', 'updatedAt', paging='page')
+
+    def test__get_sync_source_Should_ReturnSource_When_Name(self, *patches):
+        self.assertEqual(get_sync_source('machines'), SYNC_SOURCES['machines'])
+
+    def test__get_sync_source_Should_ReturnSource_When_SyncSource(self, *patches):
+        source = SyncSource('/iaas/api/machines', 'updatedAt')
+        self.assertEqual(get_sync_source(source), source)
+
+    def test__get_sync_source_Should_RaiseValueError_When_UnknownName(self, *patches):
+        with self.assertRaises(ValueError):
+            get_sync_source('subtenants')
+
+    def test__get_updated_filter_Should_ReturnExpected_When_Called(self, *patches):
+        result = get_updated_filter('updatedAt', '2020-01-01T00:00:00Z')
+        self.assertEqual(result, "updatedAt ge '2020-01-01T00:00:00Z'")
+
+    def test__apply_Should_CountAddedAndUpdatedAndAdvanceHighWaterMark_When_Called(self, *patches):
+        snapshot = Snapshot(items={'1': {'id': '1', 'updatedAt': '2020-01-01'}, '2': {'id': '2', 'updatedAt': '2020-01-02'}}, high_water_mark='2020-01-02')
+        result = snapshot.apply([
+            {'id': '2', 'updatedAt': '2020-01-02'},
+            {'id': '1', 'updatedAt': '2020-01-03'},
+            {'id': '3', 'updatedAt': '2020-01-04'}
+        ], 'updatedAt')
+        self.assertEqual(result, (1, 1))
+        self.assertEqual(snapshot.high_water_mark, '2020-01-04')
+        self.assertEqual(len(snapshot), 3)
+
+    def test__reconcile_Should_RemoveMissingItems_When_Called(self, *patches):
+        snapshot = Snapshot(items={'1': {'id': '1'}, '2': {'id': '2'}, '3': {'id': '3'}})
+        result = snapshot.reconcile(['1', '3'])
+        self.assertEqual(result, ['2'])
+        self.assertEqual(sorted(snapshot.items), ['1', '3'])
+
+    def test__get_missing_Should_ReturnIdsNotInSnapshot_When_Called(self, *patches):
+        snapshot = Snapshot(items={'1': {'id': '1'}, '3': {'id': '3'}})
+        result = snapshot.get_missing(['1', '2', '3', '4', '2'])
+        self.assertEqual(result, ['2', '4'])
+
+    def test__save_Should_RoundTrip_When_Loaded(self, *patches):
+        path = os.path.join(self.directory, 'snapshots', 'machines.json')
+        Snapshot(items={'1': {'id': '1'}}, high_water_mark='2020-01-01').save(path)
+        result = Snapshot.load(path)
+        self.assertEqual(result.items, {'1': {'id': '1'}})
+        self.assertEqual(result.high_water_mark, '2020-01-01')
+
+    def test__load_Should_ReturnEmptySnapshot_When_PathMissing(self, *patches):
+        result = Snapshot.load(os.path.join(self.directory, 'missing.json'))
+        self.assertEqual(len(result), 0)
+        self.assertIsNone(result.high_water_mark)
+
+    def test__load_Should_ReturnEmptySnapshot_When_FileCorrupt(self, *patches):
+        path = os.path.join(self.directory, 'machines.json')
+        with open(path, 'w') as handle:
+            handle.write('{not json')
+        result = Snapshot.load(path)
+        self.assertEqual(len(result), 0)
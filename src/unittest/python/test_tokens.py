@@ -0,0 +1,173 @@
+
+import unittest
+from mock import patch
+from mock import Mock
+from mock import call
+
+import os
+import json
+import base64
+import shutil
+import tempfile
+import requests
+
+from vRAclient.tokens import TokenManager
+from vRAclient.tokens import get_token_expiry
+from vRAclient.tokens import get_access_token
+from vRAclient.tokens import get_refresh_token
+
+import sys
+import logging
+logger = logging.getLogger(__name__)
+
+consoleHandler = logging.StreamHandler(sys.stdout)
+logFormatter = logging.Formatter("%(asctime)s %(threadName)s %(name)s [%(funcName)s] %(levelname)s %(message)s")
+consoleHandler.setFormatter(logFormatter)
+rootLogger = logging.getLogger()
+rootLogger.addHandler(consoleHandler)
+rootLogger.setLevel(logging.DEBUG)
+
+
+def get_jwt(exp):
+    payload = base64.urlsafe_b64encode(json.dumps({'exp': exp}).encode('utf-8')).decode('ascii').rstrip('=')
+    return 'header.{}.signature'.format(payload)
+
+
+class TestTokens(unittest.TestCase):
+
+    def setUp(self):
+
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+
+        shutil.rmtree(self.directory)
+
+    def test__get_token_expiry_Should_ReturnExpClaim_When_TokenIsJwt(self, *patches):
+        result = get_token_expiry(get_jwt(1700000000))
+        self.assertEqual(result, 1700000000)
+
+    @patch('vRAclient.tokens.time', return_value=1000)
+    def test__get_token_expiry_Should_ReturnDefaultLifetime_When_TokenIsNotJwt(self, *patches):
+        result = get_token_expiry('opaque', default_lifetime=60)
+        self.assertEqual(result, 1060)
+
+    @patch('vRAclient.tokens.time', return_value=1000)
+    @patch('vRAclient.tokens.get_access_token')
+    @patch('vRAclient.tokens.get_refresh_token', return_value='--refresh--')
+    def test__get_bearer_token_Should_LoginWithPassword_When_NoTokens(self, get_refresh_token_patch, get_access_token_patch, *patches):
+        get_access_token_patch.return_value = get_jwt(5000)
+        manager = TokenManager('hostname', 'username', 'password', 'tenant')
+        result = manager.get_bearer_token()
+        self.assertEqual(result, 'Bearer {}'.format(get_jwt(5000)))
+        get_refresh_token_patch.assert_called_once_with('hostname', 'username', 'password', 'tenant', session=None, rate_limiter=None)
+        get_access_token_patch.assert_called_once_with('hostname', '--refresh--', session=None, rate_limiter=None)
+
+    @patch('vRAclient.tokens.time', return_value=1000)
+    @patch('vRAclient.tokens.get_access_token')
+    @patch('vRAclient.tokens.get_refresh_token', return_value='--refresh--')
+    def test__get_bearer_token_Should_ReturnCachedToken_When_TokenValid(self, get_refresh_token_patch, get_access_token_patch, *patches):
+        get_access_token_patch.return_value = get_jwt(5000)
+        manager = TokenManager('hostname', 'username', 'password', 'tenant')
+        manager.get_bearer_token()
+        manager.get_bearer_token()
+        self.assertEqual(get_access_token_patch.call_count, 1)
+
+    @patch('vRAclient.tokens.time', return_value=4800)
+    @patch('vRAclient.tokens.get_access_token')
+    @patch('vRAclient.tokens.get_refresh_token')
+    def test__get_bearer_token_Should_UseRefreshToken_When_TokenAboutToExpire(self, get_refresh_token_patch, get_access_token_patch, *patches):
+        get_access_token_patch.return_value = get_jwt(9000)
+        manager = TokenManager('hostname', 'username', 'password', 'tenant', refresh_margin=300)
+        manager.access_token = get_jwt(5000)
+        manager.expires_at = 5000
+        manager.refresh_token = '--refresh--'
+        result = manager.get_bearer_token()
+        self.assertEqual(result, 'Bearer {}'.format(get_jwt(9000)))
+        get_refresh_token_patch.assert_not_called()
+
+    @patch('vRAclient.tokens.time', return_value=1000)
+    @patch('vRAclient.tokens.get_access_token')
+    @patch('vRAclient.tokens.get_refresh_token', return_value='--new-refresh--')
+    def test__refresh_Should_LoginWithPassword_When_RefreshTokenRejected(self, get_refresh_token_patch, get_access_token_patch, *patches):
+        get_access_token_patch.side_effect = [requests.exceptions.HTTPError('400'), get_jwt(5000)]
+        manager = TokenManager('hostname', 'username', 'password', 'tenant')
+        manager.refresh_token = '--expired-refresh--'
+        manager.refresh()
+        self.assertEqual(manager.refresh_token, '--new-refresh--')
+        self.assertEqual(get_access_token_patch.mock_calls[1], call('hostname', '--new-refresh--', session=None, rate_limiter=None))
+
+    @patch('vRAclient.tokens.time', return_value=1000)
+    @patch('vRAclient.tokens.get_access_token', return_value=get_jwt(5000))
+    @patch('vRAclient.tokens.get_refresh_token', return_value='--refresh--')
+    def test__refresh_Should_CallOnRefresh_When_Refreshed(self, *patches):
+        on_refresh_mock = Mock()
+        manager = TokenManager('hostname', 'username', 'password', 'tenant', on_refresh=on_refresh_mock)
+        manager.refresh()
+        on_refresh_mock.assert_called_once_with()
+
+    def test__update_Should_StoreAndPersistTokens_When_Called(self, *patches):
+        cache_path = os.path.join(self.directory, 'tokens.json')
+        on_refresh_mock = Mock()
+        manager = TokenManager('hostname', 'username', 'password', 'tenant', cache_path=cache_path, on_refresh=on_refresh_mock)
+        manager.update(get_jwt(9000000000), refresh_token='--refresh--')
+        self.assertTrue(manager.is_valid())
+        self.assertEqual(manager.refresh_token, '--refresh--')
+        self.assertEqual(TokenManager('hostname', 'username', 'password', 'tenant', cache_path=cache_path).refresh_token, '--refresh--')
+        on_refresh_mock.assert_called_once_with()
+
+    def test__invalidate_Should_NotExpireToken_When_RejectedTokenIsNotCurrent(self, *patches):
+        manager = TokenManager('hostname', 'username', 'password', 'tenant')
+        manager.access_token = 'new'
+        manager.expires_at = 5000
+        manager.invalidate('Bearer old')
+        self.assertEqual(manager.expires_at, 5000)
+        manager.invalidate('Bearer new')
+        self.assertEqual(manager.expires_at, 0)
+
+    @patch('vRAclient.tokens.time', return_value=1000)
+    @patch('vRAclient.tokens.get_access_token')
+    @patch('vRAclient.tokens.get_refresh_token', return_value='--refresh--')
+    def test__save_Should_PersistTokensWithOwnerOnlyPermissions_When_CachePathSpecified(self, get_refresh_token_patch, get_access_token_patch, *patches):
+        get_access_token_patch.return_value = get_jwt(5000)
+        cache_path = os.path.join(self.directory, 'tokens', 'cache.json')
+        TokenManager('hostname', 'username', 'password', 'tenant', cache_path=cache_path).get_bearer_token()
+        self.assertEqual(os.stat(cache_path).st_mode & 0o777, 0o600)
+        manager = TokenManager('HOSTNAME', 'username', 'password', 'tenant', cache_path=cache_path)
+        self.assertEqual(manager.refresh_token, '--refresh--')
+        self.assertEqual(manager.get_bearer_token(), 'Bearer {}'.format(get_jwt(5000)))
+        self.assertEqual(get_refresh_token_patch.call_count, 1)
+
+    def test__load_Should_IgnoreCache_When_CacheFileInvalid(self, *patches):
+        cache_path = os.path.join(self.directory, 'cache.json')
+        with open(cache_path, 'w') as handle:
+            handle.write('not json')
+        manager = TokenManager('hostname', 'username', 'password', 'tenant', cache_path=cache_path)
+        self.assertIsNone(manager.access_token)
+
+    def test__get_access_token_Should_WaitForRateLimiter_When_RateLimiterSpecified(self, *patches):
+        session_mock = Mock()
+        session_mock.post.return_value.json.return_value = {'token': '--token--'}
+        rate_limiter_mock = Mock()
+        result = get_access_token('hostname', '--refresh--', session=session_mock, rate_limiter=rate_limiter_mock)
+        rate_limiter_mock.acquire.assert_called_once_with('https://hostname/iaas/api/login')
+        self.assertEqual(session_mock.post.call_args[0][0], 'https://hostname/iaas/api/login')
+        self.assertEqual(result, '--token--')
+
+    def test__get_refresh_token_Should_WaitForRateLimiter_When_RateLimiterSpecified(self, *patches):
+        session_mock = Mock()
+        session_mock.post.return_value.json.return_value = {'refresh_token': '--refresh--'}
+        rate_limiter_mock = Mock()
+        result = get_refresh_token('hostname', 'username', 'password', 'tenant', session=session_mock, rate_limiter=rate_limiter_mock)
+        rate_limiter_mock.acquire.assert_called_once_with('https://hostname/csp/gateway/am/api/login?access_token')
+        self.assertEqual(result, '--refresh--')
+
+    @patch('vRAclient.tokens.get_access_token')
+    @patch('vRAclient.tokens.get_refresh_token', return_value='--refresh--')
+    def test__refresh_Should_PassRateLimiter_When_RateLimiterSpecified(self, get_refresh_token_patch, get_access_token_patch, *patches):
+        get_access_token_patch.return_value = get_jwt(5000)
+        rate_limiter_mock = Mock()
+        manager = TokenManager('hostname', 'username', 'password', 'tenant', rate_limiter=rate_limiter_mock)
+        manager.refresh()
+        get_refresh_token_patch.assert_called_once_with('hostname', 'username', 'password', 'tenant', session=None, rate_limiter=rate_limiter_mock)
+        get_access_token_patch.assert_called_once_with('hostname', '--refresh--', session=None, rate_limiter=rate_limiter_mock)
@@ -0,0 +1,131 @@
+
+import os
+import json
+import tempfile
+import threading
+import unittest
+from mock import Mock
+
+from vRAclient.trace import Tracer
+from vRAclient.trace import traced
+
+import sys
+import logging
+logger = logging.getLogger(__name__)
+
+consoleHandler = logging.StreamHandler(sys.stdout)
+logFormatter = logging.Formatter("%(asctime)s %(threadName)s %(name)s [%(funcName)s] %(levelname)s %(message)s")
+consoleHandler.setFormatter(logFormatter)
+rootLogger = logging.getLogger()
+rootLogger.addHandler(consoleHandler)
+rootLogger.setLevel(logging.DEBUG)
+
+
+class Client(object):
+
+    def __init__(self, tracer=None):
+        self.tracer = tracer
+
+    @traced
+    def get_value(self, value):
+        return value
+
+    @traced
+    def get_items(self, count):
+        for item in range(count):
+            yield item
+
+    @traced
+    def get_page(self, count):
+        return (item for item in range(count))
+
+    @traced
+    def fail(self):
+        raise ValueError('failed')
+
+
+class TestTrace(unittest.TestCase):
+
+    def setUp(self):
+
+        pass
+
+    def tearDown(self):
+
+        pass
+
+    def get_spans(self, tracer):
+        return [event for event in tracer.get_trace()['traceEvents'] if event['ph'] == 'X']
+
+    def test__span_Should_RecordCompleteEvent_When_BlockExits(self, *patches):
+        tracer = Tracer()
+        with tracer.span('GET /iaas/api/machines', category='http', url='/iaas/api/machines') as args:
+            args['status'] = 200
+        spans = self.get_spans(tracer)
+        self.assertEqual(len(spans), 1)
+        self.assertEqual(spans[0]['name'], 'GET /iaas/api/machines')
+        self.assertEqual(spans[0]['cat'], 'http')
+        self.assertEqual(spans[0]['tid'], threading.get_ident())
+        self.assertEqual(spans[0]['args'], {'url': '/iaas/api/machines', 'status': 200})
+        self.assertGreaterEqual(spans[0]['dur'], 0)
+
+    def test__span_Should_ContainNestedSpan_When_Nested(self, *patches):
+        tracer = Tracer()
+        with tracer.span('outer'):
+            with tracer.span('inner'):
+                pass
+        inner, outer = sorted(self.get_spans(tracer), key=lambda span: span['name'])
+        self.assertLessEqual(outer['ts'], inner['ts'])
+        self.assertGreaterEqual(outer['ts'] + outer['dur'], inner['ts'] + inner['dur'])
+
+    def test__span_Should_RecordError_When_BlockRaises(self, *patches):
+        tracer = Tracer()
+        with self.assertRaises(ValueError):
+            Client(tracer).fail()
+        self.assertEqual(self.get_spans(tracer)[0]['args'], {'error': 'ValueError'})
+
+    def test__get_trace_Should_NameThreads_When_SpansRecordedOnThreads(self, *patches):
+        tracer = Tracer()
+
+        def run():
+            with tracer.span('work'):
+                pass
+
+        thread = threading.Thread(target=run, name='worker-1')
+        thread.start()
+        thread.join()
+        metadata = [event for event in tracer.get_trace()['traceEvents'] if event['ph'] == 'M']
+        self.assertEqual(metadata, [{'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(), 'tid': thread.ident, 'args': {'name': 'worker-1'}}])
+
+    def test__traced_Should_NotRecord_When_NoTracer(self, *patches):
+        self.assertEqual(Client().get_value(1), 1)
+        self.assertEqual(list(Client().get_items(2)), [0, 1])
+
+    def test__traced_Should_SpanIteration_When_GeneratorFunction(self, *patches):
+        tracer = Tracer()
+        items = Client(tracer).get_items(3)
+        self.assertEqual(self.get_spans(tracer), [])
+        self.assertEqual(list(items), [0, 1, 2])
+        self.assertEqual([span['name'] for span in self.get_spans(tracer)], ['get_items'])
+
+    def test__traced_Should_SpanIteration_When_GeneratorReturned(self, *patches):
+        tracer = Tracer()
+        self.assertEqual(list(Client(tracer).get_page(2)), [0, 1])
+        self.assertEqual([span['name'] for span in self.get_spans(tracer)], ['get_page', 'get_page'])
+
+    def test__save_Should_WriteChromeTrace_When_Called(self, *patches):
+        tracer = Tracer()
+        Client(tracer).get_value(1)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'trace.json')
+            tracer.save(path)
+            with open(path) as handle:
+                trace = json.load(handle)
+        self.assertEqual(trace['displayTimeUnit'], 'ms')
+        self.assertEqual([event['name'] for event in trace['traceEvents'] if event['ph'] == 'X'], ['get_value'])
+
+    def test__reset_Should_DiscardSpans_When_Called(self, *patches):
+        tracer = Tracer()
+        Client(tracer).get_value(1)
+        tracer.reset()
+        self.assertEqual(tracer.get_trace()['traceEvents'], [])
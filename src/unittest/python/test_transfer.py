@@ -0,0 +1,75 @@
+
+import unittest
+from mock import patch
+from mock import Mock
+
+from vRAclient.transfer import TransferStats
+from vRAclient.transfer import get_endpoint_template
+from vRAclient.transfer import get_wire_bytes
+
+import sys
+import logging
+logger = logging.getLogger(__name__)
+
+consoleHandler = logging.StreamHandler(sys.stdout)
+logFormatter = logging.Formatter("%(asctime)s %(threadName)s %(name)s [%(funcName)s] %(levelname)s %(message)s")
+consoleHandler.setFormatter(logFormatter)
+rootLogger = logging.getLogger()
+rootLogger.addHandler(consoleHandler)
+rootLogger.setLevel(logging.DEBUG)
+
+
+class TestTransfer(unittest.TestCase):
+
+    def setUp(self):
+
+        pass
+
+    def tearDown(self):
+
+        pass
+
+    def test__get_endpoint_template_Should_ReplaceIds_When_Path(self, *patches):
+        result = get_endpoint_template(
+            '/catalog-service/api/consumer/resources/6f0ac5f4-5d7c-4d6b-8f8e-0a1b2c3d4e5f/actions/0a1b2c3d-5d7c-4d6b-8f8e-6f0ac5f4e5f9/requests/template')
+        self.assertEqual(result, '/catalog-service/api/consumer/resources/{id}/actions/{id}/requests/template')
+
+    def test__get_endpoint_template_Should_RemoveHostAndQuery_When_Url(self, *patches):
+        result = get_endpoint_template('https://enterprisecloud.intel.com/iaas/api/machines?&$top=200&$skip=400')
+        self.assertEqual(result, '/iaas/api/machines')
+
+    def test__get_endpoint_template_Should_ReplaceNumericIds_When_Path(self, *patches):
+        self.assertEqual(get_endpoint_template('/policy/api/policies/1234'), '/policy/api/policies/{id}')
+
+    def test__get_endpoint_template_Should_KeepNames_When_NoDigits(self, *patches):
+        result = get_endpoint_template('/catalog-service/api/consumer/entitledCatalogItems')
+        self.assertEqual(result, '/catalog-service/api/consumer/entitledCatalogItems')
+
+    def test__get_wire_bytes_Should_ReturnRawPosition_When_Available(self, *patches):
+        response_mock = Mock()
+        response_mock.raw.tell.return_value = 120
+        self.assertEqual(get_wire_bytes(response_mock, 800), 120)
+
+    def test__get_wire_bytes_Should_ReturnDefault_When_RawUnavailable(self, *patches):
+        response_mock = Mock()
+        response_mock.raw.tell.side_effect = AttributeError()
+        self.assertEqual(get_wire_bytes(response_mock, 800), 800)
+        self.assertEqual(get_wire_bytes(Mock(raw=None), 800), 800)
+
+    def test__get_stats_Should_ReturnCountersAndRatio_When_Recorded(self, *patches):
+        stats = TransferStats()
+        stats.record('/iaas/api/machines', 100, 800)
+        stats.record('/iaas/api/machines', 100, 400)
+        stats.record('/iaas/api/projects', 0, 0)
+        result = stats.get_stats()
+        expected_result = {
+            '/iaas/api/machines': {'requests': 2, 'wire_bytes': 200, 'decoded_bytes': 1200, 'ratio': 6.0},
+            '/iaas/api/projects': {'requests': 1, 'wire_bytes': 0, 'decoded_bytes': 0, 'ratio': None}
+        }
+        self.assertEqual(result, expected_result)
+
+    def test__reset_Should_ClearCounters_When_Called(self, *patches):
+        stats = TransferStats()
+        stats.record('/iaas/api/machines', 100, 800)
+        stats.reset()
+        self.assertEqual(stats.get_stats(), {})
@@ -1,13 +1,23 @@
 
 import unittest
+import requests
+from datetime import datetime
+from itertools import count
 from mock import patch
 # from mock import mock_open
 from mock import call
 from mock import Mock
+from mock import ANY
 
 from vRAclient import vRAclient
 from vRAclient.vraclient import get_bearer_token
 from vRAclient.vraclient import get_id
+from vRAclient.vraclient import get_or_filter
+from vRAclient.vraclient import get_chunks
+from vRAclient.vraclient import get_request_id
+from vRAclient.vraclient import get_paged_endpoint
+from vRAclient.vraclient import get_select_endpoint
+from vRAclient.vraclient import get_trimmed
 from vRAclient.vraclient import get_endpoint_resource_name
 from vRAclient.vraclient import validate_lease_days
 from vRAclient.vraclient import ResourceNotFound
@@ -17,6 +27,11 @@ from vRAclient.vraclient import RequestFailed
 from vRAclient.vraclient import NoPermission
 from vRAclient.vraclient import VRA_HOST
 from vRAclient.vraclient import VRA_TENANT
+from vRAclient.sync import Snapshot
+from vRAclient.records import Projection
+from vRAclient.retry import RetryPolicy
+from vRAclient.trace import Tracer
+from vRAclient.metrics import Metrics
 
 import sys
 import logging
@@ -50,40 +65,41 @@ class TestVraClient(unittest.TestCase):
     def test__get_bearer_token_ShouldReturnExpected_When_Called(self, post_patch, *patches):
         response_mock = Mock()
         response_mock.json.return_value = {
-            'id': '<bearer token>'
+            'refresh_token': '<refresh token>',
+            'token': '<bearer token>'
         }
         post_patch.return_value = response_mock
         result = get_bearer_token('hostname', 'username', 'password', 'tenant')
-        expected_result = response_mock.json.return_value['id']
+        expected_result = 'Bearer <bearer token>'
         self.assertEqual(result, expected_result)
 
     @patch('vRAclient.vraclient.os.environ.get', return_value=None)
-    @patch('vRAclient.vraclient.get_bearer_token', return_value='--token--')
+    @patch('vRAclient.vraclient.TokenManager')
     @patch('vRAclient.vraclient.vRAclient')
-    def test__get_vRAclient_Should_SetDefaultHostname_When_HostnameNotSpecifiedAndNotInEnvironment(self, vraclient_patch, *patches):
+    def test__get_vRAclient_Should_SetDefaultHostname_When_HostnameNotSpecifiedAndNotInEnvironment(self, vraclient_patch, token_manager_patch, *patches):
         vRAclient.get_vRAclient(username='username', password='password', tenant='tenant')
-        self.assertTrue(call(VRA_HOST, bearer_token='--token--', username='username') in vraclient_patch.mock_calls)
+        self.assertTrue(call(VRA_HOST, username='username', session=ANY, token_manager=token_manager_patch.return_value) in vraclient_patch.mock_calls)
 
     @patch('vRAclient.vraclient.os.environ.get', return_value='value')
     @patch('vRAclient.vraclient.vRAclient')
-    @patch('vRAclient.vraclient.get_bearer_token')
-    def test__get_vRAclient_Should_GetUsernameFromEnvironment_When_UsernameNotSpecified(self, get_bearer_token_patch, *patches):
+    @patch('vRAclient.vraclient.TokenManager')
+    def test__get_vRAclient_Should_GetUsernameFromEnvironment_When_UsernameNotSpecified(self, token_manager_patch, *patches):
         vRAclient.get_vRAclient(hostname='hostname', password='password', tenant='tenant')
-        self.assertTrue(call('hostname', 'value', 'password', 'tenant') in get_bearer_token_patch.mock_calls)
+        self.assertTrue(call('hostname', 'value', 'password', 'tenant', cache_path='value') in token_manager_patch.mock_calls)
 
     @patch('vRAclient.vraclient.os.environ.get', return_value='value')
     @patch('vRAclient.vraclient.vRAclient')
-    @patch('vRAclient.vraclient.get_bearer_token')
-    def test__get_vRAclient_Should_GetPasswordFromEnvironment_When_PasswordNotSpecified(self, get_bearer_token_patch, *patches):
+    @patch('vRAclient.vraclient.TokenManager')
+    def test__get_vRAclient_Should_GetPasswordFromEnvironment_When_PasswordNotSpecified(self, token_manager_patch, *patches):
         vRAclient.get_vRAclient(hostname='hostname', username='username', tenant='tenant')
-        self.assertTrue(call('hostname', 'username', 'value', 'tenant') in get_bearer_token_patch.mock_calls)
+        self.assertTrue(call('hostname', 'username', 'value', 'tenant', cache_path='value') in token_manager_patch.mock_calls)
 
     @patch('vRAclient.vraclient.os.environ.get', return_value='value')
     @patch('vRAclient.vraclient.vRAclient')
-    @patch('vRAclient.vraclient.get_bearer_token')
-    def test__get_vRAclient_Should_GetTenantFromEnvironment_When_TenantNotSpecified(self, get_bearer_token_patch, *patches):
+    @patch('vRAclient.vraclient.TokenManager')
+    def test__get_vRAclient_Should_GetTenantFromEnvironment_When_TenantNotSpecified(self, token_manager_patch, *patches):
         vRAclient.get_vRAclient(hostname='hostname', username='username', password='password')
-        self.assertTrue(call('hostname', 'username', 'password', 'value') in get_bearer_token_patch.mock_calls)
+        self.assertTrue(call('hostname', 'username', 'password', 'value', cache_path='value') in token_manager_patch.mock_calls)
 
     @patch('vRAclient.vraclient.os.environ.get', return_value=None)
     def test__get_vRAclient_Should_RaiseValueError_When_UsernameNotSpecifiedAndNotInEnvironment(self, *patches):
@@ -96,10 +112,46 @@ class TestVraClient(unittest.TestCase):
             vRAclient.get_vRAclient(hostname='hostname', username='username', tenant='tenant')
 
     @patch('vRAclient.vraclient.os.environ.get', return_value=None)
-    @patch('vRAclient.vraclient.get_bearer_token')
-    def test__get_vRAclient_Should_SetDefaultTenant_When_TenantNotSpecifiedAndNotInEnvironment(self, get_bearer_token_patch, *patches):
+    @patch('vRAclient.vraclient.vRAclient')
+    @patch('vRAclient.vraclient.TokenManager')
+    def test__get_vRAclient_Should_SetDefaultTenant_When_TenantNotSpecifiedAndNotInEnvironment(self, token_manager_patch, *patches):
         vRAclient.get_vRAclient(hostname='hostname', username='username', password='password')
-        self.assertTrue(call('hostname', 'username', 'password', VRA_TENANT) in get_bearer_token_patch.mock_calls)
+        self.assertTrue(call('hostname', 'username', 'password', VRA_TENANT, cache_path=None) in token_manager_patch.mock_calls)
+
+    @patch('vRAclient.vraclient.os.environ.get', return_value=None)
+    @patch('vRAclient.vraclient.vRAclient')
+    @patch('vRAclient.vraclient.TokenManager')
+    def test__get_vRAclient_Should_PassTokenCache_When_TokenCacheSpecified(self, token_manager_patch, *patches):
+        vRAclient.get_vRAclient(hostname='hostname', username='username', password='password', tenant='tenant', token_cache='~/.vra/tokens')
+        self.assertTrue(call('hostname', 'username', 'password', 'tenant', cache_path='~/.vra/tokens') in token_manager_patch.mock_calls)
+
+    @patch('vRAclient.vraclient.os.environ.get', return_value=None)
+    @patch('vRAclient.vraclient.get_session')
+    @patch('vRAclient.vraclient.vRAclient')
+    @patch('vRAclient.vraclient.TokenManager')
+    def test__get_vRAclient_Should_PassRetryPolicyToClient_When_RetryPolicySpecified(self, token_manager_patch, vraclient_patch, get_session_patch, *patches):
+        retry_policy = RetryPolicy(retries=8)
+        vRAclient.get_vRAclient(hostname='hostname', username='username', password='password', retry_policy=retry_policy, pool_maxsize=4)
+        get_session_patch.assert_called_once_with(pool_maxsize=4)
+        self.assertTrue(call('hostname', username='username', session=ANY, token_manager=ANY, retry_policy=retry_policy) in vraclient_patch.mock_calls)
+
+    @patch('vRAclient.vraclient.os.environ.get', return_value=None)
+    @patch('vRAclient.vraclient.get_session')
+    @patch('vRAclient.vraclient.TokenManager')
+    def test__get_vRAclient_Should_PassClientOptionsToClient_When_Specified(self, token_manager_patch, get_session_patch, *patches):
+        token_manager_patch.return_value.on_refresh = None
+        metrics = Metrics()
+        client = vRAclient.get_vRAclient(
+            hostname='hostname', username='username', password='password', metrics=metrics, pool_block=True, compress=False)
+        get_session_patch.assert_called_once_with(pool_block=True, compress=False)
+        self.assertIs(client.metrics, metrics)
+
+    def test__init_Should_SetTokenManagerRateLimiter_When_TokenManagerHasNone(self, *patches):
+        token_manager_mock = Mock(rate_limiter=None, on_refresh=None)
+        token_manager_mock.get_bearer_token.return_value = 'Bearer --token--'
+        rate_limiter_mock = Mock()
+        vRAclient('enterprisecloud.intel.com', username='ad_lereyes1', token_manager=token_manager_mock, rate_limiter=rate_limiter_mock)
+        self.assertIs(token_manager_mock.rate_limiter, rate_limiter_mock)
 
     def test__init_Should_RaiseValueError_When_BearerTokenNotSpecified(self, *patches):
         with self.assertRaises(ValueError):
@@ -109,6 +161,12 @@ class TestVraClient(unittest.TestCase):
         with self.assertRaises(ValueError):
             vRAclient('hostname', bearer_token='--token--')
 
+    def test__init_Should_GetBearerTokenFromTokenManager_When_BearerTokenNotSpecified(self, *patches):
+        token_manager_mock = Mock()
+        token_manager_mock.get_bearer_token.return_value = 'Bearer --token--'
+        client = vRAclient('hostname', username='ad_lereyes1', token_manager=token_manager_mock)
+        self.assertEqual(client.bearer_token, 'Bearer --token--')
+
     def test__get_next_page_href_Should_ReturnNextHref_When_NextHrefInLinks(self, *patches):
         client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
         links = [{'@type': 'link', 'rel': 'next', 'href': 'https://enterprisecloud.intel.com/catalog-service/api/consumer/resources?page=2&limit=20&$orderby=dateCreated'}]
@@ -339,6 +397,7 @@ class TestVraClient(unittest.TestCase):
         result = client.wait_for_request(request_id=None)
         self.assertIsNone(result)
 
+    @patch('vRAclient.vraclient.monotonic', side_effect=count(0, 10))
     @patch('vRAclient.vraclient.sleep')
     @patch('vRAclient.vRAclient.get')
     def test__wait_for_request_Should_RaiseWaitTimeExceeded_When_WaitTimeExceeded(self, get_patch, *patches):
@@ -406,19 +465,18 @@ class TestVraClient(unittest.TestCase):
 
     @patch('vRAclient.vraclient.validate_lease_days', return_value=180)
     @patch('vRAclient.vraclient.get_id', return_value='001')
-    @patch('vRAclient.vRAclient.post')
+    @patch('vRAclient.vRAclient.request')
     @patch('vRAclient.vRAclient.wait_for_request')
     @patch('vRAclient.vRAclient.get')
     @patch('vRAclient.vRAclient.get_endpoint_resource')
-    def test__extend_lease_action_Should_CallWaitForRequest_When_WaitForRequestTrue(self, get_endpoint_resource_patch, get_patch, wait_for_request_patch, *patches):
+    def test__extend_lease_action_Should_CallWaitForRequest_When_WaitForRequestTrue(self, get_endpoint_resource_patch, get_patch, wait_for_request_patch, request_patch, *patches):
         get_endpoint_resource_patch.side_effect = [
             {
                 'id': '123',
                 'operations': []
-            }, {
-                'id': '890'
             }
         ]
+        request_patch.return_value = Mock(content=b'', headers={'Location': 'https://enterprisecloud.intel.com/catalog-service/api/consumer/requests/890'})
         get_patch.return_value = {
             'data': {
                 'provider-NewLease': '',
@@ -433,18 +491,17 @@ class TestVraClient(unittest.TestCase):
 
     @patch('vRAclient.vraclient.validate_lease_days', return_value=180)
     @patch('vRAclient.vraclient.get_id', return_value='001')
-    @patch('vRAclient.vRAclient.post')
+    @patch('vRAclient.vRAclient.request')
     @patch('vRAclient.vRAclient.get')
     @patch('vRAclient.vRAclient.get_endpoint_resource')
-    def test__extend_lease_action_Should_ReturnRequestId_When_WaitForRequestFalse(self, get_endpoint_resource_patch, get_patch, *patches):
+    def test__extend_lease_action_Should_ReturnRequestId_When_WaitForRequestFalse(self, get_endpoint_resource_patch, get_patch, request_patch, *patches):
         get_endpoint_resource_patch.side_effect = [
             {
                 'id': '123',
                 'operations': []
-            }, {
-                'id': '890'
             }
         ]
+        request_patch.return_value = Mock(content=b'', headers={'Location': 'https://enterprisecloud.intel.com/catalog-service/api/consumer/requests/890'})
         get_patch.return_value = {
             'data': {
                 'provider-NewLease': '',
@@ -503,3 +560,895 @@ class TestVraClient(unittest.TestCase):
         client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
         result = client.extend_lease(server_names=['server123', 'server234'], wait_for_request=False)
         self.assertEqual(result, '<--request_id-->')
+
+    def test__request_Should_SendRequestThroughSession_When_EndpointIsPath(self, *patches):
+        session_mock = Mock()
+        session_mock.request.return_value = Mock(content=b'{}')
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1', session=session_mock)
+        result = client.request('GET', '/iaas/api/projects')
+        session_mock.request.assert_called_once_with(
+            'GET',
+            'https://enterprisecloud.intel.com/iaas/api/projects',
+            headers=client.get_headers(),
+            verify=client.cabundle)
+        self.assertEqual(result, session_mock.request.return_value)
+
+    def test__request_Should_NotPrefixHostname_When_EndpointIsUrl(self, *patches):
+        session_mock = Mock()
+        session_mock.request.return_value = Mock(content=b'{}')
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1', session=session_mock)
+        client.request('GET', 'https://enterprisecloud.intel.com/iaas/api/projects', headers={'accept': 'application/json'})
+        session_mock.request.assert_called_once_with(
+            'GET',
+            'https://enterprisecloud.intel.com/iaas/api/projects',
+            headers={'accept': 'application/json'},
+            verify=client.cabundle)
+
+    def test__get_Should_ReturnNone_When_ResponseHasNoContent(self, *patches):
+        session_mock = Mock()
+        session_mock.request.return_value.content = b''
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1', session=session_mock)
+        self.assertIsNone(client.get('/iaas/api/projects'))
+
+    def test__get_vmdetails_name_Should_UseClientSession_When_Called(self, *patches):
+        session_mock = Mock()
+        session_mock.request.return_value.json.return_value = {'content': ['m1', 'm2']}
+        session_mock.request.return_value.content = b'{"content": ["m1", "m2"]}'
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1', session=session_mock)
+        result = client.get_vmdetails_name('--token--', 'enterprisecloud.intel.com', 200)
+        self.assertEqual(result, ['m1', 'm2'])
+        session_mock.request.assert_called_once_with(
+            'GET',
+            'https://enterprisecloud.intel.com/iaas/api/machines?&$top=200&$skip=200',
+            headers={'accept': 'application/json', 'authorization': '--token--'},
+            verify=client.cabundle)
+
+    @patch('vRAclient.vraclient.get_pool_stats')
+    def test__get_pool_stats_Should_ReturnSessionPoolStats_When_Called(self, get_pool_stats_patch, *patches):
+        session_mock = Mock()
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1', session=session_mock)
+        result = client.get_pool_stats()
+        get_pool_stats_patch.assert_called_once_with(session_mock)
+        self.assertEqual(result, get_pool_stats_patch.return_value)
+
+    @patch('vRAclient.vRAclient.get')
+    def test__get_collection_Should_YieldItemsInOrder_When_MultiplePages(self, get_patch, *patches):
+        pages = {
+            '/iaas/api/machines?$top=2&$skip=0': {'content': ['m1', 'm2'], 'totalElements': 5},
+            '/iaas/api/machines?$top=2&$skip=2': {'content': ['m3', 'm4'], 'totalElements': 5},
+            '/iaas/api/machines?$top=2&$skip=4': {'content': ['m5'], 'totalElements': 5}
+        }
+        get_patch.side_effect = lambda endpoint: pages[endpoint]
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        result = list(client.get_collection('/iaas/api/machines', page_size=2, max_workers=2))
+        expected_result = ['m1', 'm2', 'm3', 'm4', 'm5']
+        self.assertEqual(result, expected_result)
+
+    @patch('vRAclient.vRAclient.get')
+    def test__get_collection_Should_UseServerPageSize_When_ServerCapsTop(self, get_patch, *patches):
+        pages = {
+            '/iaas/api/machines?$top=500&$skip=0': {'content': ['m1', 'm2'], 'totalElements': 3},
+            '/iaas/api/machines?$top=2&$skip=2': {'content': ['m3'], 'totalElements': 3}
+        }
+        get_patch.side_effect = lambda endpoint: pages[endpoint]
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        result = list(client.get_collection('/iaas/api/machines', page_size=500))
+        expected_result = ['m1', 'm2', 'm3']
+        self.assertEqual(result, expected_result)
+
+    @patch('vRAclient.vRAclient.get')
+    def test__get_collection_Should_RetrieveOnePage_When_AllItemsInFirstPage(self, get_patch, *patches):
+        get_patch.return_value = {'content': ['p1'], 'totalElements': 1}
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        result = list(client.get_quota_policies())
+        self.assertEqual(result, ['p1'])
+        get_patch.assert_called_once_with('/policy/api/policies?search=Resource Quota&$top=200&$skip=0')
+
+    @patch('vRAclient.vRAclient.get_collection')
+    def test__get_deployments_Should_CallGetCollection_When_Called(self, get_collection_patch, *patches):
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        client.get_deployments()
+        get_collection_patch.assert_called_once_with(
+            '/deployment/api/deployments?resourceTypes=Cloud.vSphere.Machine&status=CREATE_SUCCESSFUL', page_size=200, max_workers=8, fields=None)
+
+    def test__get_stream_Should_YieldItemsAndCloseResponse_When_Called(self, *patches):
+        session_mock = Mock()
+        response_mock = session_mock.request.return_value
+        response_mock.iter_content.return_value = [b'{"content": [{"id": ', b'"1"}, {"id": "2"}]}']
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1', session=session_mock)
+        result = list(client.get_stream('/iaas/api/projects'))
+        self.assertEqual(result, [{'id': '1'}, {'id': '2'}])
+        self.assertTrue(session_mock.request.call_args[1]['stream'])
+        response_mock.close.assert_called_once_with()
+
+    @patch('vRAclient.vRAclient.get_stream')
+    def test__get_subtenants_Should_ReturnStream_When_StreamTrue(self, get_stream_patch, *patches):
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        result = client.get_subtenants(stream=True)
+        get_stream_patch.assert_called_once_with('/iaas/api/projects?limit=1000000&$orderby=id')
+        self.assertEqual(result, get_stream_patch.return_value)
+
+    @patch('vRAclient.vRAclient.get_stream')
+    def test__get_subtenants_new_Should_ReturnStream_When_StreamTrue(self, get_stream_patch, *patches):
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        result = client.get_subtenants_new('--token--', 'enterprisecloud.intel.com', stream=True)
+        get_stream_patch.assert_called_once_with(
+            'https://enterprisecloud.intel.com/iaas/api/projects?size=10000',
+            headers={'accept': 'application/json', 'authorization': '--token--'})
+        self.assertEqual(result, get_stream_patch.return_value)
+
+    def test__request_Should_RefreshTokenAndRetryOnce_When_Unauthorized(self, *patches):
+        session_mock = Mock()
+        unauthorized_mock = Mock(status_code=401)
+        ok_mock = Mock(status_code=200, content=b'{}')
+        session_mock.request.side_effect = [unauthorized_mock, ok_mock]
+        token_manager_mock = Mock()
+        token_manager_mock.get_bearer_token.side_effect = ['Bearer old', 'Bearer old', 'Bearer new']
+        client = vRAclient('enterprisecloud.intel.com', username='ad_lereyes1', session=session_mock, token_manager=token_manager_mock)
+        result = client.request('GET', '/iaas/api/projects')
+        self.assertEqual(result, ok_mock)
+        token_manager_mock.invalidate.assert_called_once_with('Bearer old')
+        self.assertEqual(session_mock.request.call_args[1]['headers']['Authorization'], 'Bearer new')
+
+    def test__request_Should_NotRetry_When_UnauthorizedWithoutTokenManager(self, *patches):
+        session_mock = Mock()
+        session_mock.request.return_value = Mock(status_code=401, content=b'')
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1', session=session_mock)
+        client.request('GET', '/iaas/api/projects')
+        self.assertEqual(session_mock.request.call_count, 1)
+
+    def test__get_or_filter_Should_ReturnExpected_When_Called(self, *patches):
+        result = get_or_filter("id eq '{}'", ['1', '2', '3'])
+        expected_result = "id eq '1' or id eq '2' or id eq '3'"
+        self.assertEqual(result, expected_result)
+
+    def test__get_chunks_Should_ReturnExpected_When_Called(self, *patches):
+        result = get_chunks(['1', '2', '3', '4', '5'], 2)
+        expected_result = [['1', '2'], ['3', '4'], ['5']]
+        self.assertEqual(result, expected_result)
+
+    @patch('vRAclient.vRAclient.get_page')
+    def test__get_request_states_Should_QueryChunksOfIds_When_Called(self, get_page_patch, *patches):
+        get_page_patch.side_effect = [
+            [[{'id': '1', 'state': 'SUCCESSFUL'}, {'id': '2', 'state': 'IN_PROGRESS'}]],
+            [[{'id': '3', 'state': 'FAILED'}]]
+        ]
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        result = client.get_request_states(['1', '2', '3'], chunk_size=2)
+        expected_result = {'1': 'successful', '2': 'in_progress', '3': 'failed'}
+        self.assertEqual(result, expected_result)
+        self.assertEqual(get_page_patch.mock_calls, [
+            call("/catalog-service/api/consumer/requests?limit=2&$filter=id eq '1' or id eq '2'"),
+            call("/catalog-service/api/consumer/requests?limit=1&$filter=id eq '3'")
+        ])
+
+    @patch('vRAclient.vraclient.sleep')
+    @patch('vRAclient.vRAclient.get_request_states')
+    def test__wait_for_requests_Should_DropCompletedIds_When_Polling(self, get_request_states_patch, *patches):
+        get_request_states_patch.side_effect = [
+            {'1': 'successful', '2': 'in_progress', '3': 'failed'},
+            {'2': 'successful'}
+        ]
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        result = client.wait_for_requests(request_ids=['1', '2', '3', '1'])
+        expected_result = {'1': 'successful', '2': 'successful', '3': 'failed'}
+        self.assertEqual(result, expected_result)
+        self.assertEqual(get_request_states_patch.mock_calls, [call(['1', '2', '3'], chunk_size=50), call(['2'], chunk_size=50)])
+
+    @patch('vRAclient.vraclient.monotonic', side_effect=count(0, 10))
+    @patch('vRAclient.vraclient.sleep')
+    @patch('vRAclient.vRAclient.get_request_states')
+    def test__wait_for_requests_Should_ReturnLastStates_When_TimeoutExceeded(self, get_request_states_patch, *patches):
+        get_request_states_patch.return_value = {'1': 'in_progress'}
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        result = client.wait_for_requests(request_ids=['1', '2'], delay=10, timeout=30)
+        expected_result = {'1': 'in_progress', '2': None}
+        self.assertEqual(result, expected_result)
+        self.assertEqual(get_request_states_patch.call_count, 3)
+
+    def test__wait_for_requests_Should_ReturnEmpty_When_NoRequestIds(self, *patches):
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        self.assertEqual(client.wait_for_requests(request_ids=[]), {})
+
+    @patch('vRAclient.vraclient.monotonic', side_effect=[0, 1, 9, 12])
+    @patch('vRAclient.vraclient.sleep')
+    @patch('vRAclient.vRAclient.get')
+    def test__wait_for_request_Should_SleepOnlyUntilDeadline_When_DelayExceedsRemainingTime(self, get_patch, sleep_patch, *patches):
+        get_patch.side_effect = [
+            {'state': 'in_progress'},
+            {'state': 'in_progress'},
+            {'state': 'in_progress'}
+        ]
+        schedule_mock = Mock()
+        schedule_mock.get_delays.return_value = iter([5, 50, 50])
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        with self.assertRaises(WaitTimeExceeded):
+            client.wait_for_request(request_id='123', timeout=10, schedule=schedule_mock)
+        self.assertEqual(sleep_patch.mock_calls, [call(5), call(1)])
+
+    @patch('vRAclient.vraclient.PollSchedule')
+    @patch('vRAclient.vraclient.sleep')
+    @patch('vRAclient.vRAclient.get')
+    def test__wait_for_request_Should_UseExpectedDuration_When_Adaptive(self, get_patch, sleep_patch, poll_schedule_patch, *patches):
+        get_patch.side_effect = [
+            {'state': 'in_progress', 'catalogItemRef': {'id': 'renew'}},
+            {'state': 'successful', 'catalogItemRef': {'id': 'renew'}}
+        ]
+        poll_schedule_patch.return_value.get_delays.return_value = iter([1])
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        client.completion_history.record('renew', 42)
+        client.wait_for_request(request_id='123', delay=10, adaptive=True)
+        poll_schedule_patch.assert_called_once_with(maximum=10, expected=42)
+        self.assertEqual(len(client.completion_history.durations['renew']), 2)
+
+    @patch('vRAclient.vRAclient.get_page')
+    def test__get_resources_by_names_Should_QueryChunksOfNames_When_Called(self, get_page_patch, *patches):
+        get_page_patch.side_effect = [
+            [[{'id': '1', 'name': 'Server1'}, {'id': '2', 'name': 'server2'}, {'id': '3', 'name': 'server2'}]],
+            [[]]
+        ]
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        result = client.get_resources_by_names(['SERVER1', 'server2', 'server3'], chunk_size=2)
+        expected_result = {
+            'server1': [{'id': '1', 'name': 'Server1'}],
+            'server2': [{'id': '2', 'name': 'server2'}, {'id': '3', 'name': 'server2'}],
+            'server3': []
+        }
+        self.assertEqual(result, expected_result)
+        self.assertEqual(get_page_patch.mock_calls[0], call(
+            "/catalog-service/api/consumer/resources?withOperations=true&limit=2&$filter=tolower(name) eq 'server1' or tolower(name) eq 'server2'"))
+
+    @patch('vRAclient.vRAclient.submit_lease_action')
+    @patch('vRAclient.vRAclient.get_resources_by_names')
+    def test__extend_lease_actions_Should_ReportRequestIdsAndErrors_When_Called(self, get_resources_by_names_patch, submit_lease_action_patch, *patches):
+        renew_lease = [{'id': 'op1', 'name': 'Renew Lease'}]
+        get_resources_by_names_patch.return_value = {
+            'server1': [{'id': 'r1', 'name': 'server1', 'operations': renew_lease}],
+            'server2': [],
+            'server3': [{'id': 'r3', 'name': 'server3', 'operations': []}],
+            'server4': [{'id': 'r4a', 'operations': renew_lease}, {'id': 'r4b', 'operations': renew_lease}],
+            'server5': [{'id': 'r5', 'name': 'server5', 'operations': renew_lease}]
+        }
+        submit_lease_action_patch.side_effect = lambda resource_id, *args: 'req1' if resource_id == 'r1' else self.raise_exception(Exception('submission failed'))
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        result = client.extend_lease_actions(server_names=['server1', 'server2', 'server3', 'server4', 'server5'], days=30)
+        self.assertEqual(result['server1'], {'request_id': 'req1', 'state': None, 'error': None})
+        self.assertIsInstance(result['server2']['error'], ResourceNotFound)
+        self.assertIsInstance(result['server3']['error'], NoPermission)
+        self.assertIsInstance(result['server4']['error'], MultipleResourcesFound)
+        self.assertIsNone(result['server5']['request_id'])
+        self.assertEqual(str(result['server5']['error']), 'submission failed')
+        self.assertTrue(call('r1', 'op1', 'server1', 30) in submit_lease_action_patch.mock_calls)
+
+    @patch('vRAclient.vRAclient.wait_for_requests')
+    @patch('vRAclient.vRAclient.submit_lease_action')
+    @patch('vRAclient.vRAclient.get_resources_by_names')
+    def test__extend_lease_actions_Should_ReportStates_When_WaitForRequestTrue(self, get_resources_by_names_patch, submit_lease_action_patch, wait_for_requests_patch, *patches):
+        renew_lease = [{'id': 'op1', 'name': 'Renew Lease'}]
+        get_resources_by_names_patch.return_value = {
+            'server1': [{'id': 'r1', 'operations': renew_lease}],
+            'server2': [{'id': 'r2', 'operations': renew_lease}]
+        }
+        submit_lease_action_patch.side_effect = lambda resource_id, *args: resource_id.replace('r', 'req')
+        wait_for_requests_patch.return_value = {'req1': 'successful', 'req2': 'failed'}
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        result = client.extend_lease_actions(server_names=['server1', 'server2'], wait_for_request=True)
+        wait_for_requests_patch.assert_called_once_with(request_ids=['req1', 'req2'], timeout=600)
+        self.assertEqual(result['server1'], {'request_id': 'req1', 'state': 'successful', 'error': None})
+        self.assertIsInstance(result['server2']['error'], RequestFailed)
+
+    @patch('vRAclient.vRAclient.wait_for_requests')
+    @patch('vRAclient.vRAclient.submit_lease_action')
+    @patch('vRAclient.vRAclient.get_resources_by_names')
+    def test__extend_lease_actions_Should_ReportWaitTimeExceeded_When_RequestPendingOrNotFound(self, get_resources_by_names_patch, submit_lease_action_patch, wait_for_requests_patch, *patches):
+        renew_lease = [{'id': 'op1', 'name': 'Renew Lease'}]
+        get_resources_by_names_patch.return_value = {
+            'server1': [{'id': 'r1', 'operations': renew_lease}],
+            'server2': [{'id': 'r2', 'operations': renew_lease}]
+        }
+        submit_lease_action_patch.side_effect = lambda resource_id, *args: resource_id.replace('r', 'req')
+        wait_for_requests_patch.return_value = {'req1': 'in_progress', 'req2': None}
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        result = client.extend_lease_actions(server_names=['server1', 'server2'], wait_for_request=True, timeout=60)
+        self.assertEqual(result['server1']['state'], 'in_progress')
+        self.assertIsInstance(result['server1']['error'], WaitTimeExceeded)
+        self.assertIsNone(result['server2']['state'])
+        self.assertIsInstance(result['server2']['error'], WaitTimeExceeded)
+        self.assertEqual([name for name, entry in result.items() if entry['error']], ['server1', 'server2'])
+
+    def raise_exception(self, exception):
+        raise exception
+
+    @patch('vRAclient.vRAclient.get_endpoint_resource')
+    def test__get_catalog_item_id_Should_LookupOnce_When_CalledTwice(self, get_endpoint_resource_patch, *patches):
+        get_endpoint_resource_patch.return_value = {'catalogItem': {'id': '123456'}}
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        client.get_catalog_item_id('Renew Multiple Leases')
+        result = client.get_catalog_item_id('renew multiple leases')
+        self.assertEqual(result, '123456')
+        get_endpoint_resource_patch.assert_called_once_with(
+            endpoint='/catalog-service/api/consumer/entitledCatalogItems',
+            with_filter="tolower(name) eq 'renew multiple leases'")
+
+    @patch('vRAclient.vRAclient.get')
+    def test__get_template_Should_ReturnCopyOfCachedTemplate_When_Called(self, get_patch, *patches):
+        get_patch.return_value = {'data': {'vmNames': ''}}
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        template = client.get_template('/template')
+        template['data']['vmNames'] = ['server1']
+        result = client.get_template('/template')
+        self.assertEqual(result, {'data': {'vmNames': ''}})
+        get_patch.assert_called_once_with('/template')
+
+    @patch('vRAclient.vRAclient.get')
+    def test__invalidate_cache_Should_RefetchTemplate_When_Invalidated(self, get_patch, *patches):
+        get_patch.return_value = {'data': {}}
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        client.get_template('/template')
+        client.invalidate_cache(kind='template')
+        client.get_template('/template')
+        self.assertEqual(get_patch.call_count, 2)
+
+    @patch('vRAclient.vraclient.os.environ.get', return_value=None)
+    @patch('vRAclient.vraclient.get_session')
+    @patch('vRAclient.vraclient.TokenManager')
+    def test__get_vRAclient_Should_PassCacheOptionsToClient_When_Specified(self, token_manager_patch, *patches):
+        token_manager_patch.return_value.on_refresh = None
+        client = vRAclient.get_vRAclient(hostname='hostname', username='username', password='password', cache_ttl=10, cache_size=5)
+        self.assertEqual(client.cache.ttl, 10)
+        self.assertEqual(client.cache.maxsize, 5)
+
+    def test__get_request_id_Should_ReturnBodyId_When_BodyHasId(self, *patches):
+        response_mock = Mock(content=b'{"id": "890"}', headers={'Location': '/requests/123'})
+        response_mock.json.return_value = {'id': '890'}
+        self.assertEqual(get_request_id(response_mock), '890')
+
+    def test__get_request_id_Should_ReturnLocationId_When_NoBody(self, *patches):
+        response_mock = Mock(content=b'', headers={'Location': 'https://enterprisecloud.intel.com/catalog-service/api/consumer/requests/890/'})
+        self.assertEqual(get_request_id(response_mock), '890')
+
+    def test__get_request_id_Should_ReturnNone_When_NoBodyAndNoLocation(self, *patches):
+        response_mock = Mock(content=b'', headers={})
+        self.assertIsNone(get_request_id(response_mock))
+
+    @patch('vRAclient.vRAclient.find_resource_request_id', return_value='890')
+    @patch('vRAclient.vRAclient.request')
+    @patch('vRAclient.vRAclient.get')
+    def test__submit_lease_action_Should_LookupRequest_When_ResponseHasNoRequestId(self, get_patch, request_patch, find_resource_request_id_patch, *patches):
+        get_patch.return_value = {'data': {}}
+        request_patch.return_value = Mock(content=b'', headers={})
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        result = client.submit_lease_action('123', '001', 'server123', 30)
+        self.assertEqual(result, '890')
+        self.assertEqual(find_resource_request_id_patch.call_args[0][0], '123')
+
+    @patch('vRAclient.vRAclient.get_page')
+    def test__find_resource_request_id_Should_ReturnRequestForResource_When_ConcurrentRequests(self, get_page_patch, *patches):
+        get_page_patch.return_value = [[
+            {'id': 'req2', 'resourceRef': {'id': '234'}},
+            {'id': 'req1', 'resourceRef': {'id': '123'}}
+        ]]
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        result = client.find_resource_request_id('123', datetime(2019, 4, 29))
+        self.assertEqual(result, 'req1')
+        get_page_patch.assert_called_once_with(
+            "/catalog-service/api/consumer/requests?limit=1000&$orderby=dateCreated desc&$filter=startswith(requestedBy, 'ad_lereyes1') and dateCreated gt '2019-04-29T00:00:00'")
+
+    @patch('vRAclient.vRAclient.get_page', return_value=[[{'id': 'req2', 'resourceRef': {'id': '234'}}]])
+    def test__find_resource_request_id_Should_RaiseResourceNotFound_When_NoRequestForResource(self, *patches):
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        with self.assertRaises(ResourceNotFound):
+            client.find_resource_request_id('123', datetime(2019, 4, 29))
+
+    @patch('vRAclient.vRAclient.get_collection')
+    def test__get_source_items_Should_CallGetCollectionWithFilter_When_SkipPaging(self, get_collection_patch, *patches):
+        get_collection_patch.return_value = iter([{'id': '1'}])
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        result = list(client.get_source_items('machines', filter="updatedAt ge '2020'", select='id'))
+        self.assertEqual(result, [{'id': '1'}])
+        get_collection_patch.assert_called_once_with(
+            "/iaas/api/machines?$orderby=updatedAt&$filter=updatedAt ge '2020'&$select=id", page_size=200)
+
+    @patch('vRAclient.vRAclient.get_page')
+    def test__get_source_items_Should_CallGetPage_When_LinkPaging(self, get_page_patch, *patches):
+        get_page_patch.return_value = iter([[{'id': '1'}], [{'id': '2'}]])
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        result = list(client.get_source_items('resources', filter="lastUpdated ge '2020'"))
+        self.assertEqual(result, [{'id': '1'}, {'id': '2'}])
+        get_page_patch.assert_called_once_with(
+            "/catalog-service/api/consumer/resources?limit=200&$orderby=lastUpdated&$filter=lastUpdated ge '2020'")
+
+    @patch('vRAclient.vRAclient.get')
+    def test__get_source_total_Should_ReturnMetadataTotal_When_LinkPaging(self, get_patch, *patches):
+        get_patch.return_value = {'content': [], 'metadata': {'totalElements': 12}}
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        self.assertEqual(client.get_source_total('resources'), 12)
+        get_patch.assert_called_once_with('/catalog-service/api/consumer/resources?limit=1')
+
+    @patch('vRAclient.vRAclient.get')
+    def test__get_source_total_Should_ReturnTotalElements_When_SkipPaging(self, get_patch, *patches):
+        get_patch.return_value = {'content': [], 'totalElements': 7}
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        self.assertEqual(client.get_source_total('machines'), 7)
+        get_patch.assert_called_once_with('/iaas/api/machines?$top=1&$skip=0')
+
+    @patch('vRAclient.vRAclient.get_source_total')
+    @patch('vRAclient.vRAclient.get_source_items')
+    def test__sync_Should_RetrieveAllItems_When_NoHighWaterMark(self, get_source_items_patch, get_source_total_patch, *patches):
+        get_source_items_patch.return_value = iter([{'id': '1', 'updatedAt': '2020-01-01'}, {'id': '2', 'updatedAt': '2020-01-02'}])
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        result = client.sync('machines')
+        self.assertEqual(result.high_water_mark, '2020-01-02')
+        self.assertEqual(result.changes, {'added': 2, 'updated': 0, 'removed': 0})
+        self.assertIsNone(get_source_items_patch.call_args[1]['filter'])
+        get_source_total_patch.assert_not_called()
+
+    @patch('vRAclient.vRAclient.get_source_total', return_value=2)
+    @patch('vRAclient.vRAclient.get_source_items')
+    def test__sync_Should_RetrieveUpdatedItemsOnly_When_CountsMatch(self, get_source_items_patch, *patches):
+        get_source_items_patch.return_value = iter([{'id': '2', 'updatedAt': '2020-01-03'}])
+        snapshot = Snapshot(items={'1': {'id': '1', 'updatedAt': '2020-01-01'}, '2': {'id': '2', 'updatedAt': '2020-01-02'}}, high_water_mark='2020-01-02')
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        result = client.sync('machines', snapshot=snapshot)
+        self.assertEqual(result.high_water_mark, '2020-01-03')
+        self.assertEqual(result.changes, {'added': 0, 'updated': 1, 'removed': 0})
+        get_source_items_patch.assert_called_once_with(ANY, filter="updatedAt ge '2020-01-02'", page_size=200)
+
+    @patch('vRAclient.vRAclient.get_source_total', return_value=1)
+    @patch('vRAclient.vRAclient.get_source_items')
+    def test__sync_Should_ReconcileIds_When_CountsDiffer(self, get_source_items_patch, *patches):
+        get_source_items_patch.side_effect = [iter([]), iter([{'id': '2'}])]
+        snapshot = Snapshot(items={'1': {'id': '1', 'updatedAt': '2020-01-01'}, '2': {'id': '2', 'updatedAt': '2020-01-02'}}, high_water_mark='2020-01-02')
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        result = client.sync('machines', snapshot=snapshot)
+        self.assertEqual(list(result.items), ['2'])
+        self.assertEqual(result.changes, {'added': 0, 'updated': 0, 'removed': 1})
+        self.assertEqual(get_source_items_patch.call_args, call(ANY, select='id', page_size=200))
+
+    @patch('vRAclient.vRAclient.get_source_total', return_value=4)
+    @patch('vRAclient.vRAclient.get_source_items')
+    def test__sync_Should_RetrieveMissingItems_When_SnapshotMissesServerItem(self, get_source_items_patch, *patches):
+        get_source_items_patch.side_effect = [
+            iter([]),
+            iter([{'id': '1'}, {'id': '2'}, {'id': '3'}, {'id': '4'}]),
+            iter([{'id': '3', 'updatedAt': '2020-01-01'}])]
+        items = dict((id, {'id': id, 'updatedAt': '2020-01-02'}) for id in ('1', '2', '4'))
+        snapshot = Snapshot(items=items, high_water_mark='2020-01-02')
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        result = client.sync('machines', snapshot=snapshot)
+        self.assertEqual(sorted(result.items), ['1', '2', '3', '4'])
+        self.assertEqual(result.changes, {'added': 1, 'updated': 0, 'removed': 0})
+        self.assertEqual(result.high_water_mark, '2020-01-02')
+        self.assertEqual(get_source_items_patch.call_args, call(ANY, filter="id eq '3'", page_size=200))
+
+    @patch('vRAclient.vRAclient.get_source_total', return_value=2)
+    @patch('vRAclient.vRAclient.get_source_items')
+    def test__sync_Should_ApplyMissingItemsFromIdCrawl_When_SourceHasNoSelect(self, get_source_items_patch, *patches):
+        get_source_items_patch.side_effect = [
+            iter([]), iter([{'id': '1', 'lastUpdated': '2020-01-01'}, {'id': '2', 'lastUpdated': '2020-01-01'}])]
+        snapshot = Snapshot(items={'1': {'id': '1', 'lastUpdated': '2020-01-01'}}, high_water_mark='2020-01-01')
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        result = client.sync('resources', snapshot=snapshot)
+        self.assertEqual(sorted(result.items), ['1', '2'])
+        self.assertEqual(result.changes, {'added': 1, 'updated': 0, 'removed': 0})
+        self.assertEqual(get_source_items_patch.call_count, 2)
+
+    @patch('vRAclient.vRAclient.get_source_items')
+    def test__get_source_items_by_id_Should_FilterEachChunkOfIds_When_Called(self, get_source_items_patch, *patches):
+        get_source_items_patch.side_effect = [iter([{'id': '1'}, {'id': '2'}]), iter([{'id': '3'}])]
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        result = list(client.get_source_items_by_id('machines', ['1', '2', '3'], chunk_size=2))
+        self.assertEqual(result, [{'id': '1'}, {'id': '2'}, {'id': '3'}])
+        self.assertEqual(get_source_items_patch.call_args_list, [
+            call(ANY, filter="id eq '1' or id eq '2'", page_size=200), call(ANY, filter="id eq '3'", page_size=200)])
+
+    @patch('vRAclient.vraclient.Snapshot.save')
+    @patch('vRAclient.vraclient.Snapshot.load')
+    @patch('vRAclient.vRAclient.get_source_items', return_value=iter([]))
+    def test__sync_Should_LoadAndSaveSnapshot_When_Path(self, get_source_items_patch, load_patch, save_patch, *patches):
+        load_patch.return_value = Snapshot()
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        client.sync('machines', path='machines.json')
+        load_patch.assert_called_once_with('machines.json')
+        save_patch.assert_called_once_with('machines.json')
+
+    @patch('vRAclient.vRAclient.get_collection')
+    def test__get_projects_Should_CallGetCollection_When_Called(self, get_collection_patch, *patches):
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        client.get_projects()
+        get_collection_patch.assert_called_once_with('/iaas/api/projects', page_size=200, max_workers=8, fields=None)
+
+    @patch('vRAclient.vraclient.Inventory')
+    def test__get_inventory_Should_ReturnRefreshedInventory_When_Called(self, inventory_patch, *patches):
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        result = client.get_inventory(kinds=['machines'])
+        inventory_patch.assert_called_once_with(client=client)
+        inventory_patch.return_value.refresh.assert_called_once_with(kinds=['machines'], max_workers=8)
+        self.assertEqual(result, inventory_patch.return_value.refresh.return_value)
+
+    @patch('vRAclient.vRAclient.get_quota_policies')
+    @patch('vRAclient.vRAclient.get_projects')
+    @patch('vRAclient.vRAclient.get_deployments')
+    @patch('vRAclient.vRAclient.get_machines')
+    def test__get_machine_records_Should_JoinMachinesToPolicies_When_Called(self, get_machines_patch, get_deployments_patch, get_projects_patch, get_quota_policies_patch, *patches):
+        get_machines_patch.return_value = iter([
+            {'id': 'm1', 'deploymentId': 'd1'},
+            {'id': 'm2', 'deploymentId': 'd9'}
+        ])
+        get_deployments_patch.return_value = iter([{'id': 'd1', 'projectId': 'p1'}])
+        get_projects_patch.return_value = iter([{'id': 'p1', 'name': 'project1'}])
+        get_quota_policies_patch.return_value = iter([{'id': 'q1', 'projectId': 'p1'}])
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        result = list(client.get_machine_records())
+        expected_result = [
+            {
+                'machine.id': 'm1', 'machine.deploymentId': 'd1',
+                'deployment.id': 'd1', 'deployment.projectId': 'p1',
+                'project.id': 'p1', 'project.name': 'project1',
+                'quota_policy.id': 'q1', 'quota_policy.projectId': 'p1'
+            }, {
+                'machine.id': 'm2', 'machine.deploymentId': 'd9'
+            }
+        ]
+        self.assertEqual(result, expected_result)
+        get_deployments_patch.assert_called_once_with(page_size=200, max_workers=2)
+        get_machines_patch.assert_called_once_with(page_size=200, max_workers=8)
+
+    @patch('vRAclient.vRAclient.get_quota_policies', return_value=iter([]))
+    @patch('vRAclient.vRAclient.get_projects', return_value=iter([]))
+    @patch('vRAclient.vRAclient.get_deployments', return_value=iter([]))
+    @patch('vRAclient.vRAclient.get_machines', return_value=iter([{'id': 'm1', 'deploymentId': 'd1'}]))
+    def test__get_machine_records_Should_SkipUnmatchedMachines_When_NotOuter(self, *patches):
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        result = list(client.get_machine_records(outer=False))
+        self.assertEqual(result, [])
+
+    @patch('vRAclient.vRAclient.get_page')
+    def test__get_resources_Should_ReturnRecords_When_Projection(self, get_page_patch, *patches):
+        get_page_patch.return_value = iter([[{'id': 'r1', 'status': 'ACTIVE', 'data': {}}], [{'id': 'r2', 'status': 'ACTIVE'}]])
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        result = client.get_resources(projection=Projection('Resource', ['id', 'status'], interned=['status']))
+        self.assertEqual([tuple(record) for record in result], [('r1', 'ACTIVE'), ('r2', 'ACTIVE')])
+
+    @patch('vRAclient.vRAclient.get_page')
+    def test__get_reservations_Should_ReturnRecordPages_When_ProjectionAndPageSize(self, get_page_patch, *patches):
+        get_page_patch.return_value = iter([[{'id': 'r1', 'name': 'reservation1'}]])
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        result = list(client.get_reservations(page_size=10, projection=Projection('Reservation', ['name'])))
+        self.assertEqual(result, [[('reservation1',)]])
+
+    def test__get_paged_endpoint_Should_AppendSelect_When_Fields(self, *patches):
+        result = get_paged_endpoint('/catalog-service/api/consumer/resources', page_size=10, orderby='dateCreated', fields=['id', 'name'])
+        self.assertEqual(result, '/catalog-service/api/consumer/resources?limit=10&$orderby=dateCreated&$select=id,name')
+
+    def test__get_select_endpoint_Should_ReturnEndpoint_When_NoFields(self, *patches):
+        self.assertEqual(get_select_endpoint('/iaas/api/machines', None), '/iaas/api/machines')
+        self.assertEqual(get_select_endpoint('/iaas/api/machines', ['id']), '/iaas/api/machines?$select=id')
+
+    def test__get_trimmed_Should_RemoveOtherAttributes_When_EndpointIgnoresSelect(self, *patches):
+        item = {'id': 'm1', 'name': 'vm1', 'customProperties': {}, '_links': {}}
+        self.assertEqual(get_trimmed(item, {'id', 'name'}), {'id': 'm1', 'name': 'vm1'})
+
+    def test__get_trimmed_Should_ReturnItem_When_AlreadyTrimmed(self, *patches):
+        item = {'id': 'm1'}
+        self.assertIs(get_trimmed(item, {'id', 'name'}), item)
+
+    @patch('vRAclient.vRAclient.get')
+    def test__get_collection_Should_SelectAndTrimFields_When_Fields(self, get_patch, *patches):
+        pages = {
+            '/iaas/api/machines?$select=id,name&$top=1&$skip=0': {'content': [{'id': 'm1', 'name': 'vm1', '_links': {}}], 'totalElements': 2},
+            '/iaas/api/machines?$select=id,name&$top=1&$skip=1': {'content': [{'id': 'm2', 'name': 'vm2', '_links': {}}], 'totalElements': 2}
+        }
+        get_patch.side_effect = lambda endpoint: pages[endpoint]
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        result = list(client.get_machines(page_size=1, fields=['id', 'name']))
+        self.assertEqual(result, [{'id': 'm1', 'name': 'vm1'}, {'id': 'm2', 'name': 'vm2'}])
+
+    @patch('vRAclient.vRAclient.get_page')
+    def test__get_resources_Should_SelectAndTrimFields_When_Fields(self, get_page_patch, *patches):
+        get_page_patch.return_value = iter([[{'id': 'r1', 'name': 'vm1', 'providerBinding': {}}]])
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        result = client.get_resources(fields=['id', 'name'])
+        self.assertEqual(result, [{'id': 'r1', 'name': 'vm1'}])
+        get_page_patch.assert_called_once_with('/catalog-service/api/consumer/resources?limit=1000&$orderby=dateCreated&$select=id,name')
+
+    def test__request_Should_RecordTransferStats_When_Called(self, *patches):
+        session_mock = Mock()
+        session_mock.request.return_value = Mock(content=b'{"content": []}')
+        session_mock.request.return_value.raw.tell.return_value = 5
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1', session=session_mock)
+        client.request('GET', '/iaas/api/machines/6f0ac5f4-5d7c-4d6b-8f8e-0a1b2c3d4e5f?$select=id')
+        client.request('GET', 'https://enterprisecloud.intel.com/iaas/api/machines/0a1b2c3d-5d7c-4d6b-8f8e-6f0ac5f4e5f9')
+        result = client.get_transfer_stats()
+        expected_result = {
+            '/iaas/api/machines/{id}': {'requests': 2, 'wire_bytes': 10, 'decoded_bytes': 30, 'ratio': 3.0}
+        }
+        self.assertEqual(result, expected_result)
+
+    def test__request_Should_NotRecordTransferStats_When_Stream(self, *patches):
+        session_mock = Mock()
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1', session=session_mock)
+        client.request('GET', '/iaas/api/machines', stream=True)
+        self.assertEqual(client.get_transfer_stats(), {})
+
+    def test__get_stream_Should_RecordTransferStats_When_Consumed(self, *patches):
+        session_mock = Mock()
+        response_mock = session_mock.request.return_value
+        response_mock.iter_content.return_value = [b'{"content": [{"id": ', b'"1"}]}']
+        response_mock.raw.tell.return_value = 12
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1', session=session_mock)
+        list(client.get_stream('/iaas/api/projects'))
+        result = client.get_transfer_stats()['/iaas/api/projects']
+        self.assertEqual(result['wire_bytes'], 12)
+        self.assertEqual(result['decoded_bytes'], 26)
+
+    @patch('vRAclient.vRAclient.get')
+    @patch('vRAclient.vRAclient.get_next_page_href')
+    def test__get_page_Should_PrefetchPages_When_PrefetchDepth(self, get_next_page_href_patch, get_patch, *patches):
+        get_next_page_href_patch.side_effect = ['link-page2', None]
+        get_patch.side_effect = [
+            {'content': ['content-page1'], 'links': []},
+            {'content': ['content-page2'], 'links': []}
+        ]
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        result = list(client.get_page('page1', prefetch_depth=2))
+        self.assertEqual(result, [['content-page1'], ['content-page2']])
+        self.assertEqual(get_patch.call_args_list, [call('page1'), call('link-page2')])
+
+    @patch('vRAclient.vRAclient.get')
+    def test__get_collection_Should_StopAtMaxItems_When_MaxItems(self, get_patch, *patches):
+        get_patch.return_value = {'content': ['m1', 'm2'], 'totalElements': 100}
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        result = list(client.get_collection('/iaas/api/machines', page_size=2, max_items=3))
+        self.assertEqual(result, ['m1', 'm2', 'm1'])
+        self.assertEqual(get_patch.call_count, 2)
+
+    @patch('vRAclient.vraclient.PageSizeTuner')
+    @patch('vRAclient.vraclient.Paginator')
+    def test__get_collection_Should_UseSingleWorkerAndTuner_When_TunePageSize(self, paginator_patch, tuner_patch, *patches):
+        paginator_patch.return_value.__iter__ = Mock(return_value=iter([]))
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        list(client.get_collection('/iaas/api/machines', tune_page_size=True))
+        paginator_patch.assert_called_once_with(
+            client.get, '/iaas/api/machines', page_size=200, max_workers=1, prefetch_depth=None, max_items=None,
+            tuner=tuner_patch.return_value, record_pages=ANY)
+
+    @patch('vRAclient.vraclient.crawl_pages')
+    def test__crawl_Should_CrawlByCreatedDate_When_LinkSource(self, crawl_pages_patch, *patches):
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        result = client.crawl('resources', '/tmp/crawl')
+        crawl_pages_patch.assert_called_once_with(
+            client.get, result, '/catalog-service/api/consumer/resources?limit=200&$orderby=dateCreated', style='link',
+            get_next=client.get_next_page_href, page_size=200, restart=False)
+        self.assertEqual(result.directory, '/tmp/crawl')
+
+    @patch('vRAclient.vraclient.crawl_pages')
+    def test__crawl_Should_CrawlByCreatedDate_When_SkipSource(self, crawl_pages_patch, *patches):
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        client.crawl('deployments', '/tmp/crawl', page_size=100, restart=True)
+        self.assertEqual(
+            crawl_pages_patch.call_args[0][2],
+            '/deployment/api/deployments?resourceTypes=Cloud.vSphere.Machine&$orderby=createdAt')
+        self.assertEqual(crawl_pages_patch.call_args[1]['style'], 'skip')
+        self.assertTrue(crawl_pages_patch.call_args[1]['restart'])
+
+    @patch('vRAclient.vraclient.BackoffGate')
+    def test__request_Should_RetryAndCloseGate_When_Throttled(self, backoff_gate_patch, *patches):
+        session_mock = Mock()
+        throttled_mock = Mock(status_code=429, headers={'Retry-After': '7'})
+        ok_mock = Mock(status_code=200, content=b'{}')
+        session_mock.request.side_effect = [throttled_mock, ok_mock]
+        backoff_gate_patch.return_value.get_wait.return_value = 0
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1', session=session_mock,
+                           retry_policy=RetryPolicy(jitter=0))
+        result = client.request('POST', '/catalog-service/api/consumer/requests', json={})
+        self.assertEqual(result, ok_mock)
+        backoff_gate_patch.return_value.close.assert_called_once_with(7)
+        self.assertEqual(backoff_gate_patch.return_value.get_wait.call_count, 2)
+        throttled_mock.close.assert_called_once_with()
+
+    @patch('vRAclient.vraclient.BackoffGate')
+    def test__request_Should_ReturnResponseAndCloseGate_When_RetryAfterExceedsMaximum(self, backoff_gate_patch, *patches):
+        session_mock = Mock()
+        session_mock.request.return_value = Mock(status_code=429, headers={'Retry-After': '120'}, content=b'')
+        backoff_gate_patch.return_value.get_wait.return_value = 0
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1', session=session_mock,
+                           retry_policy=RetryPolicy(maximum=0.2))
+        result = client.request('GET', '/iaas/api/machines')
+        self.assertEqual(result.status_code, 429)
+        self.assertEqual(session_mock.request.call_count, 1)
+        backoff_gate_patch.return_value.close.assert_called_once_with(120)
+
+    @patch('vRAclient.vraclient.sleep')
+    def test__request_Should_RetryWithBackoff_When_GatewayTimeout(self, sleep_patch, *patches):
+        session_mock = Mock()
+        session_mock.request.side_effect = [
+            Mock(status_code=504, headers={}), Mock(status_code=504, headers={}), Mock(status_code=200, content=b'{}')]
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1', session=session_mock,
+                           retry_policy=RetryPolicy(initial=1, factor=2, jitter=0))
+        result = client.request('GET', '/iaas/api/machines')
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual([args[0] for args, _ in sleep_patch.call_args_list], [1, 2])
+
+    @patch('vRAclient.vraclient.sleep')
+    def test__request_Should_NotRetryPost_When_GatewayTimeout(self, sleep_patch, *patches):
+        session_mock = Mock()
+        session_mock.request.return_value = Mock(status_code=504, headers={}, content=b'')
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1', session=session_mock)
+        result = client.request('POST', '/catalog-service/api/consumer/requests', json={})
+        self.assertEqual(result.status_code, 504)
+        self.assertEqual(session_mock.request.call_count, 1)
+
+    @patch('vRAclient.vraclient.sleep')
+    def test__request_Should_RetryConnectionError_When_Get(self, sleep_patch, *patches):
+        session_mock = Mock()
+        session_mock.request.side_effect = [requests.exceptions.ConnectionError('reset'), Mock(status_code=200, content=b'{}')]
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1', session=session_mock)
+        result = client.request('GET', '/iaas/api/machines')
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual(sleep_patch.call_count, 1)
+
+    @patch('vRAclient.vraclient.sleep')
+    def test__request_Should_RaiseAfterRetries_When_ConnectionErrorPersists(self, sleep_patch, *patches):
+        session_mock = Mock()
+        session_mock.request.side_effect = requests.exceptions.ConnectionError('reset')
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1', session=session_mock,
+                           retry_policy=RetryPolicy(retries=2))
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            client.request('GET', '/iaas/api/machines')
+        self.assertEqual(session_mock.request.call_count, 3)
+
+    @patch('vRAclient.vraclient.sleep')
+    def test__request_Should_StopRetrying_When_EndpointBudgetExhausted(self, sleep_patch, *patches):
+        session_mock = Mock()
+        session_mock.request.return_value = Mock(status_code=502, headers={}, content=b'')
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1', session=session_mock,
+                           retry_policy=RetryPolicy(retries=5, budget=3))
+        client.request('GET', '/iaas/api/machines/6f0ac5f4-5d7c-4d6b-8f8e-0a1b2c3d4e5f')
+        client.request('GET', '/iaas/api/machines/0a1b2c3d-5d7c-4d6b-8f8e-6f0ac5f4e5f9')
+        self.assertEqual(session_mock.request.call_count, 5)
+
+    def test__request_Should_NotRetry_When_NoRetryPolicy(self, *patches):
+        session_mock = Mock()
+        session_mock.request.return_value = Mock(status_code=503, headers={}, content=b'')
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1', session=session_mock,
+                           retry_policy=None)
+        client.request('GET', '/iaas/api/machines')
+        self.assertEqual(session_mock.request.call_count, 1)
+
+    def test__request_Should_WaitForRateLimiter_When_RateLimiterSpecified(self, *patches):
+        session_mock = Mock()
+        session_mock.request.return_value = Mock(status_code=200, content=b'{}')
+        rate_limiter_mock = Mock()
+        rate_limiter_mock.reserve.return_value = 0.5
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1', session=session_mock,
+                           rate_limiter=rate_limiter_mock)
+        with patch('vRAclient.vraclient.sleep') as sleep_patch:
+            client.request('GET', '/iaas/api/machines')
+        rate_limiter_mock.reserve.assert_called_once_with('https://enterprisecloud.intel.com/iaas/api/machines')
+        sleep_patch.assert_called_once_with(0.5)
+
+    @patch('vRAclient.vraclient.sleep')
+    def test__request_Should_WaitForRateLimiterOnEveryAttempt_When_Retried(self, sleep_patch, *patches):
+        session_mock = Mock()
+        session_mock.request.side_effect = [Mock(status_code=502, headers={}), Mock(status_code=200, content=b'{}')]
+        rate_limiter_mock = Mock()
+        rate_limiter_mock.reserve.return_value = 0
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1', session=session_mock,
+                           rate_limiter=rate_limiter_mock)
+        client.request('GET', '/iaas/api/machines')
+        self.assertEqual(rate_limiter_mock.reserve.call_count, 2)
+
+    def test__get_cached_json_Should_RevalidateAndServeCachedBody_When_NotModified(self, *patches):
+        session_mock = Mock()
+        session_mock.request.side_effect = [
+            Mock(status_code=200, headers={'ETag': '"v1"'}, content=b'{"name": "quota"}', json=Mock(return_value={'name': 'quota'})),
+            Mock(status_code=304, headers={'ETag': '"v1"'}, content=b'')]
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1', session=session_mock)
+        first = client.get_reservations_new_details('--access-token--', 'enterprisecloud.intel.com', 'policy1')
+        first['name'] = 'modified'
+        second = client.get_reservations_new_details('--access-token--', 'enterprisecloud.intel.com', 'policy1')
+        self.assertEqual(second, {'name': 'quota'})
+        headers = session_mock.request.call_args_list[1][1]['headers']
+        self.assertEqual(headers['If-None-Match'], '"v1"')
+        self.assertEqual(headers['authorization'], '--access-token--')
+
+    def test__get_cached_json_Should_ReplaceCachedBody_When_Modified(self, *patches):
+        session_mock = Mock()
+        session_mock.request.side_effect = [
+            Mock(status_code=200, headers={'Last-Modified': 'Mon, 12 Oct 2026 08:00:00 GMT'}, content=b'{}', json=Mock(return_value={'content': [1]})),
+            Mock(status_code=200, headers={'Last-Modified': 'Tue, 13 Oct 2026 08:00:00 GMT'}, content=b'{}', json=Mock(return_value={'content': [2]})),
+            Mock(status_code=304, headers={}, content=b'')]
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1', session=session_mock)
+        results = [client.get_subtenants_new('--access-token--', 'enterprisecloud.intel.com') for _ in range(3)]
+        self.assertEqual(results, [[1], [2], [2]])
+        self.assertEqual(
+            session_mock.request.call_args_list[2][1]['headers']['If-Modified-Since'], 'Tue, 13 Oct 2026 08:00:00 GMT')
+
+    def test__get_cached_json_Should_ServeFromCacheWithoutRequest_When_NoValidatorsAndFresh(self, *patches):
+        session_mock = Mock()
+        session_mock.request.return_value = Mock(status_code=200, headers={}, content=b'{}', json=Mock(return_value={'id': 'policy1'}))
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1', session=session_mock)
+        client.get_reservations_new_details('--access-token--', 'enterprisecloud.intel.com', 'policy1')
+        result = client.get_reservations_new_details('--access-token--', 'enterprisecloud.intel.com', 'policy1')
+        self.assertEqual(result, {'id': 'policy1'})
+        self.assertEqual(session_mock.request.call_count, 1)
+
+    def test__get_cached_json_Should_RequestAgain_When_NoValidatorsAndExpired(self, *patches):
+        session_mock = Mock()
+        session_mock.request.return_value = Mock(status_code=200, headers={}, content=b'{}', json=Mock(return_value={'id': 'policy1'}))
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1', session=session_mock, cache_ttl=0)
+        client.get_reservations_new_details('--access-token--', 'enterprisecloud.intel.com', 'policy1')
+        client.get_reservations_new_details('--access-token--', 'enterprisecloud.intel.com', 'policy1')
+        self.assertEqual(session_mock.request.call_count, 2)
+        self.assertNotIn('If-None-Match', session_mock.request.call_args_list[1][1]['headers'])
+
+    def test__get_cached_json_Should_CacheSeparately_When_AuthorizationDiffers(self, *patches):
+        session_mock = Mock()
+        session_mock.request.return_value = Mock(status_code=200, headers={}, content=b'{}', json=Mock(return_value={'id': 'policy1'}))
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1', session=session_mock)
+        client.get_reservations_new_details('--access-token1--', 'enterprisecloud.intel.com', 'policy1')
+        client.get_reservations_new_details('--access-token2--', 'enterprisecloud.intel.com', 'policy1')
+        self.assertEqual(session_mock.request.call_count, 2)
+
+    @patch('vRAclient.vraclient.sleep')
+    def test__request_Should_RecordRequestsAndRetries_When_Retried(self, sleep_patch, *patches):
+        session_mock = Mock()
+        session_mock.request.side_effect = [
+            Mock(status_code=502, headers={}), Mock(status_code=200, content=b'{"id": 1}', raw=Mock(tell=Mock(return_value=5)))]
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1', session=session_mock)
+        client.request('GET', '/iaas/api/machines/6f0ac5f4-5d7c-4d6b-8f8e-0a1b2c3d4e5f')
+        result = client.get_metrics().splitlines()
+        self.assertIn('vraclient_requests_total{endpoint="/iaas/api/machines/{id}",method="GET",status="200"} 1', result)
+        self.assertIn('vraclient_requests_total{endpoint="/iaas/api/machines/{id}",method="GET",status="502"} 1', result)
+        self.assertIn('vraclient_retries_total{endpoint="/iaas/api/machines/{id}",method="GET",reason="502"} 1', result)
+        self.assertIn('vraclient_response_bytes_total{endpoint="/iaas/api/machines/{id}"} 5', result)
+        self.assertIn('vraclient_response_decoded_bytes_total{endpoint="/iaas/api/machines/{id}"} 9', result)
+
+    def test__request_Should_RecordConnectionError_When_NotRetried(self, *patches):
+        session_mock = Mock()
+        session_mock.request.side_effect = requests.exceptions.ConnectionError('reset')
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1', session=session_mock,
+                           retry_policy=None)
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            client.request('POST', '/catalog-service/api/consumer/requests')
+        self.assertEqual(client.metrics.get_stats()['/catalog-service/api/consumer/requests']['errors'], 1)
+
+    def test__init_Should_RecordTokenRefreshes_When_TokenManager(self, *patches):
+        token_manager = Mock(on_refresh=None)
+        client = vRAclient('enterprisecloud.intel.com', username='ad_lereyes1', session=Mock(), token_manager=token_manager)
+        token_manager.on_refresh()
+        self.assertEqual(client.metrics.token_refreshes, 1)
+
+    def test__get_collection_Should_RecordPagesPerCrawl_When_Iterated(self, *patches):
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1')
+        client.get = Mock(side_effect=[
+            {'content': [1, 2], 'totalElements': 3}, {'content': [3], 'totalElements': 3}])
+        list(client.get_collection('/iaas/api/machines', page_size=2, max_workers=1))
+        self.assertEqual(client.metrics.get_stats()['/iaas/api/machines']['pages'], 2)
+
+    @patch('vRAclient.vraclient.sleep')
+    def test__wait_for_request_Should_RecordOperationHttpAndSleepSpans_When_Tracer(self, sleep_patch, *patches):
+        session_mock = Mock()
+        session_mock.request.side_effect = [
+            Mock(status_code=200, content=b'{}', json=Mock(return_value={'state': 'IN_PROGRESS', 'requestData': {}})),
+            Mock(status_code=200, content=b'{}', json=Mock(return_value={'state': 'SUCCESSFUL', 'requestData': {}}))]
+        tracer = Tracer()
+        client = vRAclient('enterprisecloud.intel.com', bearer_token='--token--', username='ad_lereyes1', session=session_mock,
+                           tracer=tracer)
+        client.wait_for_request(request_id='6f0ac5f4-5d7c-4d6b-8f8e-0a1b2c3d4e5f')
+        spans = [event for event in tracer.get_trace()['traceEvents'] if event['ph'] == 'X']
+        self.assertEqual(
+            sorted(set((span['cat'], span['name']) for span in spans)),
+            [('http', 'GET /catalog-service/api/consumer/requests/{id}'), ('operation', 'wait_for_request'), ('wait', 'sleep')])
+        operation = [span for span in spans if span['cat'] == 'operation'][0]
+        for span in spans:
+            self.assertLessEqual(operation['ts'], span['ts'])
+            self.assertGreaterEqual(operation['ts'] + operation['dur'], span['ts'] + span['dur'])
+        self.assertEqual([span['args'].get('status') for span in spans if span['cat'] == 'http'], [200, 200])
+
+    def test__init_Should_TraceLogin_When_TracerAndTokenManager(self, *patches):
+        tracer = Tracer()
+        vRAclient('enterprisecloud.intel.com', username='ad_lereyes1', session=Mock(), token_manager=Mock(on_refresh=None),
+                  tracer=tracer)
+        self.assertEqual([event['name'] for event in tracer.get_trace()['traceEvents'] if event['ph'] == 'X'], ['login'])